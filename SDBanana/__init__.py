@@ -5,13 +5,16 @@
 # https://github.com/LiuYangArt/SDBanana
 ##########################################################################
 
+import time
+
 # 首先导入 SD API 模块
 import sd
 from sd.api.sdapplication import SDApplication
 from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
 
-# 然后导入本地模块
-from .ui import SDBananaPanel
+# 然后导入本地模块（界面模块在 initializeSDPlugin 中才导入）
+from .persistence import flush_all
+from .timing import JobTrace
 
 # 全局变量
 PANEL_INSTANCE = None
@@ -25,6 +28,12 @@ def initializeSDPlugin():
     """
     global PANEL_INSTANCE, CALLBACK_ID
 
+    # 记录插件对 Designer 启动时间的贡献（单独写入 startup.jsonl，设置页延迟表下方可见）
+    startup = JobTrace(job_id="startup", provider="(plugin startup)")
+
+    with startup.stage("import_ui"):
+        from .ui import SDBananaPanel
+
     # 获取应用上下文
     ctx = sd.getContext()
     app: SDApplication = ctx.getSDApplication()
@@ -38,7 +47,8 @@ def initializeSDPlugin():
     )
 
     # 创建并设置插件面板到停靠窗口
-    PANEL_INSTANCE = SDBananaPanel(parent=dock_widget)
+    with startup.stage("create_panel"):
+        PANEL_INSTANCE = SDBananaPanel(parent=dock_widget)
 
     # 将面板设置为停靠窗口的内容
     from PySide6.QtWidgets import QVBoxLayout
@@ -48,8 +58,13 @@ def initializeSDPlugin():
     layout.setContentsMargins(0, 0, 0, 0)
     dock_widget.setLayout(layout)
 
+    PANEL_INSTANCE.startup_log.append(startup)
+
     logger = sd.getContext().getLogger()
-    logger.info("SDBanana: Plugin initialized successfully")
+    logger.info(
+        "SDBanana: Plugin initialized successfully in "
+        f"{(time.perf_counter() - startup.started) * 1000:.0f} ms"
+    )
 
 
 def uninitializeSDPlugin():
@@ -59,8 +74,12 @@ def uninitializeSDPlugin():
     """
     global PANEL_INSTANCE, CALLBACK_ID
 
+    # 写入尚未落盘的设置 / 预设 / 服务商修改
+    flush_all()
+
     # 清理资源
     if PANEL_INSTANCE:
+        PANEL_INSTANCE.health_monitor.stop()
         PANEL_INSTANCE.deleteLater()
         PANEL_INSTANCE = None
 
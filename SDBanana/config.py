@@ -0,0 +1,78 @@
+import os
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+# Seconds between stat() calls when checking a config file for outside changes
+RELOAD_CHECK_INTERVAL = 1.0
+
+# Setting defaults owned by health.py / tiling.py, kept here so settings.py can
+# use them without importing those modules at startup
+
+# Seconds between probes of a healthy provider (0 switches the monitor off)
+DEFAULT_HEALTH_INTERVAL = 60
+
+# What to do with a generated texture whose edges do not tile
+SEAM_CHECK_OFF = "off"
+SEAM_CHECK_FLAG = "flag"
+SEAM_CHECK_RETRY = "retry"
+SEAM_CHECK_MODES = (SEAM_CHECK_OFF, SEAM_CHECK_FLAG, SEAM_CHECK_RETRY)
+DEFAULT_SEAM_CHECK = SEAM_CHECK_FLAG
+
+# Configuration a job captured when it was submitted. provider is a frozen
+# provider mapping (or None); the job never sees later edits.
+JobConfig = namedtuple("JobConfig", ["provider", "system_instruction"])
+
+
+def freeze(value):
+    """Deep read-only copy: dicts become MappingProxyType, lists become tuples."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Plain (JSON-serialisable, mutable) copy of a frozen value."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+class FileWatch:
+    """
+    Detects outside changes to a file by its (mtime, size) signature.
+    changed() stats the file at most once per `interval` seconds.
+    """
+
+    def __init__(self, path, interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._signature = self._stat()
+        self._last_check = time.monotonic()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def sync(self):
+        """Accept the file's current state as seen."""
+        self._signature = self._stat()
+        self._last_check = time.monotonic()
+
+    def changed(self):
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
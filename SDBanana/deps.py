@@ -0,0 +1,14 @@
+import functools
+import importlib
+
+
+@functools.lru_cache(maxsize=None)
+def optional_import(name):
+    """
+    Import an optional dependency (Pillow, numpy) on first use instead of at
+    plugin load. Returns the module, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
@@ -1,15 +1,9 @@
 import os
+import threading
 from datetime import datetime
 
-try:
-    from PIL import Image
-
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print(
-        "Warning: PIL (Pillow) not found. WebP conversion disabled. Exporting as PNG."
-    )
+from .deps import optional_import
+from .timing import NULL_TRACE
 
 try:
     import sd
@@ -41,6 +35,9 @@ class NodeExporter:
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
 
+        # Serialises finalize_export for workers sharing one export (sweeps)
+        self._finalize_lock = threading.Lock()
+
     def get_selected_nodes(self):
         """Get currently selected nodes from the active graph."""
         if not SD_AVAILABLE or not self.ui_mgr:
@@ -55,6 +52,33 @@ class NodeExporter:
 
     def export_selected_nodes(self):
         """Export all currently selected nodes to WebP format (or PNG if PIL is missing)."""
+        steps = self.iter_export_selected_nodes()
+        try:
+            while True:
+                next(steps)
+        except StopIteration as stop:
+            success, result = stop.value
+
+        if success:
+            result = [self.finalize_export(path) for path in result]
+        return success, result
+
+    def iter_export_selected_nodes(self, selected_nodes=None, trace=None):
+        """
+        Staged export of the selection for callers that must keep the UI responsive.
+
+        This generator performs one SD API call per step (graph.compute(), then one
+        texture.save per texture output) and yields between them so the caller can
+        return to the Qt event loop. Its return value (StopIteration.value) is
+        (success, list of files) or (False, error message). Files saved as PNG still
+        need finalize_export(), which does not touch the SD API and can run in a
+        worker thread.
+
+        Args:
+            selected_nodes: Nodes to export; defaults to the current selection
+            trace: Optional JobTrace recording compute and texture save times
+        """
+        trace = trace or NULL_TRACE
         if not SD_AVAILABLE:
             return False, "Substance Designer API not available."
 
@@ -67,7 +91,8 @@ class NodeExporter:
             print(f"DEBUG: Active graph found: {graph.getIdentifier()}")
 
             # Get selected nodes
-            selected_nodes = self.get_selected_nodes()
+            if selected_nodes is None:
+                selected_nodes = self.get_selected_nodes()
             if not selected_nodes or len(selected_nodes) == 0:
                 print("DEBUG: No nodes selected.")
                 return False, "No nodes selected. Please select at least one node."
@@ -77,9 +102,10 @@ class NodeExporter:
 
             # Compute graph to ensure outputs are ready
             print("DEBUG: Computing graph...")
-            graph.compute()
+            with trace.stage("compute"):
+                graph.compute()
+            yield
 
-            exported_count = 0
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
 
             exported_files = []
@@ -102,74 +128,26 @@ class NodeExporter:
                     value = node.getPropertyValue(prop)
 
                     # Check if it is a texture
-                    if isinstance(value, SDValueTexture):
-                        texture = value.get()
-                        if texture:
-                            # Try to save directly as WebP first
-                            webp_filename = f"{node_id}_{prop_id}_{timestamp}.webp"
-                            target_path = os.path.join(self.output_dir, webp_filename)
-
-                            direct_save_success = False
-                            try:
-                                print(
-                                    f"DEBUG: Attempting direct save to: {target_path}"
-                                )
-                                texture.save(target_path)
-                                # Verify if file exists and has size
-                                if (
-                                    os.path.exists(target_path)
-                                    and os.path.getsize(target_path) > 0
-                                ):
-                                    direct_save_success = True
-                                    exported_count += 1
-                                    exported_files.append(target_path)
-                                    print("DEBUG: Direct WebP save successful.")
-                                else:
-                                    print(
-                                        "DEBUG: Direct WebP save failed (file empty or missing)."
-                                    )
-                            except Exception as e:
-                                print(f"DEBUG: Direct WebP save failed with error: {e}")
-
-                            if not direct_save_success:
-                                print(
-                                    "DEBUG: Falling back to PNG export + PIL conversion."
-                                )
-                                # Fallback to PNG
-                                png_filename = f"{node_id}_{prop_id}_{timestamp}.png"
-                                temp_path = os.path.join(self.output_dir, png_filename)
-
-                                try:
-                                    texture.save(temp_path)
-
-                                    # Convert to WebP if available
-                                    if PIL_AVAILABLE:
-                                        if self.convert_to_webp(temp_path, target_path):
-                                            exported_count += 1
-                                            exported_files.append(target_path)
-                                            # Remove temp PNG
-                                            try:
-                                                os.remove(temp_path)
-                                            except Exception:
-                                                pass
-                                        else:
-                                            # Keep PNG if conversion fails
-                                            exported_count += 1
-                                            exported_files.append(temp_path)
-                                    else:
-                                        exported_count += 1
-                                        exported_files.append(temp_path)
-                                except Exception as e:
-                                    print(f"DEBUG: Fallback export failed: {e}")
-
-                        else:
-                            print(f"DEBUG: Property {prop_id} has no texture data.")
-                    else:
+                    if not isinstance(value, SDValueTexture):
                         print(
                             f"DEBUG: Property {prop_id} value is not SDValueTexture: {type(value)}"
                         )
+                        continue
 
-            if exported_count > 0:
+                    texture = value.get()
+                    if not texture:
+                        print(f"DEBUG: Property {prop_id} has no texture data.")
+                        continue
+
+                    with trace.stage("texture_save"):
+                        saved_path = self._save_texture(
+                            texture, f"{node_id}_{prop_id}_{timestamp}"
+                        )
+                    if saved_path:
+                        exported_files.append(saved_path)
+                    yield
+
+            if exported_files:
                 return True, exported_files
             else:
                 print("DEBUG: Export failed - exported_count is 0")
@@ -178,15 +156,87 @@ class NodeExporter:
         except Exception as e:
             return False, f"Export Error: {str(e)}"
 
+    def _save_texture(self, texture, base_name):
+        """
+        Save a texture (SD API, main thread only). Tries WebP directly first and
+        falls back to PNG, which finalize_export() converts later.
+
+        Returns:
+            str: Saved file path, or None on failure
+        """
+        # Try to save directly as WebP first
+        target_path = os.path.join(self.output_dir, f"{base_name}.webp")
+        try:
+            print(f"DEBUG: Attempting direct save to: {target_path}")
+            texture.save(target_path)
+            # Verify if file exists and has size
+            if os.path.exists(target_path) and os.path.getsize(target_path) > 0:
+                print("DEBUG: Direct WebP save successful.")
+                return target_path
+            print("DEBUG: Direct WebP save failed (file empty or missing).")
+        except Exception as e:
+            print(f"DEBUG: Direct WebP save failed with error: {e}")
+
+        print("DEBUG: Falling back to PNG export.")
+        temp_path = os.path.join(self.output_dir, f"{base_name}.png")
+        try:
+            texture.save(temp_path)
+            return temp_path
+        except Exception as e:
+            print(f"DEBUG: Fallback export failed: {e}")
+            return None
+
+    def finalize_export(self, path, trace=None):
+        """
+        Convert a PNG fallback export to WebP when PIL is available and remove the
+        temporary PNG. Pure file work, safe to call from a worker thread; several
+        workers may finalize the same export, only the first one converts it.
+
+        Returns:
+            str: Path of the file to use (the WebP, or the original on failure)
+        """
+        if not path or not path.lower().endswith(".png") or not self.pil_available():
+            return path
+
+        target_path = os.path.splitext(path)[0] + ".webp"
+        with self._finalize_lock:
+            if not os.path.exists(path) and os.path.exists(target_path):
+                # Already converted by another worker
+                return target_path
+
+            with (trace or NULL_TRACE).stage("convert_input"):
+                converted = self.convert_to_webp(path, target_path)
+            if converted:
+                # Remove temp PNG
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
+                return target_path
+        # Keep PNG if conversion fails
+        return path
+
     def export_node(self, node):
         """Deprecated: Single node export is handled in batch by export_selected_nodes"""
         pass
 
+    def pil_available(self):
+        """Pillow is imported on the first export, not at plugin load."""
+        if optional_import("PIL.Image") is not None:
+            return True
+        if not getattr(self, "_warned_no_pil", False):
+            self._warned_no_pil = True
+            print(
+                "Warning: PIL (Pillow) not found. WebP conversion disabled. Exporting as PNG."
+            )
+        return False
+
     def convert_to_webp(self, source_path, target_path, quality=90):
         """Convert an image to WebP format."""
-        if not PIL_AVAILABLE:
+        if not self.pil_available():
             return False
 
+        Image = optional_import("PIL.Image")
         try:
             with Image.open(source_path) as img:
                 img.save(target_path, "WEBP", quality=quality)
@@ -0,0 +1,311 @@
+from PySide6 import QtCore, QtGui
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QListView,
+)
+import os
+import glob
+import time
+import hashlib
+import threading
+
+THUMBNAIL_SIZE = 128
+# Items added to the list per page while scrolling
+GALLERY_PAGE_SIZE = 60
+
+
+def thumbnail_key(path):
+    """Cache key for path: changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ThumbnailCache:
+    """
+    Persistent thumbnail cache in the output directory.
+
+    Thumbnails are small PNGs named by thumbnail_key(). Reads touch the file's
+    mtime, and put() evicts the least recently used files once the cache grows
+    past max_bytes. Safe to use from worker threads.
+    """
+
+    def __init__(self, output_dir, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = os.path.join(output_dir, "thumbnails")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last use)
+        self._entries = {}
+        self._total = 0
+        # The cache directory is scanned on first use, not at plugin startup
+        self._scanned = False
+
+    def _scan(self):
+        """Index the files on disk; call with the lock held."""
+        if self._scanned:
+            return
+        self._scanned = True
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.endswith(".png") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            self._entries[name[:-4]] = (stat.st_size, stat.st_mtime)
+            self._total += stat.st_size
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key):
+        """Path of the cached thumbnail, or None."""
+        with self._lock:
+            self._scan()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            self._entries[key] = (entry[0], now)
+        path = self.path_for(key)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            with self._lock:
+                self._drop(key)
+            return None
+        return path
+
+    def put(self, key, image):
+        """Store a QImage under key and evict old entries. Returns the path."""
+        path = self.path_for(key)
+        temp_path = path + ".tmp.png"
+        with self._lock:
+            self._scan()
+        if not image.save(temp_path, "PNG"):
+            return None
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (size, time.time())
+            self._total += size
+            self._evict()
+        return path
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total -= entry[0]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda kv: kv[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            self._drop(key)
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+
+def make_thumbnail(cache, path, size=THUMBNAIL_SIZE):
+    """
+    Decode path downscaled to fit size x size and store it in cache.
+    Uses QImage only, so it can run on any thread.
+
+    Returns:
+        tuple: (key, thumbnail path) or (key, None) on failure
+    """
+    key = thumbnail_key(path)
+    cached = cache.get(key)
+    if cached:
+        return key, cached
+
+    reader = QtGui.QImageReader(path)
+    source_size = reader.size()
+    if source_size.isValid():
+        # Let the decoder downscale while reading (cheap for JPEG)
+        reader.setScaledSize(source_size.scaled(size, size, QtCore.Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return key, None
+    if image.width() > size or image.height() > size:
+        image = image.scaled(
+            size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+        )
+    return key, cache.put(key, image)
+
+
+class ThumbnailSignals(QtCore.QObject):
+    done = QtCore.Signal(str, str)
+
+
+class ThumbnailTask(QtCore.QRunnable):
+    """Builds one thumbnail on the thread pool and reports (path, thumbnail path)."""
+
+    def __init__(self, cache, path):
+        super().__init__()
+        self.cache = cache
+        self.path = path
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        try:
+            _, thumb_path = make_thumbnail(self.cache, self.path)
+        except Exception:
+            thumb_path = None
+        self.signals.done.emit(self.path, thumb_path or "")
+
+
+class ResultsGallery(QWidget):
+    """
+    Lists completed results, newest first, with thumbnails.
+
+    Items are added a page at a time as the list is scrolled, and thumbnails
+    are requested only for items in view; decoding runs on a small thread pool.
+    """
+
+    def __init__(self, output_dir, cache, parent=None):
+        super().__init__(parent)
+        self.output_dir = output_dir
+        self.cache = cache
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, min(4, QtCore.QThread.idealThreadCount())))
+
+        # Entries not yet added to the list: (path, label)
+        self._pending = []
+        # path -> QListWidgetItem
+        self._items = {}
+        self._requested = set()
+        self._loaded = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self.count_label)
+
+        self.list_widget = QListWidget()
+        self.list_widget.setViewMode(QListView.IconMode)
+        self.list_widget.setResizeMode(QListView.Adjust)
+        self.list_widget.setMovement(QListView.Static)
+        self.list_widget.setUniformItemSizes(True)
+        self.list_widget.setIconSize(QtCore.QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.list_widget.setGridSize(
+            QtCore.QSize(THUMBNAIL_SIZE + 16, THUMBNAIL_SIZE + 36)
+        )
+        self.list_widget.setStyleSheet(
+            """
+            QListWidget {
+                background-color: #1e1e1e;
+                color: #cccccc;
+                border: 1px solid #444444;
+                border-radius: 4px;
+                font-size: 10px;
+            }
+        """
+        )
+        self.list_widget.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        layout.addWidget(self.list_widget)
+
+        self._placeholder = QtGui.QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self._placeholder.fill(QtGui.QColor("#333333"))
+        self._placeholder_icon = QtGui.QIcon(self._placeholder)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Scan the output directory only when the gallery is first shown
+        if not self._loaded:
+            self._loaded = True
+            self._load_history()
+        self._request_visible()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._request_visible()
+
+    def _load_history(self):
+        paths = []
+        for ext in ("png", "webp", "jpg"):
+            paths += glob.glob(os.path.join(self.output_dir, f"sd_banana_*.{ext}"))
+        paths.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+        self._pending.extend(
+            (p, os.path.basename(p)) for p in paths if p not in self._items
+        )
+        self._add_page()
+
+    def add_result(self, path, label=None, thumb_path=None):
+        """
+        Add a finished result at the top of the gallery. thumb_path is a
+        thumbnail built elsewhere (e.g. by the generation worker), which keeps
+        the entry's thumbnail even when the result file is removed later.
+        """
+        if path in self._items:
+            return
+        item = self._make_item(path, label or os.path.basename(path))
+        self.list_widget.insertItem(0, item)
+        self._update_count()
+        if thumb_path:
+            self._requested.add(path)
+            self._on_thumbnail_ready(path, thumb_path)
+        else:
+            self._request_thumbnail(path)
+
+    def _make_item(self, path, label):
+        item = QListWidgetItem(self._placeholder_icon, label)
+        item.setToolTip(path)
+        item.setData(QtCore.Qt.UserRole, path)
+        self._items[path] = item
+        return item
+
+    def _add_page(self):
+        page, self._pending = (
+            self._pending[:GALLERY_PAGE_SIZE],
+            self._pending[GALLERY_PAGE_SIZE:],
+        )
+        for path, label in page:
+            self.list_widget.addItem(self._make_item(path, label))
+        self._update_count()
+        self._request_visible()
+
+    def _update_count(self):
+        total = len(self._items) + len(self._pending)
+        self.count_label.setText(f"{total} result(s)")
+
+    def _on_scrolled(self, value):
+        bar = self.list_widget.verticalScrollBar()
+        if self._pending and value >= bar.maximum() - THUMBNAIL_SIZE:
+            self._add_page()
+        self._request_visible()
+
+    def _request_visible(self):
+        viewport = self.list_widget.viewport().rect()
+        for row in range(self.list_widget.count()):
+            item = self.list_widget.item(row)
+            rect = self.list_widget.visualItemRect(item)
+            if rect.bottom() < viewport.top():
+                continue
+            if rect.top() > viewport.bottom():
+                break
+            self._request_thumbnail(item.data(QtCore.Qt.UserRole))
+
+    def _request_thumbnail(self, path):
+        if path in self._requested or not os.path.exists(path):
+            return
+        self._requested.add(path)
+        task = ThumbnailTask(self.cache, path)
+        task.signals.done.connect(self._on_thumbnail_ready)
+        self.pool.start(task)
+
+    def _on_thumbnail_ready(self, path, thumb_path):
+        item = self._items.get(path)
+        if item is None or not thumb_path:
+            return
+        item.setIcon(QtGui.QIcon(QtGui.QPixmap(thumb_path)))
@@ -9,14 +9,21 @@ import urllib.request
 
 import urllib.error
 import ssl
+import threading
 from datetime import datetime
+from functools import cached_property
+
+from .importer import ImageInfo
+from .timing import NULL_TRACE
+from .config import JobConfig
+from .models import ModelCatalog
+from .store import open_unique
 
 
 class ImageGenerator:
     def __init__(self, provider_manager, settings_manager):
         self.provider_manager = provider_manager
         self.settings_manager = settings_manager
-        self.logger = sd.getContext().getLogger()
 
         # AppData/Local/SD_Banana
         self.output_dir = os.path.join(os.getenv("LOCALAPPDATA"), "SD_Banana")
@@ -24,6 +31,58 @@ class ImageGenerator:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+        # Probes of saved results, keyed by file path, handed over to the importer
+        self._image_infos = {}
+        self._image_infos_lock = threading.Lock()
+
+    # Created on first use so constructing the generator stays cheap at startup
+
+    @cached_property
+    def logger(self):
+        return sd.getContext().getLogger()
+
+    @cached_property
+    def model_catalog(self):
+        """Cached /models lists, used to reject unknown model ids before sending."""
+        return ModelCatalog(self.provider_manager, self.output_dir)
+
+    def discard_result(self, file_path):
+        """Delete a result that will not be imported, and forget its probe."""
+        self.pop_image_info(file_path)
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    def pop_image_info(self, file_path):
+        """Return (and forget) the ImageInfo probed when file_path was saved."""
+        with self._image_infos_lock:
+            return self._image_infos.pop(file_path, None)
+
+    def _save_image_bytes(self, image_bytes, timestamp, trace=NULL_TRACE, job_id=None):
+        """
+        Probe the image bytes once, save them with a matching extension and
+        keep the probe. The job id, when given, is part of the file name so
+        concurrent jobs never share a file.
+        """
+        with trace.stage("probe"):
+            info = ImageInfo.from_bytes(image_bytes)
+        stem = f"sd_banana_{timestamp}_{job_id}" if job_id else f"sd_banana_{timestamp}"
+        filename = f"{stem}{info.extension}"
+        with trace.stage("write"):
+            # Never reuses a name, so results saved in the same second (seam
+            # retries, concurrent jobs) cannot overwrite each other
+            f, filepath = open_unique(os.path.join(self.output_dir, filename))
+            with f:
+                f.write(image_bytes)
+        info.path = filepath
+        with self._image_infos_lock:
+            # Drop probes of results that were deleted without being imported
+            for stale in [p for p in self._image_infos if not os.path.exists(p)]:
+                del self._image_infos[stale]
+            self._image_infos[filepath] = info
+        return filepath
+
     def _convert_image_to_base64(self, image_path):
         """Convert an image file to a base64 string."""
         if not os.path.exists(image_path):
@@ -44,11 +103,23 @@ class ImageGenerator:
         search_web=False,
         debug_mode=False,
         input_image_path=None,
+        trace=None,
+        config=None,
+        job_id=None,
     ):
+        # Optional JobTrace for per-stage latency
+        trace = trace or NULL_TRACE
+
+        # Configuration snapshot captured when the job was submitted; without
+        # one, take the current snapshot now (read once, never torn)
+        if config is None:
+            config = JobConfig(
+                provider=self.provider_manager.get_provider(provider_name),
+                system_instruction=self.settings_manager.get("system_instruction", ""),
+            )
+
         # Fetch system instruction from settings
-        material_artist_instruction = self.settings_manager.get(
-            "system_instruction", ""
-        )
+        material_artist_instruction = config.system_instruction
 
         # ==========================================
         # Integrating into your existing logic
@@ -61,7 +132,7 @@ class ImageGenerator:
 
         prompt = f"{user_prompt}\n\n{system_prompt}"
 
-        provider = self.provider_manager.get_provider(provider_name)
+        provider = config.provider
 
         if not provider:
             return False, "Provider not found."
@@ -92,6 +163,8 @@ class ImageGenerator:
             )
         )
 
+        build_span = trace.begin("build_payload")
+
         payload = {}
         api_url = ""
 
@@ -104,9 +177,11 @@ class ImageGenerator:
         mime_type = "image/png"  # Default
 
         if input_image_path:
-            base64_image = self._convert_image_to_base64(input_image_path)
+            with trace.stage("encode_input"):
+                base64_image = self._convert_image_to_base64(input_image_path)
 
             if not base64_image:
+                trace.end(build_span)
                 return False, f"Failed to process input image: {input_image_path}"
 
             if input_image_path.lower().endswith(".webp"):
@@ -278,7 +353,14 @@ class ImageGenerator:
             if search_web:
                 payload["tools"] = [{"google_search": {}}]
 
-        # Debug Log
+        trace.end(build_span)
+
+        # Reject model ids the provider does not list (e.g. a wrong -2k/-4k
+        # suffix) instead of paying for a failed call
+        sent_model = actual_model if is_gptgod else model
+        model_ok, model_error = self.model_catalog.validate(provider, sent_model)
+        if not model_ok:
+            return False, model_error
 
         # Debug Log
 
@@ -350,9 +432,12 @@ class ImageGenerator:
         # Execute Request
 
         try:
+            with trace.stage("serialize"):
+                data = json.dumps(payload).encode("utf-8")
+
             req = urllib.request.Request(
                 api_url,
-                data=json.dumps(payload).encode("utf-8"),
+                data=data,
                 headers=headers,
                 method="POST",
             )
@@ -361,13 +446,22 @@ class ImageGenerator:
 
             context = ssl.create_default_context()
 
-            with urllib.request.urlopen(req, context=context, timeout=300) as response:
+            # Upload plus server processing, up to the response headers
+            request_span = trace.begin("request")
+            try:
+                response = urllib.request.urlopen(req, context=context, timeout=300)
+            finally:
+                trace.end(request_span)
+
+            with response:
                 if response.status != 200:
                     return False, f"HTTP Error: {response.status}"
 
-                response_body = response.read().decode("utf-8")
+                with trace.stage("download"):
+                    response_body = response.read()
 
-                response_json = json.loads(response_body)
+                with trace.stage("parse"):
+                    response_json = json.loads(response_body.decode("utf-8"))
 
                 if debug_mode:
                     self.logger.info(f"Response: {json.dumps(response_json, indent=2)}")
@@ -375,7 +469,12 @@ class ImageGenerator:
                 # Parse Response and Save Image
 
                 return self._process_response(
-                    response_json, is_gptgod, is_openrouter, is_google_official
+                    response_json,
+                    is_gptgod,
+                    is_openrouter,
+                    is_google_official,
+                    trace=trace,
+                    job_id=job_id,
                 )
 
         except urllib.error.HTTPError as e:
@@ -385,7 +484,13 @@ class ImageGenerator:
             return False, f"Error: {str(e)}"
 
     def _process_response(
-        self, response_json, is_gptgod, is_openrouter=False, is_google_official=False
+        self,
+        response_json,
+        is_gptgod,
+        is_openrouter=False,
+        is_google_official=False,
+        trace=NULL_TRACE,
+        job_id=None,
     ):
         image_data = None
 
@@ -478,18 +583,19 @@ class ImageGenerator:
 
         # Save Image
 
-        timestamp = datetime.now().strftime("%Y%m%d%H%M")
-
-        filename = f"sd_banana_{timestamp}.png"  # Default to png, might change if webp
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
 
-        filepath = os.path.join(self.output_dir, filename)
+        # The extension follows the real format detected from the bytes
 
         if image_data:
             # Decode Base64
 
             try:
-                with open(filepath, "wb") as f:
-                    f.write(base64.b64decode(image_data))
+                with trace.stage("decode"):
+                    image_bytes = base64.b64decode(image_data)
+                filepath = self._save_image_bytes(
+                    image_bytes, timestamp, trace, job_id=job_id
+                )
 
                 return True, filepath
 
@@ -500,24 +606,20 @@ class ImageGenerator:
             # Download URL
 
             try:
-                # Determine extension from URL if possible
-
-                if ".webp" in image_url.lower():
-                    filename = f"sd_banana_{timestamp}.webp"
-
-                    filepath = os.path.join(self.output_dir, filename)
-
                 req = urllib.request.Request(
                     image_url, headers={"User-Agent": "Mozilla/5.0"}
                 )
 
                 context = ssl.create_default_context()
 
-                with urllib.request.urlopen(
-                    req, context=context, timeout=60
-                ) as img_resp:
-                    with open(filepath, "wb") as f:
-                        f.write(img_resp.read())
+                with trace.stage("download_image"):
+                    with urllib.request.urlopen(
+                        req, context=context, timeout=60
+                    ) as img_resp:
+                        image_bytes = img_resp.read()
+                filepath = self._save_image_bytes(
+                    image_bytes, timestamp, trace, job_id=job_id
+                )
 
                 return True, filepath
 
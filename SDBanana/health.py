@@ -0,0 +1,317 @@
+import ssl
+import time
+import threading
+import http.client
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import DEFAULT_HEALTH_INTERVAL
+from .timing import percentile
+
+# Probes kept per provider for the rolling statistics
+HEALTH_WINDOW = 20
+# A failing provider is probed after interval * 2**failures, capped here
+MAX_BACKOFF = 15 * 60
+# Median probe latency above this marks a provider degraded
+DEGRADED_LATENCY = 3.0
+DEGRADED_ERROR_RATE = 0.25
+# Consecutive failures after which a provider is considered down
+DOWN_AFTER_FAILURES = 3
+PROBE_TIMEOUT = 10
+MAX_PARALLEL_PROBES = 4
+
+# Errors of a pooled connection the server closed while it sat idle; they
+# surface before any response byte arrives, so the request is safe to resend
+STALE_CONNECTION_ERRORS = (ConnectionError, http.client.BadStatusLine)
+
+STATUS_UNKNOWN = "unknown"
+STATUS_HEALTHY = "healthy"
+STATUS_DEGRADED = "degraded"
+STATUS_DOWN = "down"
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections per (scheme, host, port), so repeated
+    probes skip the TCP and TLS handshakes. A connection is used by one thread
+    at a time: get() takes it out of the pool and put() hands it back.
+    """
+
+    def __init__(self, timeout=PROBE_TIMEOUT):
+        self.timeout = timeout
+        self._context = ssl.create_default_context()
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def get(self, scheme, host, port):
+        """Returns (connection, reused): an idle pooled one if any, else a new one."""
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(scheme, host, port), False
+
+    def _connect(self, scheme, host, port):
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self._context
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def put(self, scheme, host, port, connection):
+        with self._lock:
+            self._idle.setdefault((scheme, host, port), []).append(connection)
+
+    def request(self, url, headers):
+        """GET url on a pooled connection; returns (status, body text)."""
+        status, _, body = self.fetch(url, headers)
+        return status, body
+
+    def fetch(self, url, headers):
+        """GET url on a pooled connection; returns (status, headers, body text)."""
+        parts = urllib.parse.urlsplit(url)
+        scheme, host, port = parts.scheme, parts.hostname, parts.port
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        connection, reused = self.get(scheme, host, port)
+        try:
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped the idle keep-alive socket (its idle
+                # timeout is shorter than the probe interval): retry once on
+                # a fresh connection before counting a failure
+                connection.close()
+                connection = self._connect(scheme, host, port)
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+            body = response.read()
+        except Exception:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self.put(scheme, host, port, connection)
+        return (
+            response.status,
+            {k.lower(): v for k, v in response.getheaders()},
+            body.decode("utf-8", errors="replace"),
+        )
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class ProviderHealth:
+    """Rolling probe statistics of one provider configuration."""
+
+    def __init__(self, signature):
+        # Stats are reset when the provider's URL or key changes
+        self.signature = signature
+        # (timestamp, latency seconds, success)
+        self.samples = deque(maxlen=HEALTH_WINDOW)
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.next_probe = 0.0
+
+    def record(self, success, latency, error, interval):
+        now = time.time()
+        self.samples.append((now, latency, success))
+        if success:
+            self.consecutive_failures = 0
+            self.last_error = None
+            delay = interval
+        else:
+            self.consecutive_failures += 1
+            self.last_error = error
+            delay = min(interval * 2**self.consecutive_failures, MAX_BACKOFF)
+        self.next_probe = time.monotonic() + delay
+
+    @property
+    def error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, _, ok in self.samples if not ok) / len(self.samples)
+
+    def latencies(self):
+        return sorted(latency for _, latency, ok in self.samples if ok)
+
+    @property
+    def status(self):
+        if not self.samples:
+            return STATUS_UNKNOWN
+        if self.consecutive_failures >= DOWN_AFTER_FAILURES:
+            return STATUS_DOWN
+        if (
+            self.consecutive_failures
+            or self.error_rate >= DEGRADED_ERROR_RATE
+            or percentile(self.latencies(), 0.5) > DEGRADED_LATENCY
+        ):
+            return STATUS_DEGRADED
+        return STATUS_HEALTHY
+
+    def to_dict(self):
+        latencies = self.latencies()
+        return {
+            "status": self.status,
+            "p50": percentile(latencies, 0.5) if latencies else None,
+            "p95": percentile(latencies, 0.95) if latencies else None,
+            "error_rate": self.error_rate,
+            "probes": len(self.samples),
+            "last_checked": self.samples[-1][0] if self.samples else None,
+            "last_error": self.last_error,
+        }
+
+
+class ProviderHealthMonitor:
+    """
+    Background thread that probes every configured provider in parallel with
+    ProviderManager.probe_request() and keeps ProviderHealth per provider.
+
+    Healthy providers are probed every `interval` seconds, failing ones back
+    off exponentially. Providers without a key, URL or testable endpoint are
+    skipped. snapshot() and fastest_healthy() may be called from any thread.
+    """
+
+    def __init__(self, provider_manager, interval=DEFAULT_HEALTH_INTERVAL):
+        self.provider_manager = provider_manager
+        self.interval = interval
+        self.pool = ConnectionPool()
+        self._health = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or self.interval <= 0:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="SDBananaHealthMonitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=PROBE_TIMEOUT + 1)
+            self._thread = None
+        self.pool.close()
+
+    def set_interval(self, interval):
+        """Change the probe interval; 0 stops the monitor."""
+        self.interval = interval
+        if interval <= 0:
+            self.stop()
+        elif self.running:
+            self.probe_now()
+        else:
+            self.start()
+
+    def probe_now(self):
+        """Probe every provider on the next cycle, ignoring backoff."""
+        with self._lock:
+            for health in self._health.values():
+                health.next_probe = 0.0
+        self._wake.set()
+
+    def snapshot(self):
+        """name -> ProviderHealth.to_dict() of every probed provider."""
+        with self._lock:
+            return {name: health.to_dict() for name, health in self._health.items()}
+
+    def fastest_healthy(self, names=None):
+        """Name of the healthy provider with the lowest median latency, or None."""
+        best = None
+        for name, health in self.snapshot().items():
+            if names is not None and name not in names:
+                continue
+            if health["status"] != STATUS_HEALTHY:
+                continue
+            if best is None or health["p50"] < best[1]:
+                best = (name, health["p50"])
+        return best[0] if best else None
+
+    def _due(self):
+        """(name, provider, health) of providers whose probe is due."""
+        due = []
+        now = time.monotonic()
+        providers = {p["name"]: p for p in self.provider_manager.providers}
+        with self._lock:
+            for name in list(self._health):
+                if name not in providers:
+                    del self._health[name]
+            for name, provider in providers.items():
+                if not provider.get("apiKey") or not provider.get("baseUrl"):
+                    self._health.pop(name, None)
+                    continue
+                signature = (provider["baseUrl"], provider["apiKey"])
+                health = self._health.get(name)
+                if health is None or health.signature != signature:
+                    health = self._health[name] = ProviderHealth(signature)
+                if health.next_probe <= now:
+                    due.append((name, provider, health))
+        return due
+
+    def _probe(self, provider, health):
+        api_url, headers = self.provider_manager.probe_request(provider)
+        if api_url is None:
+            # Custom provider without a known endpoint; check again later
+            health.next_probe = time.monotonic() + MAX_BACKOFF
+            return
+        started = time.perf_counter()
+        try:
+            status, body = self.pool.request(api_url, headers)
+            success, message = self.provider_manager.check_probe_response(status, body)
+        except Exception as e:
+            success, message = False, f"Connection Error: {e}"
+        latency = time.perf_counter() - started
+        with self._lock:
+            health.record(success, latency, None if success else message, self.interval)
+
+    def _run(self):
+        with ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_PROBES, thread_name_prefix="SDBananaProbe"
+        ) as executor:
+            while not self._stopped.is_set():
+                self._wake.clear()
+                try:
+                    due = self._due()
+                except Exception as e:
+                    print(f"SDBanana: health check failed: {e}")
+                    due = []
+                futures = [
+                    executor.submit(self._probe, provider, health)
+                    for _, provider, health in due
+                ]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"SDBanana: provider probe failed: {e}")
+
+                with self._lock:
+                    next_probe = min(
+                        (h.next_probe for h in self._health.values()),
+                        default=time.monotonic() + self.interval,
+                    )
+                wait = max(1.0, min(next_probe - time.monotonic(), self.interval))
+                self._wake.wait(wait)
@@ -1,6 +1,11 @@
+import contextlib
+import io
+import mmap
 import os
 import math
+import time
 import zlib
+from functools import cached_property
 
 try:
     import sd
@@ -13,35 +18,71 @@ try:
     from sd.api.sdvaluebool import SDValueBool
     from sd.api.sdproperty import SDPropertyInheritanceMethod
     from sd.api.sdbasetypes import float2, int2
+    from sd.api.sdgraphobjectcomment import SDGraphObjectComment
 
     SD_AVAILABLE = True
 except ImportError:
     SD_AVAILABLE = False
 
+from .deps import optional_import
+from .store import hash_file
+from .timing import NULL_TRACE
+
 
 # --- Utility: quick PNG grayscale detection (no external libs) ---
 # Returns True if PNG is grayscale (color_type 0/4), False if color (2/3/6), None if not PNG or error
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# color_type -> 每像素通道数
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Adam7 七个子图: (x_start, y_start, x_step, y_step)
+_ADAM7_PASSES = (
+    (0, 0, 8, 8),
+    (4, 0, 8, 8),
+    (0, 4, 4, 8),
+    (2, 0, 4, 4),
+    (0, 2, 2, 4),
+    (1, 0, 2, 2),
+    (0, 1, 1, 2),
+)
+
+# 每次从 zlib 解压的最大字节数，保证大图也能流式处理并提前退出
+_INFLATE_STEP = 1 << 20
+
+# 超过该大小的文件用 mmap 映射，只读取实际访问到的页
+_MMAP_THRESHOLD = 1 << 20
+
+
+@contextlib.contextmanager
+def _file_buffer(path):
+    """打开图片文件并产出可切片的只读缓冲区（bytes 或 mmap）。"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _MMAP_THRESHOLD:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _png_rgb_equal_quick_from_bytes(data):
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        return None
+    color_type = data[25]  # 0=Gray,2=RGB,3=Indexed,4=Gray+Alpha,6=RGB+Alpha
+    return color_type in (0, 4)
+
 
 def is_png_rgb_equal_quick(path: str):
     try:
         with open(path, "rb") as f:
-            sig = f.read(8)
-            if sig != b"\x89PNG\r\n\x1a\n":
-                return None
-            length = int.from_bytes(f.read(4), "big")
-            ctype = f.read(4)
-            if ctype != b"IHDR":
-                return None
-            ihdr = f.read(length)
-            color_type = ihdr[9]  # 0=Gray,2=RGB,3=Indexed,4=Gray+Alpha,6=RGB+Alpha
-            f.read(4)  # CRC
-            return color_type in (0, 4)
+            return _png_rgb_equal_quick_from_bytes(f.read(33))
     except Exception:
         return None
 
 
-# ---- 完整 PNG 校验（8-bit、非交错 Truecolor/Truecolor+Alpha） ----
+# ---- 完整 PNG 校验（所有 color_type / bit_depth，支持 Adam7 交错） ----
 
 
 def _paeth(a, b, c):
@@ -88,63 +129,221 @@ def _unfilter_scanline(ftype, scanline, prev, bpp):
     return res
 
 
-def is_png_rgb_equal_full(path: str):
-    """真正解码像素判断 R/G/B 是否完全一致。仅支持 bit_depth=8、interlace=0 的 color_type=2/6。灰度(0/4)直接返回 True。非 PNG 或不支持返回 None。"""
-    try:
-        with open(path, "rb") as f:
-            data = f.read()
-        if data[:8] != b"\x89PNG\r\n\x1a\n":
-            return None
-        i = 8
-        # IHDR
-        length = int.from_bytes(data[i : i + 4], "big")
-        i += 4
-        if data[i : i + 4] != b"IHDR":
+def _unfilter_scanline_fast(ftype, scanline, prev, bpp):
+    """None/Sub/Up 用 numpy 整行向量化还原；Average/Paeth 存在行内依赖，回退逐字节实现。"""
+    np = optional_import("numpy")
+    if np is None or ftype not in (0, 1, 2) or len(scanline) % bpp:
+        return _unfilter_scanline(ftype, scanline, prev, bpp)
+    if ftype == 0:
+        return bytearray(scanline)
+    row = np.frombuffer(scanline, dtype=np.uint8)
+    if ftype == 1:
+        # uint8 累加自然按 256 回绕，与逐字节 & 0xFF 等价
+        res = np.cumsum(row.reshape(-1, bpp), axis=0, dtype=np.uint8)
+    else:
+        if prev is None:
+            return bytearray(scanline)
+        res = row + np.frombuffer(bytes(prev), dtype=np.uint8)
+    return bytearray(res.tobytes())
+
+
+def _read_png_chunks(data):
+    """解析 PNG 块，返回 (ihdr, plte, idat_chunks)。非 PNG 返回 None。"""
+    if data[:8] != PNG_SIGNATURE:
+        return None
+    ihdr = None
+    plte = None
+    idat_chunks = []
+    i = 8
+    while i + 8 <= len(data):
+        clen = int.from_bytes(data[i : i + 4], "big")
+        ctype = bytes(data[i + 4 : i + 8])
+        start = i + 8
+        if ctype == b"IHDR":
+            ihdr = bytes(data[start : start + clen])
+        elif ctype == b"PLTE":
+            plte = bytes(data[start : start + clen])
+        elif ctype == b"IDAT":
+            idat_chunks.append(data[start : start + clen])
+        elif ctype == b"IEND":
+            break
+        i = start + clen + 4  # CRC
+    if ihdr is None or len(ihdr) < 13:
+        return None
+    return ihdr, plte, idat_chunks
+
+
+def _png_pass_sizes(width, height, interlace):
+    """返回每个子图的 (宽, 高)。非交错只有一个子图，空子图不含任何扫描行。"""
+    if interlace == 0:
+        return [(width, height)]
+    sizes = []
+    for x0, y0, dx, dy in _ADAM7_PASSES:
+        pw = (width - x0 + dx - 1) // dx if width > x0 else 0
+        ph = (height - y0 + dy - 1) // dy if height > y0 else 0
+        sizes.append((pw, ph))
+    return sizes
+
+
+def _iter_png_scanlines(idat_chunks, width, height, bits_per_pixel, interlace):
+    """
+    流式解压 IDAT，逐行产出 (pass_index, pass_width, filter_type, scanline)。
+    调用方可以随时停止迭代，剩余数据不会被解压。
+    """
+    inflater = zlib.decompressobj()
+    chunks = iter(idat_chunks)
+    pending = b""
+    buf = bytearray()
+    pos = 0
+
+    for pass_index, (pw, ph) in enumerate(_png_pass_sizes(width, height, interlace)):
+        if pw == 0 or ph == 0:
+            continue
+        stride = (pw * bits_per_pixel + 7) // 8
+        for _ in range(ph):
+            while len(buf) - pos < stride + 1:
+                if not pending:
+                    pending = next(chunks, None)
+                    if pending is None:
+                        raise ValueError("Truncated PNG image data")
+                    pending = bytes(pending)
+                if pos:
+                    del buf[:pos]
+                    pos = 0
+                buf.extend(inflater.decompress(pending, _INFLATE_STEP))
+                pending = inflater.unconsumed_tail
+            ftype = buf[pos]
+            scan = bytes(buf[pos + 1 : pos + 1 + stride])
+            pos += stride + 1
+            yield pass_index, pw, ftype, scan
+
+
+def _channels_equal(row, pixel_bytes, sample_bytes):
+    """
+    以步长切片比较一行内 R/G/B 三个通道的字节（C 层面的整行比较）。
+    row 布局为 R,G,B[,A] 交错，每个采样 sample_bytes 字节。
+    """
+    for k in range(sample_bytes):
+        r = row[k::pixel_bytes]
+        g = row[k + sample_bytes :: pixel_bytes]
+        b = row[k + 2 * sample_bytes :: pixel_bytes]
+        if r != g or g != b:
+            return False
+    return True
+
+
+def _palette_color_table(palette, entry_size=3):
+    """
+    生成 256 项的 translate 表：彩色调色板项映射为 0x01，灰色项与越界索引为 0x00。
+    返回 (table, has_color)。
+    """
+    table = bytearray(256)
+    has_color = False
+    count = min(len(palette) // entry_size, 256)
+    for idx in range(count):
+        e = palette[idx * entry_size : idx * entry_size + 3]
+        c0, c1, c2 = e[0], e[1], e[2]
+        if not (c0 == c1 == c2):
+            table[idx] = 1
+            has_color = True
+    return bytes(table), has_color
+
+
+def _packed_color_table(index_table, bit_depth):
+    """把按索引的 translate 表扩展到按字节：字节内任一打包索引为彩色即为 0x01。"""
+    if bit_depth == 8:
+        return index_table
+    per_byte = 8 // bit_depth
+    mask = (1 << bit_depth) - 1
+    table = bytearray(256)
+    for value in range(256):
+        for k in range(per_byte):
+            idx = (value >> (8 - bit_depth * (k + 1))) & mask
+            if index_table[idx]:
+                table[value] = 1
+                break
+    return bytes(table)
+
+
+def _indices_use_color(row, pixel_count, bit_depth, index_table, byte_table):
+    """判断一行调色板索引（MSB 优先打包）是否引用了彩色调色板项。"""
+    full_bytes = (pixel_count * bit_depth) // 8
+    if b"\x01" in row[:full_bytes].translate(byte_table):
+        return True
+    rest = pixel_count - full_bytes * 8 // bit_depth
+    if rest:
+        last = row[full_bytes]
+        mask = (1 << bit_depth) - 1
+        for k in range(rest):
+            if index_table[(last >> (8 - bit_depth * (k + 1))) & mask]:
+                return True
+    return False
+
+
+def _png_rgb_equal_from_bytes(data):
+    parsed = _read_png_chunks(data)
+    if parsed is None:
+        return None
+    ihdr, plte, idat_chunks = parsed
+    width = int.from_bytes(ihdr[0:4], "big")
+    height = int.from_bytes(ihdr[4:8], "big")
+    bit_depth = ihdr[8]
+    color_type = ihdr[9]
+    interlace = ihdr[12]
+    if color_type in (0, 4):
+        return True
+    if color_type not in (2, 3, 6) or interlace not in (0, 1):
+        return None
+
+    channels = _PNG_CHANNELS[color_type]
+    bits_per_pixel = bit_depth * channels
+
+    if color_type == 3:
+        if not plte:
             return None
-        i += 4
-        ihdr = data[i : i + length]
-        i += length
-        i += 4  # CRC
-        width = int.from_bytes(ihdr[0:4], "big")
-        height = int.from_bytes(ihdr[4:8], "big")
-        bit_depth = ihdr[8]
-        color_type = ihdr[9]
-        interlace = ihdr[12]
-        if color_type in (0, 4):
+        index_table, has_color = _palette_color_table(plte)
+        if not has_color:
             return True
-        if color_type not in (2, 6) or bit_depth != 8 or interlace != 0:
-            return None
-        # Collect IDAT
-        idat = bytearray()
-        while i + 8 <= len(data):
-            clen = int.from_bytes(data[i : i + 4], "big")
-            i += 4
-            ctype = data[i : i + 4]
-            i += 4
-            cdata = data[i : i + clen]
-            i += clen
-            i += 4  # CRC
-            if ctype == b"IDAT":
-                idat.extend(cdata)
-            elif ctype == b"IEND":
-                break
-        raw = zlib.decompress(bytes(idat))
-        bpp = 4 if color_type == 6 else 3
-        stride = width * bpp
-        pos = 0
+        # 调色板含彩色项时，只有真正被像素引用才算彩色
+        verdict = _rgb_equal_with_pil(data)
+        if verdict is not None:
+            return verdict
+        byte_table = _packed_color_table(index_table, bit_depth)
         prev = None
-        for _ in range(height):
-            ftype = raw[pos]
-            pos += 1
-            scan = raw[pos : pos + stride]
-            pos += stride
-            row = _unfilter_scanline(ftype, scan, prev, bpp)
-            for j in range(0, len(row), bpp):
-                r, g, b = row[j], row[j + 1], row[j + 2]
-                if not (r == g == b):
-                    return False
+        prev_pass = -1
+        for pass_index, pw, ftype, scan in _iter_png_scanlines(
+            idat_chunks, width, height, bits_per_pixel, interlace
+        ):
+            if pass_index != prev_pass:
+                # 每个 Adam7 子图的第一行没有上一行
+                prev = None
+                prev_pass = pass_index
+            row = bytes(_unfilter_scanline_fast(ftype, scan, prev, 1))
+            if _indices_use_color(row, pw, bit_depth, index_table, byte_table):
+                return False
             prev = row
         return True
+
+    # Truecolor: PNG 滤波器对每个字节位置独立预测（左 / 上 / 左上取同一通道的同一字节），
+    # 因此当且仅当滤波后的 R/G/B 字节逐像素相等时，还原后的像素 R==G==B。
+    # 这样无需反滤波即可判定，且可在第一行彩色处提前退出。
+    sample_bytes = 2 if bit_depth == 16 else 1
+    if bit_depth not in (8, 16):
+        return None
+    pixel_bytes = channels * sample_bytes
+    for _, _, _, scan in _iter_png_scanlines(
+        idat_chunks, width, height, bits_per_pixel, interlace
+    ):
+        if not _channels_equal(scan, pixel_bytes, sample_bytes):
+            return False
+    return True
+
+
+def is_png_rgb_equal_full(path: str):
+    """真正检查像素判断 R/G/B 是否完全一致。支持 8/16-bit、调色板与 Adam7 交错。灰度(0/4)直接返回 True。非 PNG 或不支持返回 None。"""
+    try:
+        with _file_buffer(path) as data:
+            return _png_rgb_equal_from_bytes(data)
     except Exception:
         return None
 
@@ -152,36 +351,333 @@ def is_png_rgb_equal_full(path: str):
 # --- JPEG quick grayscale check ---
 
 
+def _read_jpeg_sof(data):
+    """
+    顺着段长度跳过各标记段找到 SOF，不读取熵编码数据。
+    返回 (precision, height, width, components)，找不到返回 None。
+    """
+    if data[0:2] != b"\xff\xd8":
+        return None
+    i = 2
+    n = len(data)
+    while i < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        while i < n and data[i] == 0xFF:
+            i += 1
+        if i >= n:
+            break
+        marker = data[i]
+        i += 1
+        if marker in (0xD8, 0xD9) or (0xD0 <= marker <= 0xD7):
+            continue
+        if i + 2 > n:
+            break
+        seglen = int.from_bytes(data[i : i + 2], "big")
+        i += 2
+        if marker in (0xC0, 0xC1, 0xC2):
+            if i + 6 > n:
+                break
+            precision = data[i]
+            height = int.from_bytes(data[i + 1 : i + 3], "big")
+            width = int.from_bytes(data[i + 3 : i + 5], "big")
+            components = data[i + 5]
+            return precision, height, width, components
+        i += seglen - 2
+    return None
+
+
+def _jpeg_rgb_equal_quick_from_bytes(data):
+    sof = _read_jpeg_sof(data)
+    if sof is None:
+        return None
+    return sof[3] == 1
+
+
 def is_jpeg_rgb_equal_quick(path: str):
     try:
-        with open(path, "rb") as f:
-            data = f.read()
-        if not data.startswith(b"\xff\xd8"):
+        with _file_buffer(path) as data:
+            return _jpeg_rgb_equal_quick_from_bytes(data)
+    except Exception:
+        return None
+
+
+# --- WebP header (VP8 / VP8L / VP8X) ---
+
+
+def _read_webp_header(data):
+    """
+    解析 WebP 文件头，返回 dict(variant, width, height, has_alpha)。非 WebP 返回 None。
+    VP8 为有损 YUV420，VP8L 为无损 ARGB，VP8X 为扩展格式（画布尺寸 + 标志位）。
+    """
+    if len(data) < 30 or data[0:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return None
+    chunk = bytes(data[12:16])
+    body = 20
+    if chunk == b"VP8 ":
+        # 3 字节帧标签 + 起始码 9d 01 2a + 14 位宽高
+        if data[body + 3 : body + 6] != b"\x9d\x01\x2a":
             return None
-        i = 2
-        while i < len(data):
-            if data[i] != 0xFF:
-                i += 1
-                continue
-            while i < len(data) and data[i] == 0xFF:
-                i += 1
-            if i >= len(data):
-                break
-            marker = data[i]
-            i += 1
-            if marker in (0xD8, 0xD9) or (0xD0 <= marker <= 0xD7):
-                continue
-            if i + 2 > len(data):
+        width = int.from_bytes(data[body + 6 : body + 8], "little") & 0x3FFF
+        height = int.from_bytes(data[body + 8 : body + 10], "little") & 0x3FFF
+        return {"variant": "VP8", "width": width, "height": height, "has_alpha": False}
+    if chunk == b"VP8L":
+        if data[body] != 0x2F:
+            return None
+        bits = int.from_bytes(data[body + 1 : body + 5], "little")
+        return {
+            "variant": "VP8L",
+            "width": (bits & 0x3FFF) + 1,
+            "height": ((bits >> 14) & 0x3FFF) + 1,
+            "has_alpha": bool((bits >> 28) & 1),
+        }
+    if chunk == b"VP8X":
+        flags = data[body]
+        return {
+            "variant": "VP8X",
+            "width": int.from_bytes(data[body + 4 : body + 7], "little") + 1,
+            "height": int.from_bytes(data[body + 7 : body + 10], "little") + 1,
+            "has_alpha": bool(flags & 0x10),
+        }
+    return None
+
+
+# --- BMP ---
+
+
+def _read_bmp_header(data):
+    """
+    解析 BMP 文件头，返回 dict(width, height, top_down, bit_count, compression,
+    pixel_offset, palette, masks)。非 BMP 或不支持的头返回 None。
+    """
+    if len(data) < 26 or data[0:2] != b"BM":
+        return None
+    pixel_offset = int.from_bytes(data[10:14], "little")
+    dib_size = int.from_bytes(data[14:18], "little")
+    if dib_size == 12:  # BITMAPCOREHEADER
+        width = int.from_bytes(data[18:20], "little")
+        height = int.from_bytes(data[20:22], "little")
+        bit_count = int.from_bytes(data[24:26], "little")
+        compression = 0
+        colors_used = 0
+        entry_size = 3
+    elif dib_size >= 40:
+        width = int.from_bytes(data[18:22], "little", signed=True)
+        height = int.from_bytes(data[22:26], "little", signed=True)
+        bit_count = int.from_bytes(data[28:30], "little")
+        compression = int.from_bytes(data[30:34], "little")
+        colors_used = int.from_bytes(data[46:50], "little")
+        entry_size = 4
+    else:
+        return None
+
+    masks = None
+    table_start = 14 + dib_size
+    if compression == 3:  # BI_BITFIELDS
+        # V4/V5 头内含位域；BITMAPINFOHEADER 的位域紧跟在头之后
+        masks = [
+            int.from_bytes(data[54 + k * 4 : 58 + k * 4], "little") for k in range(3)
+        ]
+        if dib_size == 40:
+            table_start += 12
+
+    palette = None
+    if bit_count <= 8:
+        count = colors_used or (1 << bit_count)
+        # BMP 调色板为 BGR(X)，灰度判断与通道顺序无关
+        palette = bytes(data[table_start : table_start + count * entry_size])
+
+    return {
+        "width": abs(width),
+        "height": abs(height),
+        "top_down": height < 0,
+        "bit_count": bit_count,
+        "compression": compression,
+        "pixel_offset": pixel_offset,
+        "palette": palette,
+        "palette_entry_size": entry_size,
+        "masks": masks,
+    }
+
+
+def _bmp_rgb_equal_quick_from_bytes(data):
+    header = _read_bmp_header(data)
+    if header is None:
+        return None
+    if header["palette"] is not None:
+        _, has_color = _palette_color_table(
+            header["palette"], header["palette_entry_size"]
+        )
+        if not has_color:
+            return True
+    return None
+
+
+def _bmp_rgb_equal_from_bytes(data):
+    header = _read_bmp_header(data)
+    if header is None:
+        return None
+    width = header["width"]
+    height = header["height"]
+    bit_count = header["bit_count"]
+    compression = header["compression"]
+    stride = ((width * bit_count + 31) // 32) * 4
+    offset = header["pixel_offset"]
+    if len(data) < offset + stride * height:
+        return None
+
+    if header["palette"] is not None:
+        index_table, has_color = _palette_color_table(
+            header["palette"], header["palette_entry_size"]
+        )
+        if not has_color:
+            return True
+        if compression != 0:  # RLE 压缩交给 PIL
+            return None
+        byte_table = _packed_color_table(index_table, bit_count)
+        for y in range(height):
+            row = bytes(data[offset + y * stride : offset + (y + 1) * stride])
+            if _indices_use_color(row, width, bit_count, index_table, byte_table):
+                return False
+        return True
+
+    if bit_count == 24 and compression == 0:
+        channel_offsets = (0, 1, 2)
+    elif bit_count == 32 and compression == 0:
+        channel_offsets = (0, 1, 2)  # BGRX
+    elif bit_count == 32 and compression == 3 and header["masks"]:
+        # 仅支持每通道 8 位且字节对齐的位域
+        channel_offsets = []
+        for mask in header["masks"]:
+            if mask not in (0xFF, 0xFF00, 0xFF0000, 0xFF000000):
+                return None
+            channel_offsets.append((mask.bit_length() - 1) // 8)
+    else:
+        return None
+
+    pixel_bytes = bit_count // 8
+    row_bytes = width * pixel_bytes
+    c0, c1, c2 = channel_offsets
+    for y in range(height):
+        start = offset + y * stride
+        row = bytes(data[start : start + row_bytes])
+        a = row[c0::pixel_bytes]
+        b = row[c1::pixel_bytes]
+        c = row[c2::pixel_bytes]
+        if a != b or b != c:
+            return False
+    return True
+
+
+def is_bmp_rgb_equal_quick(path: str):
+    """调色板 BMP 且调色板全为灰色时返回 True，其余需要像素判断的情况返回 None。"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(14 + 124 + 256 * 4)
+        return _bmp_rgb_equal_quick_from_bytes(data)
+    except Exception:
+        return None
+
+
+def is_bmp_rgb_equal_full(path: str):
+    """逐行检查 BMP 像素 R/G/B 是否一致。支持 1/4/8-bit 调色板、24-bit 与 32-bit（BI_RGB / 8 位位域）。"""
+    try:
+        with _file_buffer(path) as data:
+            return _bmp_rgb_equal_from_bytes(data)
+    except Exception:
+        return None
+
+
+# --- GIF ---
+
+
+def _gif_color_tables(data):
+    """收集 GIF 的全局与所有局部调色板。非 GIF 或结构损坏返回 None。"""
+    if data[:6] not in (b"GIF87a", b"GIF89a") or len(data) < 13:
+        return None
+    tables = []
+    flags = data[10]
+    i = 13
+    if flags & 0x80:
+        size = 3 * (1 << ((flags & 0x07) + 1))
+        tables.append(bytes(data[i : i + size]))
+        i += size
+
+    def skip_sub_blocks(j):
+        while j < len(data):
+            block_len = data[j]
+            j += 1
+            if block_len == 0:
                 break
-            seglen = int.from_bytes(data[i : i + 2], "big")
-            i += 2
-            if marker in (0xC0, 0xC1, 0xC2):
-                if i + seglen - 2 > len(data):
-                    break
-                components = data[i + 5]
-                return components == 1
-            i += seglen - 2
+            j += block_len
+        return j
+
+    while i < len(data):
+        marker = data[i]
+        if marker == 0x3B:  # Trailer
+            break
+        if marker == 0x21:  # Extension
+            i = skip_sub_blocks(i + 2)
+        elif marker == 0x2C:  # Image Descriptor
+            if i + 10 > len(data):
+                return None
+            local_flags = data[i + 9]
+            i += 10
+            if local_flags & 0x80:
+                size = 3 * (1 << ((local_flags & 0x07) + 1))
+                tables.append(bytes(data[i : i + size]))
+                i += size
+            i = skip_sub_blocks(i + 1)  # LZW 最小码长 + 图像数据
+        else:
+            return None
+    return tables
+
+
+def _gif_rgb_equal_quick_from_bytes(data):
+    tables = _gif_color_tables(data)
+    if not tables:
+        return None
+    for table in tables:
+        _, has_color = _palette_color_table(table)
+        if has_color:
+            return None
+    return True
+
+
+def is_gif_rgb_equal_quick(path: str):
+    """GIF 所有调色板均为灰色时返回 True，否则需要像素判断，返回 None。"""
+    try:
+        with _file_buffer(path) as data:
+            return _gif_rgb_equal_quick_from_bytes(data)
+    except Exception:
+        return None
+
+
+# --- PIL accelerator (optional) ---
+
+
+def _rgb_equal_with_pil(data):
+    """使用 PIL 解码像素并比较 R/G/B。PIL 不可用或解码失败返回 None。"""
+    Image = optional_import("PIL.Image")
+    ImageChops = optional_import("PIL.ImageChops")
+    if Image is None or ImageChops is None:
         return None
+    try:
+        if isinstance(data, mmap.mmap):
+            data.seek(0)
+            source = data
+        else:
+            source = io.BytesIO(data)
+        with Image.open(source) as img:
+            if img.mode in ("1", "L", "LA", "I", "I;16", "F"):
+                return True
+            rgb = img.convert("RGB")
+            r, g, b = rgb.split()
+            return (
+                ImageChops.difference(r, g).getbbox() is None
+                and ImageChops.difference(g, b).getbbox() is None
+            )
     except Exception:
         return None
 
@@ -189,21 +685,26 @@ def is_jpeg_rgb_equal_quick(path: str):
 # --- Format detection ---
 
 
+def _detect_format_from_header(header):
+    header = bytes(header[:12])
+    if header.startswith(PNG_SIGNATURE):
+        return "png"
+    if header.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if header[0:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header.startswith(b"GIF87a") or header.startswith(b"GIF89a"):
+        return "gif"
+    if header.startswith(b"BM"):
+        return "bmp"
+    return None
+
+
 def detect_image_format(path: str):
     try:
         with open(path, "rb") as f:
             header = f.read(12)
-        if header.startswith(b"\x89PNG\r\n\x1a\n"):
-            return "png"
-        if header.startswith(b"\xff\xd8"):
-            return "jpeg"
-        if header[0:4] == b"RIFF" and header[8:12] == b"WEBP":
-            return "webp"
-        if header.startswith(b"GIF87a") or header.startswith(b"GIF89a"):
-            return "gif"
-        if header.startswith(b"BM"):
-            return "bmp"
-        return None
+        return _detect_format_from_header(header)
     except Exception:
         return None
 
@@ -211,26 +712,325 @@ def detect_image_format(path: str):
 # --- Unified quick grayscale by format ---
 
 
-def is_image_grayscale_quick(path: str):
-    fmt = detect_image_format(path)
+def _grayscale_quick_from_bytes(data, fmt):
+    if fmt == "png":
+        return _png_rgb_equal_quick_from_bytes(data)
+    if fmt == "jpeg":
+        return _jpeg_rgb_equal_quick_from_bytes(data)
+    if fmt == "bmp":
+        return _bmp_rgb_equal_quick_from_bytes(data)
+    if fmt == "gif":
+        return _gif_rgb_equal_quick_from_bytes(data)
+    # WebP 文件头不含颜色模式信息（VP8 总是 YUV420，VP8L 总是 ARGB）
+    return None
+
+
+def _grayscale_full_from_bytes(data, fmt):
     if fmt == "png":
-        return is_png_rgb_equal_quick(path)
+        return _png_rgb_equal_from_bytes(data)
+    if fmt == "bmp":
+        verdict = _bmp_rgb_equal_from_bytes(data)
+        return verdict if verdict is not None else _rgb_equal_with_pil(data)
     if fmt == "jpeg":
-        return is_jpeg_rgb_equal_quick(path)
+        return _jpeg_rgb_equal_quick_from_bytes(data)
+    if fmt in ("webp", "gif"):
+        return _rgb_equal_with_pil(data)
     return None
 
 
+def _grayscale_from_bytes(data, fmt):
+    quick = _grayscale_quick_from_bytes(data, fmt)
+    if quick is True:
+        return True
+    full = _grayscale_full_from_bytes(data, fmt)
+    return full if full is not None else quick
+
+
+def is_image_grayscale_quick(path: str):
+    try:
+        with _file_buffer(path) as data:
+            return _grayscale_quick_from_bytes(
+                data, _detect_format_from_header(data[:12])
+            )
+    except Exception:
+        return None
+
+
+def is_image_grayscale_full(path: str):
+    """按格式检查像素判断灰度。PNG / BMP 使用内置解析，WebP / GIF 需要 PIL。无法判断返回 None。"""
+    try:
+        with _file_buffer(path) as data:
+            return _grayscale_full_from_bytes(
+                data, _detect_format_from_header(data[:12])
+            )
+    except Exception:
+        return None
+
+
+def is_image_grayscale(path: str):
+    """
+    先用文件头快速判断，文件头无法确定时（如 RGB 存储的灰度内容）再检查像素。
+    返回 True=灰度, False=彩色, None=无法判断。
+    """
+    try:
+        with _file_buffer(path) as data:
+            return _grayscale_from_bytes(data, _detect_format_from_header(data[:12]))
+    except Exception:
+        return None
+
+
+# --- Single-read image probe ---
+
+
+class ImageInfo:
+    """
+    One-pass probe of an image file or in-memory buffer.
+
+    Holds the format, real dimensions, bit depth (per channel sample), channel
+    count and grayscale verdict, so import never has to reopen the file for
+    them. The SHA-256 of the content is only computed when store linking or
+    dedup asks for it, so probing a large mmapped file stays cheap.
+    Fields the probe cannot determine stay None.
+    """
+
+    def __init__(self, path=None, size=0):
+        self.path = path
+        self.size = size
+        self.format = None
+        self.width = None
+        self.height = None
+        self.bit_depth = None
+        self.channels = None
+        self.is_grayscale = None
+
+    @classmethod
+    def from_bytes(cls, data, path=None):
+        """Probe an in-memory buffer (bytes, bytearray or mmap)."""
+        info = cls(path=path, size=len(data))
+        try:
+            info._probe(data)
+        except Exception:
+            pass
+        return info
+
+    @classmethod
+    def from_file(cls, path):
+        """Probe a file on disk; large files are memory-mapped."""
+        try:
+            with _file_buffer(path) as data:
+                return cls.from_bytes(data, path=path)
+        except Exception:
+            return cls(path=path)
+
+    @classmethod
+    def from_pixels(cls, path, pixels, is_grayscale=None):
+        """
+        Info of a PNG just written from an (H, W, C) array (tiling.save_pixels),
+        without reading it back. is_grayscale is carried over from the image
+        the pixels came from; single-channel pixels are always grayscale.
+        """
+        info = cls(path=path, size=os.path.getsize(path))
+        info.format = "png"
+        info.height, info.width, info.channels = pixels.shape
+        info.bit_depth = pixels.dtype.itemsize * 8
+        info.is_grayscale = True if info.channels == 1 else is_grayscale
+        return info
+
+    def _probe(self, data):
+        fmt = _detect_format_from_header(data[:12])
+        self.format = fmt
+
+        if fmt == "png":
+            ihdr = data[16:29]
+            self.width = int.from_bytes(ihdr[0:4], "big")
+            self.height = int.from_bytes(ihdr[4:8], "big")
+            color_type = ihdr[9]
+            # 调色板像素解码后为 8-bit RGB
+            self.bit_depth = 8 if color_type == 3 else ihdr[8]
+            self.channels = 3 if color_type == 3 else _PNG_CHANNELS.get(color_type)
+        elif fmt == "jpeg":
+            sof = _read_jpeg_sof(data)
+            if sof:
+                self.bit_depth, self.height, self.width, self.channels = sof
+        elif fmt == "webp":
+            header = _read_webp_header(data)
+            if header:
+                self.width = header["width"]
+                self.height = header["height"]
+                self.bit_depth = 8
+                self.channels = 4 if header["has_alpha"] else 3
+        elif fmt == "bmp":
+            header = _read_bmp_header(data)
+            if header:
+                self.width = header["width"]
+                self.height = header["height"]
+                self.bit_depth = 8
+                self.channels = 4 if header["bit_count"] == 32 else 3
+        elif fmt == "gif":
+            self.width = int.from_bytes(data[6:8], "little")
+            self.height = int.from_bytes(data[8:10], "little")
+            self.bit_depth = 8
+            self.channels = 3
+        else:
+            return
+
+        self.is_grayscale = _grayscale_from_bytes(data, fmt)
+
+    @cached_property
+    def content_hash(self):
+        """SHA-256 hex digest of the file at path, read on first use (or None)."""
+        if not self.path:
+            return None
+        try:
+            return hash_file(self.path)
+        except OSError:
+            return None
+
+    @property
+    def extension(self):
+        """File extension matching the detected format (".png" when unknown)."""
+        return {"jpeg": ".jpg"}.get(self.format, f".{self.format or 'png'}")
+
+    def __repr__(self):
+        return (
+            f"ImageInfo(format={self.format!r}, size={self.width}x{self.height}, "
+            f"bit_depth={self.bit_depth}, channels={self.channels}, "
+            f"is_grayscale={self.is_grayscale})"
+        )
+
+
+# $outputsize is stored as log2 of the size: 2^0 .. 2^13 (1 px .. 8K)
+MIN_OUTPUT_POWER = 0
+MAX_OUTPUT_POWER = 13
+
+
+# --- Batch layout ---
+
+# Distance between neighbouring bitmap nodes in graph units
+GRID_SPACING = 150
+
+
+def layout_positions(origin, count, layout="grid", spacing=GRID_SPACING, columns=None):
+    """
+    Positions for count nodes starting at origin.
+
+    layout: "grid" (near-square, row-major), "row" (left to right) or
+    "column" (top to bottom). columns fixes the grid width (e.g. one column
+    per resolution of a sweep).
+    """
+    x0, y0 = origin
+    if columns:
+        columns = max(1, int(columns))
+    elif layout == "row":
+        columns = max(count, 1)
+    elif layout == "column":
+        columns = 1
+    else:
+        columns = max(1, math.ceil(math.sqrt(count)))
+    return [
+        (x0 + (i % columns) * spacing, y0 + (i // columns) * spacing)
+        for i in range(count)
+    ]
+
+
+# --- Import modes ---
+
+# Copy the file next to the package (EmbedMethod.CopiedAndLinked)
+IMPORT_MODE_COPY = "copy"
+# Zero-copy: hardlink next to the package, or link the output store file
+IMPORT_MODE_LINK = "link"
+
+# Folder next to a saved package that receives hardlinked results
+LINKED_RESOURCE_DIR = "SDBanana_resources"
+
+
 class ImageImporter:
-    def __init__(self):
+    def __init__(self, store=None):
         if SD_AVAILABLE:
             self.ctx = sd.getContext()
             self.app = self.ctx.getSDApplication()
             self.pkg_mgr = self.app.getPackageMgr()
+            self.logger = self.ctx.getLogger()
         else:
             self.ctx = None
+            self.logger = None
+
+        # Content-addressed OutputStore used by IMPORT_MODE_LINK
+        self.store = store
+
+        # folder_name -> (package file path, folder url) of the last resolved folder
+        self._folder_cache = {}
+
+        # package file path -> {content hash: (resource url, resource file path)}
+        # for bitmap resources created or already hashed by this importer
+        self._resource_index = {}
+        # package file path -> {file size: [(resource url, resource file path)]}
+        # for bitmaps found in the package but not hashed yet, so resources
+        # from earlier sessions are reused too without hashing them all
+        self._unhashed_resources = {}
+
+        # {"package", "resource_url", "node_id", "reused"} of the last
+        # successful import_image call, or None; see import_image(replace=...)
+        self.last_import = None
+
+    def invalidate_cache(self):
+        """Forget cached folder and resource handles (next import rescans the package)."""
+        self._folder_cache.clear()
+        self._resource_index.clear()
+        self._unhashed_resources.clear()
+
+    def _get_target_package(self):
+        """Return the first user package, or None if no package is open."""
+        packages = self.pkg_mgr.getUserPackages()
+        if not packages or len(packages) == 0:
+            return None
+        return packages[0]
+
+    def _get_package_key(self, package):
+        try:
+            return package.getFilePath()
+        except Exception:
+            return None
+
+    def _get_cached_folder(self, package, folder_name):
+        """
+        Validate the cached folder with a single URL lookup instead of walking
+        every resource of the package. Returns None when the package changed
+        or the folder was deleted/renamed.
+        """
+        cached = self._folder_cache.get(folder_name)
+        if not cached:
+            return None
+        package_key, folder_url = cached
+        if package_key != self._get_package_key(package):
+            return None
+        try:
+            folder = package.findResourceFromUrl(folder_url)
+            if (
+                folder
+                and folder.getClassName() == "SDResourceFolder"
+                and folder.getIdentifier() == folder_name
+            ):
+                return folder
+        except Exception:
+            pass
+        return None
+
+    def _remember_folder(self, package, folder_name, folder):
+        try:
+            self._folder_cache[folder_name] = (
+                self._get_package_key(package),
+                folder.getUrl(),
+            )
+        except Exception:
+            self._folder_cache.pop(folder_name, None)
 
     def _get_or_create_folder(self, package, folder_name="SDBanana"):
         """Get or create a resource folder in the package."""
+        folder = self._get_cached_folder(package, folder_name)
+        if folder:
+            return folder
+
         try:
             # Check if folder already exists
             resources = package.getChildrenResources(False)
@@ -239,17 +1039,45 @@ class ImageImporter:
                     resource.getClassName() == "SDResourceFolder"
                     and resource.getIdentifier() == folder_name
                 ):
+                    self._remember_folder(package, folder_name, resource)
                     return resource
 
             # Create new folder
             folder = SDResourceFolder.sNew(package)
             if folder:
                 folder.setIdentifier(folder_name)
+                self._remember_folder(package, folder_name, folder)
                 return folder
             return None
         except Exception:
+            self._folder_cache.pop(folder_name, None)
             return None
 
+    def _apply_color_mode(self, bitmap_node, is_gray):
+        """Set the bitmap node's Color Mode (colorswitch, or legacy string properties)."""
+        try:
+            color_switch_prop = bitmap_node.getPropertyFromId(
+                "colorswitch", SDPropertyCategory.Input
+            )
+            if color_switch_prop:
+                bitmap_node.setPropertyValue(
+                    color_switch_prop, SDValueBool.sNew(is_gray is False)
+                )
+                return True
+        except Exception:
+            pass
+
+        mode_value = SDValueString.sNew("grayscale" if is_gray else "color")
+        for pid in ("bitmapcolormode", "colormode", "colorMode"):
+            try:
+                prop = bitmap_node.getPropertyFromId(pid, SDPropertyCategory.Input)
+                if prop:
+                    bitmap_node.setPropertyValue(prop, mode_value)
+                    return True
+            except Exception:
+                pass
+        return False
+
     def _calculate_dimensions(self, resolution, aspect_ratio):
         """
         Calculate image dimensions based on resolution and aspect ratio.
@@ -301,6 +1129,426 @@ class ImageImporter:
             width_power = base_power + int(round(math.log2(ratio)))
             return width_power, height_power
 
+    def _dimensions_from_image(self, image_info):
+        """
+        Nearest power-of-two exponents for the real image size.
+
+        Returns:
+            tuple: (width_power, height_power), or None when the size is unknown
+        """
+        if not image_info or not image_info.width or not image_info.height:
+            return None
+
+        def to_power(pixels):
+            power = int(round(math.log2(pixels)))
+            return min(max(power, MIN_OUTPUT_POWER), MAX_OUTPUT_POWER)
+
+        return to_power(image_info.width), to_power(image_info.height)
+
+    def _resolve_output_size(self, image_info, resolution, aspect_ratio):
+        """
+        Pick $outputsize from the delivered image, falling back to the
+        requested resolution/aspect ratio. Logs requested/delivered mismatches.
+        """
+        requested = self._calculate_dimensions(resolution, aspect_ratio)
+        actual = self._dimensions_from_image(image_info)
+        if actual is None:
+            return requested
+
+        if actual != requested and self.logger:
+            self.logger.warning(
+                f"SDBanana: requested {resolution} {aspect_ratio} "
+                f"({2 ** requested[0]}x{2 ** requested[1]}) but received "
+                f"{image_info.width}x{image_info.height}; "
+                f"output size set to {2 ** actual[0]}x{2 ** actual[1]}"
+            )
+        return actual
+
+    def _create_linked_resource(self, parent, package, file_path, image_info):
+        """
+        Zero-copy import. Hardlink the file next to the saved package when it
+        shares a filesystem with the output directory; otherwise link the
+        durable store file directly and hold a reference on it.
+
+        Returns:
+            tuple: (resource or None, list of attempted methods)
+        """
+        tried_methods = []
+        content_hash = image_info.content_hash if image_info else None
+        if not content_hash:
+            content_hash = hash_file(file_path)
+        extension = os.path.splitext(file_path)[1].lower()
+        package_key = self._get_package_key(package)
+
+        link_path = None
+        store_path = None
+        if package_key:
+            resource_dir = os.path.join(
+                os.path.dirname(package_key), LINKED_RESOURCE_DIR
+            )
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            candidate = os.path.join(
+                resource_dir, f"{stem}_{content_hash[:8]}{extension}"
+            )
+            try:
+                os.makedirs(resource_dir, exist_ok=True)
+                if not os.path.exists(candidate):
+                    os.link(file_path, candidate)
+                link_path = candidate
+                tried_methods.append("Hardlink (success)")
+            except (OSError, AttributeError) as e:
+                tried_methods.append(f"Hardlink (failed: {e})")
+
+        if link_path is None and self.store is not None:
+            try:
+                store_path = self.store.add(file_path, content_hash, extension)
+                link_path = store_path
+            except Exception as e:
+                tried_methods.append(f"Store (failed: {e})")
+
+        if link_path is None:
+            return None, tried_methods
+
+        resource = None
+        try:
+            resource = SDResourceBitmap.sNewFromFile(
+                parent, link_path, EmbedMethod.Linked
+            )
+            if resource:
+                tried_methods.append("Linked (success)")
+        except Exception as e:
+            tried_methods.append(f"Linked (failed: {e})")
+
+        if resource and store_path:
+            try:
+                self.store.acquire(store_path, package_key, resource.getUrl())
+            except Exception:
+                pass
+        return resource, tried_methods
+
+    def _package_references_hash(self, package_key, content_hash):
+        """
+        Whether the saved package file still mentions a store file. Open
+        packages and packages that cannot be read are reported as unknown.
+        """
+        if not package_key or not os.path.exists(package_key):
+            return None
+        try:
+            for package in self.pkg_mgr.getUserPackages():
+                if self._get_package_key(package) == package_key:
+                    return True  # May hold unsaved references
+        except Exception:
+            return None
+        try:
+            with open(package_key, "r", encoding="utf-8", errors="ignore") as f:
+                return content_hash in f.read()
+        except Exception:
+            return None
+
+    def collect_store_garbage(self):
+        """
+        Release store references of packages that no longer link the file,
+        then delete unreferenced store files. Returns the number removed.
+        """
+        if self.store is None or not SD_AVAILABLE:
+            return 0
+        cache = {}
+
+        def is_alive(content_hash, package_key, resource_url):
+            key = (package_key, content_hash)
+            if key not in cache:
+                cache[key] = self._package_references_hash(package_key, content_hash)
+            return cache[key]
+
+        self.store.release_missing(is_alive)
+        return self.store.collect_garbage()
+
+    def _get_resource_file_path(self, resource):
+        try:
+            return resource.getFilePath()
+        except Exception:
+            return None
+
+    def _scan_package_bitmaps(self, package):
+        """
+        Group the package's existing bitmap resources by file size (first
+        use of a package after a plugin reload or Designer restart).
+        """
+        by_size = {}
+        try:
+            resources = package.getChildrenResources(True)
+        except Exception:
+            return by_size
+        for resource in resources:
+            try:
+                if resource.getClassName() != "SDResourceBitmap":
+                    continue
+                resource_file = self._get_resource_file_path(resource)
+                if not resource_file or not os.path.isfile(resource_file):
+                    continue
+                entry = (resource.getUrl(), resource_file)
+                by_size.setdefault(os.path.getsize(resource_file), []).append(entry)
+            except Exception:
+                continue
+        return by_size
+
+    def _hash_candidates(self, package_key, package, image_info, index):
+        """Hash the not yet indexed bitmaps with the same file size as image_info."""
+        unhashed = self._unhashed_resources.get(package_key)
+        if unhashed is None:
+            unhashed = self._scan_package_bitmaps(package)
+            self._unhashed_resources[package_key] = unhashed
+        for resource_url, resource_file in unhashed.pop(image_info.size, []):
+            try:
+                index.setdefault(
+                    hash_file(resource_file), (resource_url, resource_file)
+                )
+            except OSError:
+                continue
+
+    def _find_existing_resource(self, package, image_info):
+        """
+        Bitmap resource previously created from identical bytes in this
+        package, or None. Besides the resources this importer created, the
+        package's existing bitmaps of the same file size are hashed on demand.
+        The entry is validated by URL lookup and by the resource's file path,
+        so deleted or foreign resources are not reused.
+        """
+        content_hash = image_info.content_hash if image_info else None
+        if not content_hash:
+            return None
+        package_key = self._get_package_key(package)
+        index = self._resource_index.setdefault(package_key, {})
+        if content_hash not in index and image_info.size:
+            self._hash_candidates(package_key, package, image_info, index)
+        if content_hash not in index:
+            return None
+        resource_url, resource_file = index[content_hash]
+        try:
+            resource = package.findResourceFromUrl(resource_url)
+            if resource and self._get_resource_file_path(resource) == resource_file:
+                return resource
+        except Exception:
+            pass
+        del index[content_hash]
+        return None
+
+    def _remember_resource(self, package, image_info, resource):
+        content_hash = image_info.content_hash if image_info else None
+        if not content_hash:
+            return
+        try:
+            entry = (resource.getUrl(), self._get_resource_file_path(resource))
+        except Exception:
+            return
+        index = self._resource_index.setdefault(self._get_package_key(package), {})
+        index[content_hash] = entry
+
+    def _get_or_create_resource(
+        self, parent, package, file_path, image_info, import_mode
+    ):
+        """
+        Reuse the resource already created from the same bytes, or create one.
+
+        Returns:
+            tuple: (resource or None, list of attempted methods, reused flag)
+        """
+        resource = self._find_existing_resource(package, image_info)
+        if resource:
+            return resource, ["Reused identical resource"], True
+
+        resource, tried_methods = self._create_resource(
+            parent, file_path, package, image_info, import_mode
+        )
+        if resource:
+            self._remember_resource(package, image_info, resource)
+        return resource, tried_methods, False
+
+    def _create_resource(
+        self,
+        parent,
+        file_path,
+        package=None,
+        image_info=None,
+        import_mode=IMPORT_MODE_COPY,
+    ):
+        """
+        Create an SDResourceBitmap for file_path under parent.
+
+        Returns:
+            tuple: (resource or None, list of attempted embed methods)
+        """
+        resource = None
+        tried_methods = []
+
+        # Method 0: zero-copy link (falls back to copying below)
+        if import_mode == IMPORT_MODE_LINK:
+            resource, tried_methods = self._create_linked_resource(
+                parent, package, file_path, image_info
+            )
+
+        # Method 1: Try CopiedAndLinked (copies file and links to copy)
+        if not resource:
+            try:
+                resource = SDResourceBitmap.sNewFromFile(
+                    parent, file_path, EmbedMethod.CopiedAndLinked
+                )
+                if resource:
+                    tried_methods.append("CopiedAndLinked (success)")
+            except Exception as e:
+                tried_methods.append(f"CopiedAndLinked (failed: {e})")
+
+        # Method 2: Fallback to Linked if CopiedAndLinked failed
+        if not resource:
+            try:
+                resource = SDResourceBitmap.sNewFromFile(
+                    parent, file_path, EmbedMethod.Linked
+                )
+                if resource:
+                    tried_methods.append("Linked (success)")
+            except Exception as e:
+                tried_methods.append(f"Linked (failed: {e})")
+
+        if resource:
+            # Set a clean identifier (filename without path)
+            filename = os.path.splitext(os.path.basename(file_path))[0]
+            try:
+                resource.setIdentifier(filename)
+            except Exception:
+                pass  # If identifier setting fails, continue anyway
+
+        return resource, tried_methods
+
+    def _setup_bitmap_node(
+        self, graph, resource, position, image_info, resolution, aspect_ratio
+    ):
+        """Create a bitmap node for resource and set position, colour mode and output size."""
+        bitmap_node = graph.newNode("sbs::compositing::bitmap")
+
+        # Set node position
+        if position and isinstance(position, (tuple, list)) and len(position) == 2:
+            bitmap_node.setPosition(float2(position[0], position[1]))
+        else:
+            bitmap_node.setPosition(float2(50, 50))
+
+        # Set the bitmap resource path
+        bitmap_resource_property = bitmap_node.getPropertyFromId(
+            "bitmapresourcepath", SDPropertyCategory.Input
+        )
+        resource_url = SDValueString.sNew(resource.getUrl())
+        bitmap_node.setPropertyValue(bitmap_resource_property, resource_url)
+
+        # Auto set Color Mode based on image header / pixels
+        try:
+            is_gray = image_info.is_grayscale if image_info else None
+            if is_gray is not None:
+                self._apply_color_mode(bitmap_node, is_gray)
+        except Exception:
+            pass
+
+        # Set output size to Absolute and use the real image dimensions
+        try:
+            width_power, height_power = self._resolve_output_size(
+                image_info, resolution, aspect_ratio
+            )
+
+            # Set the inheritance method for $outputsize to Absolute
+            # This changes the dropdown from "Relative to Parent" to "Absolute"
+            bitmap_node.setInputPropertyInheritanceMethodFromId(
+                "$outputsize", SDPropertyInheritanceMethod.Absolute
+            )
+
+            # Set the actual output size value (as power of 2)
+            bitmap_node.setInputPropertyValueFromId(
+                "$outputsize",
+                SDValueInt2.sNew(int2(width_power, height_power)),
+            )
+
+        except Exception:
+            pass
+
+        return bitmap_node
+
+    def _add_node_label(self, node, label):
+        """Attach label to node as a graph comment (best effort)."""
+        try:
+            comment = SDGraphObjectComment.sNew(node)
+            comment.setDescription(label)
+            return comment
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"SDBanana: Could not label node: {e}")
+            return None
+
+    def _delete_resource(self, package, resource_url):
+        """Delete a bitmap resource and drop its store reference, if any."""
+        resource = package.findResourceFromUrl(resource_url)
+        if resource is None:
+            return
+        resource_file = self._get_resource_file_path(resource)
+        resource.delete()
+        if (
+            self.store is not None
+            and resource_file
+            and os.path.dirname(resource_file) == self.store.store_dir
+        ):
+            self.store.release(
+                resource_file, self._get_package_key(package), resource_url
+            )
+
+    def _replace_import(self, package, graph, node, previous):
+        """
+        Put node where the node of an earlier import (see last_import) was,
+        taking over its position and output connections, then delete that
+        node and its resource. A resource that import reused from an older
+        one is kept. Nothing is deleted when the earlier node is no longer in
+        graph (removed, or in another graph that may still use the resource).
+
+        Returns:
+            bool: True if the earlier node was replaced
+        """
+        node_id = previous.get("node_id")
+        old_node = graph.getNodeFromId(node_id) if node_id else None
+        if old_node is None or old_node.getIdentifier() == node.getIdentifier():
+            return False
+        node.setPosition(old_node.getPosition())
+        old_outputs = old_node.getProperties(SDPropertyCategory.Output)
+        new_outputs = node.getProperties(SDPropertyCategory.Output)
+        for old_output, new_output in zip(old_outputs, new_outputs):
+            for connection in old_node.getPropertyConnections(old_output):
+                node.newPropertyConnection(
+                    new_output,
+                    connection.getInputPropertyNode(),
+                    connection.getInputProperty(),
+                )
+        graph.deleteNode(old_node)
+
+        resource_url = previous.get("resource_url")
+        new_url = self.last_import["resource_url"] if self.last_import else None
+        if resource_url and resource_url != new_url and not previous.get("reused"):
+            try:
+                self._delete_resource(package, resource_url)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"SDBanana: Could not delete resource: {e}")
+        return True
+
+    def _replace_note(self, package, graph, node, previous):
+        """Run _replace_import and describe the outcome for the import message."""
+        try:
+            if self._replace_import(package, graph, node, previous):
+                return ", replacing the previous one"
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"SDBanana: Could not replace node: {e}")
+        return " (previous node kept)"
+
+    def _get_current_graph(self):
+        try:
+            return self.app.getQtForPythonUIMgr().getCurrentGraph()
+        except Exception:
+            return None
+
     def import_image(
         self,
         file_path,
@@ -308,213 +1556,95 @@ class ImageImporter:
         insert_position=None,
         resolution="1K",
         aspect_ratio="1:1",
+        image_info=None,
+        import_mode=IMPORT_MODE_COPY,
+        trace=None,
+        replace=None,
     ):
         """
         Imports an image file as a resource into the current package
         (into SDBanana folder). Creates a bitmap node in the current graph if requested.
+        What was created is kept in self.last_import.
 
         Args:
             file_path: Path to the image file to import
             create_bitmap_node: If True, creates a bitmap node in the current active graph
             insert_position: Optional tuple(float, float) to position the bitmap node
-            resolution: Resolution setting used for generation ("1K", "2K", "4K")
+            resolution: Resolution setting used for generation ("1K", "2K", "4K");
+                only used for $outputsize when the real size cannot be read
             aspect_ratio: Aspect ratio of the generated image (e.g., "1:1", "16:9")
+            image_info: Optional ImageInfo already probed by the caller; when
+                omitted the file is probed once here
+            import_mode: IMPORT_MODE_COPY (copy next to the package) or
+                IMPORT_MODE_LINK (zero-copy hardlink / store link)
+            trace: Optional JobTrace recording probe, resource and node times
+            replace: Optional last_import of an earlier import (e.g. a preview)
+                whose node and resource the new node replaces
         """
+        trace = trace or NULL_TRACE
+        self.last_import = None
         if not SD_AVAILABLE:
             return False, "Substance Designer API not available."
 
         if not os.path.exists(file_path):
             return False, f"File not found: {file_path}"
 
+        if image_info is None:
+            with trace.stage("probe"):
+                image_info = ImageInfo.from_file(file_path)
+
         try:
-            # Get user packages
-            packages = self.pkg_mgr.getUserPackages()
-            if not packages or len(packages) == 0:
+            # Use first user package
+            package = self._get_target_package()
+            if package is None:
                 return False, "No package open in Substance Designer."
 
-            package = packages[0]  # Use first user package
-
-            # Get or create SDBanana folder
+            # Get or create SDBanana folder (cached between imports)
             folder = self._get_or_create_folder(package, "SDBanana")
             parent = folder if folder else package
 
-            # Try different embed methods
-            resource = None
-            tried_methods = []
-
-            # Method 1: Try CopiedAndLinked (copies file and links to copy)
-            try:
-                resource = SDResourceBitmap.sNewFromFile(
-                    parent, file_path, EmbedMethod.CopiedAndLinked
+            with trace.stage("new_resource"):
+                resource, tried_methods, reused = self._get_or_create_resource(
+                    parent, package, file_path, image_info, import_mode
                 )
-                if resource:
-                    tried_methods.append("CopiedAndLinked (success)")
-            except Exception as e:
-                tried_methods.append(f"CopiedAndLinked (failed: {e})")
-
-            # Method 2: Fallback to Linked if CopiedAndLinked failed
-            if not resource:
-                try:
-                    resource = SDResourceBitmap.sNewFromFile(
-                        parent, file_path, EmbedMethod.Linked
-                    )
-                    if resource:
-                        tried_methods.append("Linked (success)")
-                except Exception as e:
-                    tried_methods.append(f"Linked (failed: {e})")
-
             if not resource:
                 error_detail = "; ".join(tried_methods)
                 return False, f"Failed to create resource. Attempts: {error_detail}"
 
-            # Set a clean identifier (filename without path)
-            filename = os.path.splitext(os.path.basename(file_path))[0]
-            try:
-                resource.setIdentifier(filename)
-            except Exception:
-                pass  # If identifier setting fails, continue anyway
-
             # Resource imported successfully!
-            folder_msg = "in folder 'SDBanana'" if folder else "in package"
-            success_msg = f"Resource imported {folder_msg}"
+            if reused:
+                success_msg = "Identical resource already in package, reused"
+            else:
+                folder_msg = "in folder 'SDBanana'" if folder else "in package"
+                success_msg = f"Resource imported {folder_msg}"
+            self.last_import = {
+                "package": self._get_package_key(package),
+                "resource_url": resource.getUrl(),
+                "node_id": None,
+                "reused": reused,
+            }
 
             # Create bitmap node in current graph if requested
             if create_bitmap_node:
                 try:
-                    uiMgr = self.app.getQtForPythonUIMgr()
-                    graph = uiMgr.getCurrentGraph()
+                    graph = self._get_current_graph()
 
                     if graph:
-                        # Create bitmap node
-                        bitmap_node = graph.newNode("sbs::compositing::bitmap")
-
-                        # Set node position
-                        if (
-                            insert_position
-                            and isinstance(insert_position, (tuple, list))
-                            and len(insert_position) == 2
-                        ):
-                            bitmap_node.setPosition(
-                                float2(insert_position[0], insert_position[1])
-                            )
-                        else:
-                            bitmap_node.setPosition(float2(50, 50))
-
-                        # Set the bitmap resource path
-                        bitmap_resource_property = bitmap_node.getPropertyFromId(
-                            "bitmapresourcepath", SDPropertyCategory.Input
-                        )
-                        resource_url = SDValueString.sNew(resource.getUrl())
-                        bitmap_node.setPropertyValue(
-                            bitmap_resource_property, resource_url
-                        )
-
-                        # Auto set Color Mode based on image header
-                        try:
-                            fmt = detect_image_format(file_path)
-                            is_gray = is_image_grayscale_quick(file_path)
-                            applied = False
-                            if is_gray is not None:
-                                try:
-                                    color_switch_prop = bitmap_node.getPropertyFromId(
-                                        "colorswitch", SDPropertyCategory.Input
-                                    )
-                                    if color_switch_prop:
-                                        bitmap_node.setPropertyValue(
-                                            color_switch_prop,
-                                            SDValueBool.sNew(is_gray is False),
-                                        )
-
-                                        applied = True
-                                except Exception:
-                                    pass
-                                if not applied:
-                                    mode_value = SDValueString.sNew(
-                                        "grayscale" if is_gray else "color"
-                                    )
-                                    for pid in (
-                                        "bitmapcolormode",
-                                        "colormode",
-                                        "colorMode",
-                                    ):
-                                        try:
-                                            prop = bitmap_node.getPropertyFromId(
-                                                pid, SDPropertyCategory.Input
-                                            )
-                                            if prop:
-                                                bitmap_node.setPropertyValue(
-                                                    prop, mode_value
-                                                )
-
-                                                applied = True
-                                                break
-                                        except Exception:
-                                            pass
-                            elif fmt == "png":
-                                # Fallback: use full PNG pixel check when quick result is None
-                                full_gray = is_png_rgb_equal_full(file_path)
-                                if full_gray is not None:
-                                    try:
-                                        color_switch_prop = (
-                                            bitmap_node.getPropertyFromId(
-                                                "colorswitch", SDPropertyCategory.Input
-                                            )
-                                        )
-                                        if color_switch_prop:
-                                            bitmap_node.setPropertyValue(
-                                                color_switch_prop,
-                                                SDValueBool.sNew(full_gray is False),
-                                            )
-
-                                        else:
-                                            raise Exception("colorswitch not found")
-                                    except Exception:
-                                        mode_value = SDValueString.sNew(
-                                            "grayscale" if full_gray else "color"
-                                        )
-                                        for pid in (
-                                            "bitmapcolormode",
-                                            "colormode",
-                                            "colorMode",
-                                        ):
-                                            try:
-                                                prop = bitmap_node.getPropertyFromId(
-                                                    pid, SDPropertyCategory.Input
-                                                )
-                                                if prop:
-                                                    bitmap_node.setPropertyValue(
-                                                        prop, mode_value
-                                                    )
-
-                                                    break
-                                            except Exception:
-                                                pass
-                        except Exception:
-                            pass
-
-                        # Set output size to Absolute and use calculated dimensions
-                        try:
-                            # Calculate dimensions from resolution and aspect ratio
-                            width_power, height_power = self._calculate_dimensions(
-                                resolution, aspect_ratio
-                            )
-
-                            # Set the inheritance method for $outputsize to Absolute
-                            # This changes the dropdown from "Relative to Parent" to "Absolute"
-                            bitmap_node.setInputPropertyInheritanceMethodFromId(
-                                "$outputsize", SDPropertyInheritanceMethod.Absolute
+                        with trace.stage("bitmap_node"):
+                            bitmap_node = self._setup_bitmap_node(
+                                graph,
+                                resource,
+                                insert_position,
+                                image_info,
+                                resolution,
+                                aspect_ratio,
                             )
-
-                            # Set the actual output size value (as power of 2)
-                            bitmap_node.setInputPropertyValueFromId(
-                                "$outputsize",
-                                SDValueInt2.sNew(int2(width_power, height_power)),
-                            )
-
-                        except Exception:
-                            pass
-
+                        self.last_import["node_id"] = bitmap_node.getIdentifier()
                         success_msg += " and bitmap node created"
+                        if replace:
+                            success_msg += self._replace_note(
+                                package, graph, bitmap_node, replace
+                            )
                     else:
                         success_msg += " (no active graph for node creation)"
                 except Exception:
@@ -525,3 +1655,133 @@ class ImageImporter:
 
         except Exception as e:
             return False, f"Import Error: {str(e)}"
+
+    def import_images(
+        self,
+        file_paths,
+        create_bitmap_nodes=True,
+        insert_position=None,
+        layout="grid",
+        resolution="1K",
+        aspect_ratio="1:1",
+        image_infos=None,
+        spacing=GRID_SPACING,
+        import_mode=IMPORT_MODE_COPY,
+        labels=None,
+        columns=None,
+    ):
+        """
+        Imports several image files in one pass: the package and SDBanana
+        folder are resolved once and every bitmap node goes through the same
+        setup routine. Nodes are laid out starting at insert_position (e.g.
+        next to the source selection) so they do not overlap.
+
+        Args:
+            file_paths: List of image file paths; None entries leave their
+                grid cell empty
+            create_bitmap_nodes: If True, creates one bitmap node per image
+            insert_position: Optional tuple(float, float) of the first node
+            layout: "grid", "row" or "column"
+            resolution: Resolution setting used for generation ("1K", "2K", "4K")
+            aspect_ratio: Aspect ratio of the generated images
+            image_infos: Optional dict of file path -> ImageInfo already probed
+            spacing: Distance between neighbouring nodes
+            import_mode: IMPORT_MODE_COPY or IMPORT_MODE_LINK
+            labels: Optional list of captions, one per file, attached to the
+                bitmap nodes as comments
+            columns: Optional fixed grid width (see layout_positions)
+
+        Returns:
+            tuple: (success, overall message, list with one dict per entry of
+                file_paths, keys "path", "success", "message", "seconds");
+                success is True if at least one image was imported
+        """
+        file_paths = list(file_paths)
+
+        def failed(message):
+            results = [
+                {"path": path, "success": False, "message": message, "seconds": 0.0}
+                for path in file_paths
+            ]
+            return False, message, results
+
+        if not SD_AVAILABLE:
+            return failed("Substance Designer API not available.")
+        if not file_paths:
+            return failed("No images to import.")
+
+        image_infos = image_infos or {}
+
+        try:
+            package = self._get_target_package()
+            if package is None:
+                return failed("No package open in Substance Designer.")
+
+            folder = self._get_or_create_folder(package, "SDBanana")
+            parent = folder if folder else package
+            graph = self._get_current_graph() if create_bitmap_nodes else None
+        except Exception as e:
+            return failed(f"Import Error: {str(e)}")
+
+        origin = insert_position
+        if not (origin and isinstance(origin, (tuple, list)) and len(origin) == 2):
+            origin = (50, 50)
+        positions = layout_positions(
+            origin, len(file_paths), layout, spacing, columns=columns
+        )
+        labels = list(labels or [])
+        labels += [None] * (len(file_paths) - len(labels))
+
+        results = []
+        for file_path, position, label in zip(file_paths, positions, labels):
+            start = time.perf_counter()
+            entry = {"path": file_path, "success": False, "message": ""}
+            if file_path is None:
+                entry["message"] = "Skipped"
+                entry["seconds"] = 0.0
+                results.append(entry)
+                continue
+            try:
+                if not os.path.exists(file_path):
+                    entry["message"] = f"File not found: {file_path}"
+                else:
+                    image_info = image_infos.get(file_path)
+                    if image_info is None:
+                        image_info = ImageInfo.from_file(file_path)
+
+                    resource, tried_methods, reused = self._get_or_create_resource(
+                        parent, package, file_path, image_info, import_mode
+                    )
+                    if not resource:
+                        entry["message"] = (
+                            "Failed to create resource. Attempts: "
+                            + "; ".join(tried_methods)
+                        )
+                    else:
+                        entry["success"] = True
+                        entry["message"] = (
+                            "Identical resource reused"
+                            if reused
+                            else "Resource imported"
+                        )
+                        if graph:
+                            bitmap_node = self._setup_bitmap_node(
+                                graph,
+                                resource,
+                                position,
+                                image_info,
+                                resolution,
+                                aspect_ratio,
+                            )
+                            entry["message"] += " and bitmap node created"
+                            if label:
+                                self._add_node_label(bitmap_node, label)
+            except Exception as e:
+                entry["message"] = f"Import Error: {str(e)}"
+            entry["seconds"] = time.perf_counter() - start
+            results.append(entry)
+
+        imported = sum(r["success"] for r in results)
+        requested = sum(path is not None for path in file_paths)
+        message = f"Imported {imported}/{requested} image(s)"
+        return imported > 0, message, results
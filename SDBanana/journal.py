@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+# Job stages, in order. Jobs in a final stage are dropped on compaction.
+STAGE_SUBMITTED = "submitted"
+STAGE_GENERATING = "generating"
+STAGE_GENERATED = "generated"
+STAGE_IMPORTED = "imported"
+# Imported as a local upscale of a 1K preview, waiting to be finalized at the
+# native resolution
+STAGE_PREVIEWED = "previewed"
+STAGE_FAILED = "failed"
+STAGE_DROPPED = "dropped"
+
+FINAL_STAGES = (STAGE_IMPORTED, STAGE_FAILED, STAGE_DROPPED)
+
+
+class JobJournal:
+    """
+    Append-only JSONL journal of generation jobs in the output directory.
+
+    Every stage change is one appended line, so a crash or plugin reload never
+    loses more than the line being written. Replaying the file yields the
+    latest state of each job; unfinished jobs can then be resumed, re-imported,
+    finalized (previews) or dropped. compact() rewrites the file with only the
+    unfinished jobs.
+    """
+
+    # Compact once this many lines have been appended since the last rewrite
+    COMPACT_THRESHOLD = 200
+
+    def __init__(self, output_dir):
+        self.journal_file = os.path.join(output_dir, "jobs.jsonl")
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._appended = 0
+        self.load()
+        self.compact()
+
+    def load(self):
+        """Replay the journal. Torn or invalid lines (e.g. from a crash) are skipped."""
+        self.jobs = {}
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    job_id = record.get("job_id")
+                    if job_id:
+                        self.jobs.setdefault(job_id, {}).update(record)
+        except Exception as e:
+            print(f"Error loading job journal: {e}")
+
+    def _append(self, record):
+        try:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error writing job journal: {e}")
+        self._appended += 1
+
+    def new_job(self, request, insert_position=None, input_image_path=None):
+        """Record a submitted job and return its id."""
+        job_id = uuid.uuid4().hex[:12]
+        self.update(
+            job_id,
+            STAGE_SUBMITTED,
+            request=request,
+            insert_position=list(insert_position) if insert_position else None,
+            input_image_path=input_image_path,
+            created=time.time(),
+        )
+        return job_id
+
+    def update(self, job_id, stage, **fields):
+        """Append a stage change (and any extra fields) for job_id. Thread-safe."""
+        record = {"job_id": job_id, "stage": stage, "updated": time.time()}
+        record.update(fields)
+        with self._lock:
+            self.jobs.setdefault(job_id, {}).update(record)
+            self._append(record)
+            needs_compaction = self._appended >= self.COMPACT_THRESHOLD
+        if needs_compaction:
+            self.compact()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def unfinished(self):
+        """Unfinished jobs, oldest first."""
+        with self._lock:
+            jobs = [
+                dict(job)
+                for job in self.jobs.values()
+                if job.get("stage") not in FINAL_STAGES
+            ]
+        return sorted(jobs, key=lambda job: job.get("created", 0))
+
+    def compact(self):
+        """Rewrite the journal with one line per unfinished job (temp file + rename)."""
+        with self._lock:
+            live = {
+                job_id: job
+                for job_id, job in self.jobs.items()
+                if job.get("stage") not in FINAL_STAGES
+            }
+            temp_file = self.journal_file + ".tmp"
+            try:
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    for job in live.values():
+                        f.write(json.dumps(job, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.journal_file)
+                self.jobs = live
+                self._appended = 0
+            except Exception as e:
+                print(f"Error compacting job journal: {e}")
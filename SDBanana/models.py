@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import difflib
+import hashlib
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from .health import ConnectionPool
+from .persistence import DebouncedJsonFile
+
+# Seconds a fetched model list is trusted before it is revalidated
+MODEL_CACHE_TTL = 24 * 60 * 60
+MAX_PARALLEL_FETCHES = 4
+# Gemini-style /models responses are paginated
+MAX_MODEL_PAGES = 10
+
+
+def normalize_model(name):
+    """Gemini lists "models/<id>" while requests may use the bare id."""
+    return name[len("models/") :] if name.startswith("models/") else name
+
+
+def parse_model_ids(data):
+    """
+    Model ids from a /models response: OpenAI style {"data": [{"id"}]} or
+    Gemini style {"models": [{"name"}]}.
+    """
+    ids = []
+    if isinstance(data, dict):
+        for item in data.get("data") or []:
+            if isinstance(item, dict) and item.get("id"):
+                ids.append(item["id"])
+        for item in data.get("models") or []:
+            if isinstance(item, dict) and item.get("name"):
+                ids.append(normalize_model(item["name"]))
+    return ids
+
+
+def _signature(provider):
+    # Cached lists are only valid for the URL and key they were fetched with
+    text = f"{provider.get('baseUrl', '')}\n{provider.get('apiKey', '')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ModelCatalog:
+    """
+    Per-provider model lists from each provider's /models endpoint (the URL
+    ProviderManager.probe_request() builds), cached in models_cache.json in
+    the output directory.
+
+    Entries older than MODEL_CACHE_TTL are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged list costs a 304. refresh() fetches
+    several providers in parallel; the other methods only read the cache and
+    are safe to call from any thread.
+    """
+
+    def __init__(self, provider_manager, output_dir, ttl=MODEL_CACHE_TTL):
+        self.provider_manager = provider_manager
+        self.ttl = ttl
+        self.pool = ConnectionPool()
+        self._file = DebouncedJsonFile(os.path.join(output_dir, "models_cache.json"))
+        self._lock = threading.Lock()
+        cache = self._file.load({})
+        self._cache = cache if isinstance(cache, dict) else {}
+
+    def _entry(self, provider):
+        """Cache entry of provider if it matches its current URL and key."""
+        with self._lock:
+            entry = self._cache.get(provider.get("name"))
+        if entry and entry.get("signature") == _signature(provider):
+            return entry
+        return None
+
+    def is_fresh(self, provider):
+        entry = self._entry(provider)
+        return bool(entry) and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def models(self, provider_name):
+        """Cached model ids of a provider, or None if not fetched yet."""
+        provider = self.provider_manager.get_provider(provider_name)
+        entry = self._entry(provider) if provider else None
+        return list(entry["models"]) if entry else None
+
+    def validate(self, provider, model):
+        """
+        Check a model id against the provider's fresh cached list.
+
+        Returns:
+            tuple: (ok, message); ok is True when the model is listed or when
+                there is no fresh, complete list to check against
+        """
+        if not model or not self.is_fresh(provider):
+            return True, None
+        entry = self._entry(provider)
+        if entry.get("partial"):
+            return True, None
+        known = entry["models"]
+        if not known or normalize_model(model) in known:
+            return True, None
+        message = f"Model '{model}' is not offered by {provider.get('name')}."
+        close = difflib.get_close_matches(normalize_model(model), known, n=3)
+        if close:
+            message += f" Did you mean: {', '.join(close)}?"
+        return False, message
+
+    def refresh(self, names=None, force=False):
+        """
+        Fetch the model lists of `names` (default: all providers) that are
+        stale, or all of them if force is set, in parallel.
+
+        Returns:
+            dict: provider name -> error message, for fetches that failed
+        """
+        providers = [
+            p
+            for p in self.provider_manager.providers
+            if (names is None or p["name"] in names)
+            and p.get("apiKey")
+            and p.get("baseUrl")
+            and (force or not self.is_fresh(p))
+        ]
+        errors = {}
+        if not providers:
+            return errors
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_PARALLEL_FETCHES, len(providers)),
+            thread_name_prefix="SDBananaModels",
+        ) as executor:
+            futures = {p["name"]: executor.submit(self._fetch, p) for p in providers}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[name] = str(e)
+        return errors
+
+    def _fetch(self, provider):
+        api_url, headers = self.provider_manager.probe_request(provider)
+        if api_url is None:
+            return
+
+        entry = self._entry(provider)
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        status, response_headers, body = self.pool.fetch(api_url, headers)
+        if status == 304 and entry:
+            self._store(provider, dict(entry, fetched_at=time.time()))
+            return
+        success, message = self.provider_manager.check_probe_response(status, body)
+        if not success:
+            raise RuntimeError(message)
+
+        data = json.loads(body)
+        models = parse_model_ids(data)
+        # Follow Gemini pagination (conditional headers only apply to page 1).
+        # A failed page leaves the previous entry in place: a truncated list
+        # would make validate() reject models listed on the missing pages
+        headers.pop("If-None-Match", None)
+        headers.pop("If-Modified-Since", None)
+        for page in range(2, MAX_MODEL_PAGES + 1):
+            token = data.get("nextPageToken") if isinstance(data, dict) else None
+            if not token:
+                break
+            separator = "&" if "?" in api_url else "?"
+            page_url = f"{api_url}{separator}pageToken={urllib.parse.quote(token)}"
+            status, _, page_body = self.pool.fetch(page_url, headers)
+            if not 200 <= status < 300:
+                raise RuntimeError(f"Model list page {page} failed with HTTP {status}")
+            data = json.loads(page_body)
+            models.extend(parse_model_ids(data))
+        # More pages than MAX_MODEL_PAGES: keep the list for display, but
+        # never validate against it
+        partial = isinstance(data, dict) and bool(data.get("nextPageToken"))
+
+        self._store(
+            provider,
+            {
+                "signature": _signature(provider),
+                "models": sorted(set(models)),
+                "fetched_at": time.time(),
+                "etag": response_headers.get("etag"),
+                "last_modified": response_headers.get("last-modified"),
+                "partial": partial,
+            },
+        )
+
+    def _store(self, provider, entry):
+        with self._lock:
+            self._cache[provider["name"]] = entry
+            self._file.schedule(self._cache)
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import shutil
+import weakref
+import threading
+from collections.abc import Mapping
+
+# Changes arriving within this window are written once
+DEFAULT_WRITE_DELAY = 0.5
+# A steady stream of changes is still written at least this often
+DEFAULT_MAX_WRITE_DELAY = 2.0
+
+# Every DebouncedJsonFile, so flush_all() can write pending changes on unload
+_writers = weakref.WeakSet()
+
+
+def _json_default(value):
+    # Frozen config snapshots (MappingProxyType) serialise like dicts
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def backup_path(path):
+    return path + ".bak"
+
+
+def _keep_backup(path):
+    """
+    Make path + ".bak" a copy of the current file, leaving path in place: a
+    hardlink to the current inode (which the rename below then detaches), or
+    a real copy where hardlinks are not supported.
+    """
+    backup = backup_path(path)
+    if os.path.exists(backup):
+        os.remove(backup)
+    try:
+        os.link(path, backup)
+    except OSError:
+        shutil.copyfile(path, backup)
+
+
+def atomic_write_text(path, text, backup=True):
+    """
+    Write text to path via a temp file, fsync and rename. With backup=True
+    the previous version is kept as path + ".bak" for load_json() to fall
+    back on; path itself exists at every moment, so a crash or a concurrent
+    reader never finds it missing.
+
+    Returns:
+        bool: True on success
+    """
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if backup and os.path.exists(path):
+            _keep_backup(path)
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        print(f"Error writing {path}: {e}")
+        return False
+
+
+def load_json(path, default=None):
+    """
+    Load a JSON file, falling back to its last good copy (".bak") when the
+    file is missing or corrupt. Returns default when neither can be read.
+    Never writes: the next save replaces the bad file with the recovered data.
+    """
+    for candidate in (path, backup_path(path)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading {candidate}: {e}")
+            continue
+        if candidate != path:
+            print(f"Recovered {os.path.basename(path)} from last good copy")
+        return data
+    return default
+
+
+class DebouncedJsonFile:
+    """
+    Write-behind JSON file shared by the settings, preset and provider managers.
+
+    schedule() snapshots the data immediately (so later mutations cannot leak
+    into the write) and a timer writes the latest snapshot once changes stop
+    for `delay` seconds, or at most `max_delay` after the first pending change.
+    Writes go through atomic_write_text(). flush() writes synchronously.
+    on_written() is called after each successful write, still under the
+    write lock, so an owner can mark its own writes as seen (FileWatch.sync).
+    """
+
+    def __init__(
+        self,
+        path,
+        delay=DEFAULT_WRITE_DELAY,
+        max_delay=DEFAULT_MAX_WRITE_DELAY,
+        on_written=None,
+    ):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+        self._lock = threading.Lock()
+        self._pending = None
+        self._first_pending = None
+        self._timer = None
+        _writers.add(self)
+
+    def load(self, default=None):
+        return load_json(self.path, default)
+
+    @property
+    def pending(self):
+        """True until the scheduled write has reached the disk."""
+        return self._pending is not None
+
+    def schedule(self, data):
+        text = json.dumps(data, indent=4, default=_json_default)
+        with self._lock:
+            now = time.monotonic()
+            self._pending = text
+            if self._first_pending is None:
+                self._first_pending = now
+            if self._timer:
+                self._timer.cancel()
+            remaining = self._first_pending + self.max_delay - now
+            self._timer = threading.Timer(
+                max(0.0, min(self.delay, remaining)), self.flush
+            )
+            self._timer.start()
+
+    def flush(self):
+        """Write the pending snapshot now. Returns False if the write failed."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            text = self._pending
+            if text is None:
+                return True
+            # Written under the lock so snapshots reach the disk in order;
+            # pending stays True until the write and on_written are done
+            written = atomic_write_text(self.path, text)
+            if written and self.on_written:
+                self.on_written()
+            self._pending = None
+            self._first_pending = None
+            return written
+
+
+def flush_all():
+    """Write every pending change (called when the plugin is unloaded)."""
+    for writer in list(_writers):
+        writer.flush()
@@ -1,90 +1,386 @@
 import os
+import re
 import json
+import bisect
+import threading
+
+from .config import FileWatch, freeze, thaw
+from .persistence import DebouncedJsonFile, atomic_write_text
+
+# CJK text has no spaces between words, so each character is its own token;
+# any other run of letters/digits is one token. Search matches token prefixes.
+_CJK = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_TOKEN_RE = re.compile(f"[{_CJK}]|[^\\W_{_CJK}]+")
+_CJK_RUN_RE = re.compile(f"[{_CJK}]+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _search_text(entry):
+    return " ".join(
+        [entry["name"], entry["prompt"], entry.get("category", "")]
+        + list(entry.get("tags", ()))
+    ).lower()
+
+
+def make_preset(name, prompt, tags=None, category=None):
+    """Frozen preset entry; tags and category are only stored when set."""
+    entry = {"name": name, "prompt": prompt}
+    tags = [t.strip() for t in (tags or []) if t and t.strip()]
+    if tags:
+        entry["tags"] = tags
+    if category and category.strip():
+        entry["category"] = category.strip()
+    return freeze(entry)
+
+
+class PresetLibrary:
+    """
+    Immutable preset snapshot plus its search indexes.
+
+    entries maps name -> frozen entry (insertion order is display order),
+    tokens maps token -> frozenset of names, sorted_tokens allows prefix
+    lookups by bisection and categories maps category -> frozenset of names.
+    replace() and remove() return a new library, re-indexing only the preset
+    that changed.
+    """
+
+    def __init__(self, entries=None, tokens=None, sorted_tokens=(), categories=None):
+        self.entries = entries or {}
+        self.tokens = tokens or {}
+        self.sorted_tokens = sorted_tokens
+        self.categories = categories or {}
+
+    @classmethod
+    def from_list(cls, presets):
+        entries = {}
+        for p in presets:
+            if isinstance(p, dict) and p.get("name"):
+                entries[p["name"]] = make_preset(
+                    p["name"], p.get("prompt", ""), p.get("tags"), p.get("category")
+                )
+        tokens = {}
+        categories = {}
+        for name, entry in entries.items():
+            for token in set(tokenize(_search_text(entry))):
+                tokens.setdefault(token, set()).add(name)
+            if entry.get("category"):
+                categories.setdefault(entry["category"], set()).add(name)
+        return cls(
+            entries,
+            {t: frozenset(n) for t, n in tokens.items()},
+            tuple(sorted(tokens)),
+            {c: frozenset(n) for c, n in categories.items()},
+        )
+
+    def to_list(self):
+        return list(self.entries.values())
+
+    def replace(self, old_name, entry):
+        """New library with old_name (None to add) replaced by entry in place."""
+        entries = dict(self.entries)
+        if old_name is not None and old_name != entry["name"]:
+            # Rename: keep the preset at its position
+            entries = {
+                (entry["name"] if k == old_name else k): v for k, v in entries.items()
+            }
+        entries[entry["name"]] = entry
+        old_entry = self.entries.get(old_name) if old_name is not None else None
+        return self._reindexed(entries, old_entry, entry)
+
+    def remove(self, name):
+        entries = dict(self.entries)
+        old_entry = entries.pop(name)
+        return self._reindexed(entries, old_entry, None)
+
+    def _reindexed(self, entries, old_entry, new_entry):
+        tokens = dict(self.tokens)
+        categories = dict(self.categories)
+        touched = set()
+
+        if old_entry is not None:
+            name = old_entry["name"]
+            for token in set(tokenize(_search_text(old_entry))):
+                names = tokens[token] - {name}
+                if names:
+                    tokens[token] = names
+                else:
+                    del tokens[token]
+                touched.add(token)
+            category = old_entry.get("category")
+            if category:
+                names = categories[category] - {name}
+                if names:
+                    categories[category] = names
+                else:
+                    del categories[category]
+
+        if new_entry is not None:
+            name = new_entry["name"]
+            for token in set(tokenize(_search_text(new_entry))):
+                tokens[token] = tokens.get(token, frozenset()) | {name}
+                touched.add(token)
+            category = new_entry.get("category")
+            if category:
+                categories[category] = categories.get(category, frozenset()) | {name}
+
+        sorted_tokens = list(self.sorted_tokens)
+        for token in touched:
+            if token in self.tokens and token not in tokens:
+                del sorted_tokens[bisect.bisect_left(sorted_tokens, token)]
+            elif token not in self.tokens and token in tokens:
+                bisect.insort(sorted_tokens, token)
+
+        return PresetLibrary(entries, tokens, tuple(sorted_tokens), categories)
+
+    def _match(self, term):
+        if _CJK_RUN_RE.fullmatch(term):
+            return self.tokens.get(term, frozenset())
+        matched = set()
+        i = bisect.bisect_left(self.sorted_tokens, term)
+        while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(term):
+            matched |= self.tokens[self.sorted_tokens[i]]
+            i += 1
+        return matched
+
+    def search(self, query="", category=None):
+        """Names matching every term of query, in library order."""
+        candidates = None
+        for term in set(tokenize(query)):
+            matched = self._match(term)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+        if category:
+            in_category = self.categories.get(category, frozenset())
+            candidates = in_category if candidates is None else candidates & in_category
+        if candidates is None:
+            return list(self.entries)
+
+        # CJK characters are indexed singly; check that runs appear as typed
+        runs = _CJK_RUN_RE.findall(query.lower())
+        names = []
+        for name, entry in self.entries.items():
+            if name not in candidates:
+                continue
+            if runs:
+                text = _search_text(entry)
+                if not all(run in text for run in runs):
+                    continue
+            names.append(name)
+        return names
 
 
 class PresetManager:
     def __init__(self):
         self.config_file = os.path.join(os.path.dirname(__file__), "presets.json")
-        self.presets = []
+        # Immutable snapshot, replaced (never mutated) on every change
+        self._library = PresetLibrary()
+        self._write_lock = threading.RLock()
+        # Own writes are marked as seen, so they never trigger a reload
+        self._watch = FileWatch(self.config_file)
+        self._file = DebouncedJsonFile(self.config_file, on_written=self._watch.sync)
         self.load()
 
+    @property
+    def library(self):
+        """Current PresetLibrary snapshot; no lock needed."""
+        self.reload_if_changed()
+        return self._library
+
+    @property
+    def presets(self):
+        """Current read-only snapshot (tuple of mappings); no lock needed."""
+        return tuple(self.library.entries.values())
+
+    def reload_if_changed(self):
+        """Pick up edits made outside this instance (e.g. another Designer)."""
+        # Checked under the lock, so no change of this instance can be
+        # scheduled between the checks and the reload
+        with self._write_lock:
+            if self._file.pending or not self._watch.changed():
+                return
+            self.load()
+
+    def _commit(self, library):
+        with self._write_lock:
+            self._library = library
+            self.save()
+
     def load(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    self.presets = json.load(f)
-            except Exception as e:
-                print(f"Error loading presets: {e}")
-                self.presets = []
+        # Falls back to the last good copy if presets.json is corrupt
+        presets = self._file.load()
+        if isinstance(presets, list):
+            self._library = PresetLibrary.from_list(presets)
+        elif os.path.exists(self.config_file):
+            self._library = PresetLibrary()
         else:
             # Default presets
-            self.presets = [
-                {"name": "Upscale", "prompt": "Upscale to 4K"},
-                {
-                    "name": "Edge Wear",
-                    "prompt": "为这张高度图添加边缘破损，保持四方连续",
-                },
-                {
-                    "name": "Make Grunge",
-                    "prompt": "生成一张Grunge Noise Alpha图，保持四方连续",
-                },
-            ]
+            self._library = PresetLibrary.from_list(
+                [
+                    {"name": "Upscale", "prompt": "Upscale to 4K"},
+                    {
+                        "name": "Edge Wear",
+                        "prompt": "为这张高度图添加边缘破损，保持四方连续",
+                    },
+                    {
+                        "name": "Make Grunge",
+                        "prompt": "生成一张Grunge Noise Alpha图，保持四方连续",
+                    },
+                ]
+            )
             self.save()
 
     def save(self):
-        try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.presets, f, indent=4)
-        except Exception as e:
-            print(f"Error saving presets: {e}")
+        # Coalesced write-behind; flush() forces the write
+        self._file.schedule(self._library.to_list())
+
+    def flush(self):
+        self._file.flush()
 
     def get_all_names(self):
-        return [p["name"] for p in self.presets]
+        return list(self.library.entries)
+
+    def get_preset(self, name):
+        return self.library.entries.get(name)
 
     def get_prompt(self, name):
-        for p in self.presets:
-            if p["name"] == name:
-                return p["prompt"]
-        return ""
-
-    def add_preset(self, name, prompt):
-        # Check if exists
-        for p in self.presets:
-            if p["name"] == name:
+        entry = self.library.entries.get(name)
+        return entry["prompt"] if entry else ""
+
+    def get_categories(self):
+        return sorted(self.library.categories)
+
+    def search(self, query="", category=None):
+        """Preset names matching query (word prefixes, CJK substrings)."""
+        return self.library.search(query, category)
+
+    # Mutations build the next snapshot from the current one
+
+    def add_preset(self, name, prompt, tags=None, category=None):
+        with self._write_lock:
+            library = self.library
+            # Check if exists
+            if name in library.entries:
                 return False, "Preset name already exists."
 
-        self.presets.append({"name": name, "prompt": prompt})
-        self.save()
-        return True, "Preset added."
+            entry = make_preset(name, prompt, tags, category)
+            self._commit(library.replace(None, entry))
+            return True, "Preset added."
 
     def update_preset(self, name, new_prompt):
-        for p in self.presets:
-            if p["name"] == name:
-                p["prompt"] = new_prompt
-                self.save()
-                return True, "Preset updated."
-        return False, "Preset not found."
+        with self._write_lock:
+            library = self.library
+            entry = library.entries.get(name)
+            if entry is None:
+                return False, "Preset not found."
+            updated = make_preset(
+                name, new_prompt, entry.get("tags"), entry.get("category")
+            )
+            self._commit(library.replace(name, updated))
+            return True, "Preset updated."
+
+    def set_preset_meta(self, name, tags=None, category=None):
+        """Replace the tags and category of a preset."""
+        with self._write_lock:
+            library = self.library
+            entry = library.entries.get(name)
+            if entry is None:
+                return False, "Preset not found."
+            updated = make_preset(name, entry["prompt"], tags, category)
+            self._commit(library.replace(name, updated))
+            return True, "Preset updated."
 
     def rename_preset(self, old_name, new_name):
         if old_name == new_name:
             return True, "Name unchanged."
 
-        # Check if new name exists
-        for p in self.presets:
-            if p["name"] == new_name:
+        with self._write_lock:
+            library = self.library
+            # Check if new name exists
+            if new_name in library.entries:
                 return False, "New name already exists."
 
-        for p in self.presets:
-            if p["name"] == old_name:
-                p["name"] = new_name
-                self.save()
-                return True, "Preset renamed."
-        return False, "Preset not found."
+            entry = library.entries.get(old_name)
+            if entry is None:
+                return False, "Preset not found."
+            renamed = make_preset(
+                new_name, entry["prompt"], entry.get("tags"), entry.get("category")
+            )
+            self._commit(library.replace(old_name, renamed))
+            return True, "Preset renamed."
 
     def delete_preset(self, name):
-        for i, p in enumerate(self.presets):
-            if p["name"] == name:
-                del self.presets[i]
-                self.save()
-                return True, "Preset deleted."
-        return False, "Preset not found."
+        with self._write_lock:
+            library = self.library
+            if name not in library.entries:
+                return False, "Preset not found."
+            self._commit(library.remove(name))
+            return True, "Preset deleted."
+
+    # --- Bulk import / export ---
+
+    def export_library(self, path, names=None):
+        """
+        Write all presets (or only `names`) to a library JSON file. The file
+        is replaced atomically; no .bak copy is left next to an export.
+
+        Returns:
+            tuple: (success, message)
+        """
+        entries = self.library.entries
+        if names is None:
+            presets = list(entries.values())
+        else:
+            presets = [entries[n] for n in names if n in entries]
+        text = json.dumps(thaw(presets), indent=4, ensure_ascii=False)
+        if not atomic_write_text(path, text, backup=False):
+            return False, f"Failed to write {path}"
+        return True, f"Exported {len(presets)} preset(s)."
+
+    def import_library(self, path, overwrite=False):
+        """
+        Merge a library JSON file (a list of presets, or {"presets": [...]})
+        into the current presets as one change. Existing names are kept
+        unless overwrite is True. The file is read as is; a broken library is
+        reported, never replaced by a stale .bak next to it.
+
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            return False, (
+                f"{os.path.basename(path)} is not valid JSON "
+                f"(line {e.lineno}, column {e.colno}): {e.msg}"
+            )
+        except (OSError, UnicodeDecodeError) as e:
+            return False, f"Cannot read {os.path.basename(path)}: {e}"
+        if isinstance(data, dict):
+            data = data.get("presets")
+        if not isinstance(data, list):
+            return False, "Not a preset library file."
+
+        with self._write_lock:
+            merged = dict(self.library.entries)
+            added = updated = skipped = 0
+            for p in data:
+                if not isinstance(p, dict) or not p.get("name"):
+                    skipped += 1
+                    continue
+                if p["name"] in merged:
+                    if not overwrite:
+                        skipped += 1
+                        continue
+                    updated += 1
+                else:
+                    added += 1
+                merged[p["name"]] = p
+            # One full index build beats thousands of incremental updates
+            self._commit(PresetLibrary.from_list(thaw(list(merged.values()))))
+
+        return True, f"Imported {added} new, {updated} updated, {skipped} skipped."
@@ -0,0 +1,147 @@
+import os
+import io
+import json
+import pstats
+import cProfile
+import threading
+import tracemalloc
+
+from .timing import JobTrace
+
+# Stages that also get a tracemalloc snapshot of their peak allocations
+MEMORY_STAGES = ("build_payload", "parse", "decode")
+
+# cProfile and tracemalloc are process-wide, so only one stage may own each at
+# a time. Stages that start while another job holds them are only timed.
+_owner_lock = threading.Lock()
+_owners = {"profile": None, "memory": None}
+
+
+def _claim(kind, owner):
+    with _owner_lock:
+        if _owners[kind] is None:
+            _owners[kind] = owner
+            return True
+        return False
+
+
+def _release(kind, owner):
+    with _owner_lock:
+        if _owners[kind] is owner:
+            _owners[kind] = None
+
+
+class ProfilingTrace(JobTrace):
+    """
+    JobTrace that also profiles each top-level stage with cProfile and records
+    tracemalloc peaks for MEMORY_STAGES. Only created when profiling is switched
+    on in Settings, so a normal JobTrace pays nothing for it.
+
+    finish() writes <stage>.prof, <stage>.txt and memory.json to
+    <output_dir>/profiles/<job_id>/.
+    """
+
+    def __init__(self, output_dir, job_id=None, provider=None):
+        super().__init__(job_id, provider)
+        self.output_dir = output_dir
+        # stage -> cProfile.Profile, re-enabled for repeated stages
+        self.profiles = {}
+        # stage -> list of {"peak_bytes": int, "top": [str]}
+        self.memory = {}
+        # (span, started tracemalloc) of a memory stage not yet ended
+        self._memory_span = None
+
+    def begin(self, name):
+        span = super().begin(name)
+
+        profile = self.profiles.get(name) or cProfile.Profile()
+        if _claim("profile", profile):
+            try:
+                profile.enable()
+                self.profiles[name] = profile
+            except ValueError:
+                # Another profiler (e.g. a debugger) is already active
+                _release("profile", profile)
+                profile = None
+        else:
+            profile = None
+
+        memory = None
+        if name in MEMORY_STAGES and _claim("memory", span):
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+            memory = started_here
+            self._memory_span = (span, started_here)
+
+        return span, profile, memory
+
+    def end(self, token):
+        span, profile, memory = token
+        super().end(span)
+
+        if profile is not None:
+            profile.disable()
+            _release("profile", profile)
+
+        if memory is not None:
+            self._memory_span = None
+            try:
+                _, peak = tracemalloc.get_traced_memory()
+                top = tracemalloc.take_snapshot().statistics("lineno")[:15]
+                self.memory.setdefault(span[0], []).append(
+                    {"peak_bytes": peak, "top": [str(stat) for stat in top]}
+                )
+            finally:
+                if memory:
+                    tracemalloc.stop()
+                _release("memory", span)
+
+    def _close_memory_span(self):
+        """Stop tracing for a memory stage whose end() was never reached."""
+        if self._memory_span is None:
+            return
+        span, started_here = self._memory_span
+        self._memory_span = None
+        try:
+            if started_here:
+                tracemalloc.stop()
+        finally:
+            _release("memory", span)
+
+    def finish(self):
+        """Write the collected stats; returns the profile directory or None."""
+        for profile in self.profiles.values():
+            # A stage left open by an exception must not keep the profiler busy
+            profile.disable()
+            _release("profile", profile)
+        # Likewise tracemalloc, which would otherwise slow every allocation
+        # and keep later traces from getting memory data
+        self._close_memory_span()
+
+        if not self.profiles and not self.memory:
+            return None
+
+        profile_dir = os.path.join(
+            self.output_dir, "profiles", self.job_id or "unknown"
+        )
+        os.makedirs(profile_dir, exist_ok=True)
+
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(40)
+            with open(
+                os.path.join(profile_dir, f"{name}.txt"), "w", encoding="utf-8"
+            ) as f:
+                f.write(stream.getvalue())
+
+        with open(os.path.join(profile_dir, "memory.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {"stages": self.to_dict()["stages"], "memory": self.memory}, f, indent=4
+            )
+
+        return profile_dir
@@ -4,26 +4,61 @@ import json
 import urllib.request
 import urllib.error
 import ssl
+import threading
+from functools import cached_property
+
+from .config import FileWatch, freeze, thaw
+from .persistence import DebouncedJsonFile
 
 
 class ProviderManager:
     def __init__(self):
         self.config_file = os.path.join(os.path.dirname(__file__), "providers.json")
-        self.providers = []
-        self.logger = sd.getContext().getLogger()
+        # Immutable snapshot, replaced (never mutated) on every change, so worker
+        # threads can read it without locks and never see a half-edited provider
+        self._providers = ()
+        self._write_lock = threading.RLock()
+        # Own writes are marked as seen, so they never trigger a reload
+        self._watch = FileWatch(self.config_file)
+        self._file = DebouncedJsonFile(self.config_file, on_written=self._watch.sync)
         self.load()
 
+    @cached_property
+    def logger(self):
+        # Fetched on first use, not while the plugin starts
+        return sd.getContext().getLogger()
+
+    @property
+    def providers(self):
+        """Current read-only snapshot (tuple of mappings); no lock needed."""
+        self.reload_if_changed()
+        return self._providers
+
+    def reload_if_changed(self):
+        """Pick up edits made outside this instance (e.g. another Designer)."""
+        # Checked under the lock, so no change of this instance can be
+        # scheduled between the checks and the reload
+        with self._write_lock:
+            if self._file.pending or not self._watch.changed():
+                return
+            self.load()
+
+    def _commit(self, providers):
+        with self._write_lock:
+            self._providers = freeze(providers)
+            self.save()
+
     def load(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    self.providers = json.load(f)
-            except Exception as e:
-                self.logger.error(f"Error loading providers: {e}")
-                self.providers = []
+        # Falls back to the last good copy if providers.json is corrupt
+        providers = self._file.load()
+        if isinstance(providers, list):
+            self._providers = freeze(providers)
+        elif os.path.exists(self.config_file):
+            self.logger.error("Error loading providers: no readable providers file")
+            self._providers = ()
         else:
             # Default providers if file doesn't exist
-            self.providers = [
+            providers = [
                 # {
                 #     "name": "Google Gemini",
                 #     "apiKey": "",
@@ -49,14 +84,15 @@ class ProviderManager:
                     "model": "google/gemini-3-pro-image-preview",
                 },
             ]
+            self._providers = freeze(providers)
             self.save()
 
     def save(self):
-        try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.providers, f, indent=4)
-        except Exception as e:
-            self.logger.error(f"Error saving providers: {e}")
+        # Coalesced write-behind; flush() forces the write
+        self._file.schedule(self._providers)
+
+    def flush(self):
+        self._file.flush()
 
     def get_provider(self, name):
         for p in self.providers:
@@ -64,48 +100,61 @@ class ProviderManager:
                 return p
         return None
 
-    def add_provider(self, name, api_key="", base_url="", model=""):
-        # Check if exists
-        for p in self.providers:
-            if p["name"] == name:
-                return False, "Provider name already exists."
+    # Mutations edit a thawed copy and commit it as the next snapshot
 
-        self.providers.append(
-            {"name": name, "apiKey": api_key, "baseUrl": base_url, "model": model}
-        )
-        self.save()
-        return True, "Provider added."
+    def add_provider(self, name, api_key="", base_url="", model=""):
+        with self._write_lock:
+            providers = thaw(self.providers)
+            # Check if exists
+            for p in providers:
+                if p["name"] == name:
+                    return False, "Provider name already exists."
+
+            providers.append(
+                {"name": name, "apiKey": api_key, "baseUrl": base_url, "model": model}
+            )
+            self._commit(providers)
+            return True, "Provider added."
 
     def update_provider(self, original_name, api_key, base_url, model):
-        for p in self.providers:
-            if p["name"] == original_name:
-                p["apiKey"] = api_key
-                p["baseUrl"] = base_url
-                p["model"] = model
-                self.save()
-                return True, "Provider updated."
-        return False, "Provider not found."
+        with self._write_lock:
+            providers = thaw(self.providers)
+            for p in providers:
+                if p["name"] == original_name:
+                    p["apiKey"] = api_key
+                    p["baseUrl"] = base_url
+                    p["model"] = model
+                    self._commit(providers)
+                    return True, "Provider updated."
+            return False, "Provider not found."
 
     def delete_provider(self, name):
-        for i, p in enumerate(self.providers):
-            if p["name"] == name:
-                del self.providers[i]
-                self.save()
-                return True, "Provider deleted."
-        return False, "Provider not found."
+        with self._write_lock:
+            providers = thaw(self.providers)
+            for i, p in enumerate(providers):
+                if p["name"] == name:
+                    del providers[i]
+                    self._commit(providers)
+                    return True, "Provider deleted."
+            return False, "Provider not found."
 
     def get_all_names(self):
         return [p["name"] for p in self.providers]
 
-    def test_connection(self, provider_config):
+    def probe_request(self, provider_config):
+        """
+        URL and headers of the lightweight "list models" call used to check a
+        provider.
+
+        Returns:
+            tuple: (api_url, headers); api_url is None for custom providers
+                that cannot be tested automatically
+        """
         api_key = provider_config.get("apiKey", "")
         base_url = provider_config.get("baseUrl", "")
         name = provider_config.get("name", "")
 
-        if not api_key or not base_url:
-            return False, "Missing API Key or Base URL."
-
-        api_url = ""
+        api_url = None
         headers = {"Content-Type": "application/json"}
 
         # Logic adapted from PS_Banana.jsx
@@ -148,11 +197,38 @@ class ProviderManager:
                     api_url += "/"
                 api_url += "models"
                 headers["Authorization"] = f"Bearer {api_key}"
-            else:
-                return (
-                    True,
-                    "Custom provider: Cannot automatically test. Please verify manually.",
-                )
+
+        return api_url, headers
+
+    def check_probe_response(self, status, response_body):
+        """Interpret the response of a probe_request() call as (success, message)."""
+        if 200 <= status < 300:
+            try:
+                data = json.loads(response_body)
+                # Check for error fields even in 200 response (some APIs are weird)
+                if isinstance(data, dict) and "error" in data:
+                    error = data["error"]
+                    if isinstance(error, dict):
+                        error = error.get("message", "Unknown error")
+                    return False, f"API Error: {error}"
+                return True, "Connection successful!"
+            except json.JSONDecodeError:
+                return False, "Invalid JSON response."
+        return False, f"HTTP Error: {status}"
+
+    def test_connection(self, provider_config):
+        api_key = provider_config.get("apiKey", "")
+        base_url = provider_config.get("baseUrl", "")
+
+        if not api_key or not base_url:
+            return False, "Missing API Key or Base URL."
+
+        api_url, headers = self.probe_request(provider_config)
+        if api_url is None:
+            return (
+                True,
+                "Custom provider: Cannot automatically test. Please verify manually.",
+            )
 
         try:
             # Create request
@@ -166,21 +242,7 @@ class ProviderManager:
             with urllib.request.urlopen(req, context=context, timeout=10) as response:
                 status = response.status
                 response_body = response.read().decode("utf-8")
-
-                if 200 <= status < 300:
-                    try:
-                        data = json.loads(response_body)
-                        # Check for error fields even in 200 response (some APIs are weird)
-                        if "error" in data:
-                            return (
-                                False,
-                                f"API Error: {data['error'].get('message', 'Unknown error')}",
-                            )
-                        return True, "Connection successful!"
-                    except json.JSONDecodeError:
-                        return False, "Invalid JSON response."
-                else:
-                    return False, f"HTTP Error: {status}"
+                return self.check_probe_response(status, response_body)
 
         except urllib.error.HTTPError as e:
             return False, f"HTTP Error: {e.code} - {e.reason}"
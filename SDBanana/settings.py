@@ -1,5 +1,8 @@
 import os
-import json
+import threading
+
+from .config import FileWatch, freeze, DEFAULT_HEALTH_INTERVAL, DEFAULT_SEAM_CHECK
+from .persistence import DebouncedJsonFile
 
 
 DEFAULT_SYSTEM_INSTRUCTION = """
@@ -38,36 +41,65 @@ All generated textures must be strictly **Seamless Tiling** (continuous 4-way ac
 class SettingsManager:
     def __init__(self):
         self.config_file = os.path.join(os.path.dirname(__file__), "settings.json")
-        self.settings = {
+        self.defaults = {
             "debug_mode": False,
+            "profiling_enabled": False,
             "save_generated_images": False,
+            "link_generated_images": False,
             "selected_provider": None,
+            "health_check_interval": DEFAULT_HEALTH_INTERVAL,
+            "seam_check": DEFAULT_SEAM_CHECK,
+            "seam_repair": False,
+            "preview_ladder": False,
             "system_instruction": DEFAULT_SYSTEM_INSTRUCTION,
         }
+        # Immutable snapshot, replaced (never mutated) on every change
+        self._settings = freeze(self.defaults)
+        self._write_lock = threading.RLock()
+        # Own writes are marked as seen, so they never trigger a reload
+        self._watch = FileWatch(self.config_file)
+        self._file = DebouncedJsonFile(self.config_file, on_written=self._watch.sync)
         self.load()
 
+    @property
+    def settings(self):
+        """Current read-only snapshot; change values through set()."""
+        self.reload_if_changed()
+        return self._settings
+
+    def reload_if_changed(self):
+        """Pick up edits made outside this instance (e.g. another Designer)."""
+        # Checked under the lock, so no change of this instance can be
+        # scheduled between the checks and the reload
+        with self._write_lock:
+            if self._file.pending or not self._watch.changed():
+                return
+            self.load()
+
     def load(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    loaded_settings = json.load(f)
-                    # Update defaults with loaded values (preserves new keys if defaults change)
-                    self.settings.update(loaded_settings)
-            except Exception as e:
-                print(f"Error loading settings: {e}")
-        else:
+        # Falls back to the last good copy if settings.json is corrupt
+        loaded_settings = self._file.load()
+        if isinstance(loaded_settings, dict):
+            # Update defaults with loaded values (preserves new keys if defaults change)
+            settings = dict(self.defaults)
+            settings.update(loaded_settings)
+            self._settings = freeze(settings)
+        elif not os.path.exists(self.config_file):
             self.save()
 
     def save(self):
-        try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        # Coalesced write-behind; flush() forces the write
+        self._file.schedule(self._settings)
+
+    def flush(self):
+        self._file.flush()
 
     def get(self, key, default=None):
         return self.settings.get(key, default)
 
     def set(self, key, value):
-        self.settings[key] = value
-        self.save()
+        with self._write_lock:
+            settings = dict(self.settings)
+            settings[key] = freeze(value)
+            self._settings = freeze(settings)
+            self.save()
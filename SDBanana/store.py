@@ -0,0 +1,224 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+from .persistence import atomic_write_text, backup_path, load_json
+
+
+def link_or_copy(source_path, target_path):
+    """
+    Hardlink source_path to target_path (no data is copied when both are on
+    the same filesystem); fall back to a real copy otherwise.
+
+    Returns:
+        str: "hardlink" or "copy"
+    """
+    try:
+        os.link(source_path, target_path)
+        return "hardlink"
+    except (OSError, AttributeError, NotImplementedError):
+        shutil.copy2(source_path, target_path)
+        return "copy"
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_unique(path, mode="xb"):
+    """
+    Create and open a file that did not exist before: path itself, or
+    name_1.ext, name_2.ext, ... when it is taken. The exclusive create makes
+    this safe between threads writing results at the same moment.
+
+    Returns:
+        tuple: (open file object, path actually created)
+    """
+    root, ext = os.path.splitext(path)
+    candidate, counter = path, 0
+    while True:
+        try:
+            return open(candidate, mode), candidate
+        except FileExistsError:
+            counter += 1
+            candidate = f"{root}_{counter}{ext}"
+
+
+class OutputStore:
+    """
+    Content-addressed store for generated images inside the output directory.
+
+    Files are named by their SHA-256, so identical results share one file.
+    Bitmap resources that link a store file directly hold a reference on it;
+    unreferenced files are removed by collect_garbage() rather than deleted
+    right after import.
+
+    refs.json is written atomically with a .bak fallback. Every change
+    re-reads it first, so two Designer instances sharing the output
+    directory keep each other's references. When the references cannot be
+    read at all, garbage collection is skipped rather than treating every
+    store file as unreferenced.
+    """
+
+    def __init__(self, output_dir):
+        self.store_dir = os.path.join(output_dir, "store")
+        self.refs_file = os.path.join(self.store_dir, "refs.json")
+        # content hash -> list of {"package": package path, "url": resource url}
+        self.refs = {}
+        # False while refs.json exists but neither it nor its backup is readable
+        self.loaded = True
+        self._lock = threading.Lock()
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._lock:
+            self.load()
+
+    def load(self):
+        """
+        Re-read refs.json (called with the lock held). On failure the
+        in-memory references are kept and loaded is cleared.
+
+        Returns:
+            bool: True if the references on disk were read (or there are none)
+        """
+        if not any(
+            os.path.exists(p) for p in (self.refs_file, backup_path(self.refs_file))
+        ):
+            self.loaded = True
+            return True
+        refs = load_json(self.refs_file)
+        if not isinstance(refs, dict):
+            print("Error loading store references; store cleanup is disabled")
+            self.loaded = False
+            return False
+        self.refs = refs
+        self.loaded = True
+        return True
+
+    def save(self):
+        """Write the references (called with the lock held)."""
+        atomic_write_text(self.refs_file, json.dumps(self.refs, indent=4))
+
+    def _update(self, change):
+        """
+        Apply change(refs) -> bool to the references as they are on disk now,
+        and write them back if it returned True.
+        """
+        with self._lock:
+            self.load()
+            if change(self.refs):
+                self.save()
+
+    def path_for(self, content_hash, extension):
+        return os.path.join(self.store_dir, f"{content_hash}{extension}")
+
+    def add(self, file_path, content_hash=None, extension=None):
+        """
+        Put file_path into the store (hardlink when possible) and return the
+        durable store path. Identical content is stored only once.
+        """
+        if content_hash is None:
+            content_hash = hash_file(file_path)
+        if extension is None:
+            extension = os.path.splitext(file_path)[1].lower()
+
+        store_path = self.path_for(content_hash, extension)
+        with self._lock:
+            if not os.path.exists(store_path):
+                link_or_copy(file_path, store_path)
+        return store_path
+
+    def _hash_of(self, store_path):
+        return os.path.splitext(os.path.basename(store_path))[0]
+
+    def acquire(self, store_path, package_key, resource_url):
+        """Record that a resource in package_key links store_path."""
+        content_hash = self._hash_of(store_path)
+        entry = {"package": package_key or "", "url": resource_url}
+
+        def change(refs):
+            owners = refs.setdefault(content_hash, [])
+            if entry in owners:
+                return False
+            owners.append(entry)
+            return True
+
+        self._update(change)
+
+    def release(self, store_path, package_key, resource_url):
+        """Drop one reference; the file is removed by the next collect_garbage()."""
+        content_hash = self._hash_of(store_path)
+        entry = {"package": package_key or "", "url": resource_url}
+
+        def change(refs):
+            owners = refs.get(content_hash, [])
+            if entry not in owners:
+                return False
+            owners.remove(entry)
+            if not owners:
+                del refs[content_hash]
+            return True
+
+        self._update(change)
+
+    def ref_count(self, store_path):
+        with self._lock:
+            return len(self.refs.get(self._hash_of(store_path), []))
+
+    def release_missing(self, is_alive):
+        """
+        Drop references whose resource no longer exists.
+
+        is_alive(content_hash, package_key, resource_url) returns True/False, or
+        None when it cannot tell; unknown references are kept. Nothing is
+        dropped while the references could not be loaded.
+        """
+
+        def change(refs):
+            if not self.loaded:
+                return False
+            changed = False
+            for content_hash in list(refs):
+                owners = refs[content_hash]
+                kept = [
+                    o
+                    for o in owners
+                    if is_alive(content_hash, o["package"], o["url"]) is not False
+                ]
+                if len(kept) != len(owners):
+                    changed = True
+                    if kept:
+                        refs[content_hash] = kept
+                    else:
+                        del refs[content_hash]
+            return changed
+
+        self._update(change)
+
+    def collect_garbage(self):
+        """
+        Delete store files nobody references. Returns the number removed;
+        does nothing while refs.json cannot be read.
+        """
+        removed = 0
+        with self._lock:
+            if not self.load():
+                return 0
+            for name in os.listdir(self.store_dir):
+                path = os.path.join(self.store_dir, name)
+                if not os.path.isfile(path) or name.startswith("refs.json"):
+                    continue
+                if os.path.splitext(name)[0] in self.refs:
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except Exception:
+                    pass
+        return removed
@@ -0,0 +1,199 @@
+from PySide6 import QtCore
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QTextEdit,
+    QCheckBox,
+    QSpinBox,
+    QDialogButtonBox,
+)
+
+RESOLUTIONS = ["1K", "2K", "4K"]
+DEFAULT_SWEEP_CONCURRENCY = 2
+MAX_SWEEP_CONCURRENCY = 4
+
+
+def expand_sweep(variants, resolutions):
+    """
+    Expand prompt variants x resolutions into a job matrix.
+
+    Args:
+        variants: List of (label, prompt)
+        resolutions: List of resolution settings ("1K", "2K", "4K")
+
+    Returns:
+        list: Row-major job dicts with "label", "prompt", "resolution", "row"
+            and "column"; one row per variant, one column per resolution
+    """
+    jobs = []
+    for row, (label, prompt) in enumerate(variants):
+        for column, resolution in enumerate(resolutions):
+            jobs.append(
+                {
+                    "label": f"{label} · {resolution}",
+                    "prompt": prompt,
+                    "resolution": resolution,
+                    "row": row,
+                    "column": column,
+                }
+            )
+    return jobs
+
+
+class SweepRunner(QtCore.QObject):
+    """
+    Runs sweep jobs with at most max_concurrency generations in flight.
+
+    start_job(job) must return a worker that is not started yet and has a
+    finished(bool, str) signal (GenerationWorker); the runner connects to it
+    before starting it. When every job is done, finished is emitted with the
+    job list; each job then carries "success", "result" and "worker".
+    """
+
+    progress = QtCore.Signal(int, int)
+    finished = QtCore.Signal(list)
+
+    def __init__(
+        self, jobs, start_job, max_concurrency=DEFAULT_SWEEP_CONCURRENCY, parent=None
+    ):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.start_job = start_job
+        self.max_concurrency = max(1, max_concurrency)
+        self._queue = list(jobs)
+        self._running = 0
+        self._done = 0
+
+    def start(self):
+        if not self.jobs:
+            self.finished.emit(self.jobs)
+            return
+        self._fill()
+
+    def _fill(self):
+        while self._queue and self._running < self.max_concurrency:
+            job = self._queue.pop(0)
+            self._running += 1
+            try:
+                worker = self.start_job(job)
+            except Exception as e:
+                self._on_job_finished(job, False, str(e), None)
+                continue
+            worker.finished.connect(
+                lambda s, r, j=job, w=worker: self._on_job_finished(j, s, r, w)
+            )
+            worker.start()
+
+    def _on_job_finished(self, job, success, result, worker):
+        job["success"] = success
+        job["result"] = result
+        job["worker"] = worker
+        self._running -= 1
+        self._done += 1
+        self.progress.emit(self._done, len(self.jobs))
+        if self._done == len(self.jobs):
+            self.finished.emit(self.jobs)
+        else:
+            self._fill()
+
+
+class SweepDialog(QDialog):
+    """Pick presets, prompt variants and resolutions for a sweep."""
+
+    def __init__(self, preset_manager, current_prompt="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sweep")
+        self.preset_manager = preset_manager
+        self.current_prompt = current_prompt
+
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Presets:"))
+        self.preset_list = QListWidget()
+        for name in preset_manager.get_all_names():
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+            item.setCheckState(QtCore.Qt.Unchecked)
+            self.preset_list.addItem(item)
+        self.preset_list.itemChanged.connect(self._update_count)
+        layout.addWidget(self.preset_list)
+
+        self.chk_current = QCheckBox("Include current prompt")
+        self.chk_current.setChecked(bool(current_prompt.strip()))
+        self.chk_current.setEnabled(bool(current_prompt.strip()))
+        self.chk_current.stateChanged.connect(self._update_count)
+        layout.addWidget(self.chk_current)
+
+        layout.addWidget(QLabel("Prompt variants (one per line):"))
+        self.variants_input = QTextEdit()
+        self.variants_input.setMaximumHeight(100)
+        self.variants_input.textChanged.connect(self._update_count)
+        layout.addWidget(self.variants_input)
+
+        res_row = QHBoxLayout()
+        res_row.addWidget(QLabel("Resolutions:"))
+        self.res_checks = []
+        for resolution in RESOLUTIONS:
+            chk = QCheckBox(resolution)
+            chk.setChecked(resolution == "1K")
+            chk.stateChanged.connect(self._update_count)
+            res_row.addWidget(chk)
+            self.res_checks.append(chk)
+        res_row.addStretch()
+        layout.addLayout(res_row)
+
+        concurrency_row = QHBoxLayout()
+        concurrency_row.addWidget(QLabel("Parallel jobs:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, MAX_SWEEP_CONCURRENCY)
+        self.concurrency_spin.setValue(DEFAULT_SWEEP_CONCURRENCY)
+        concurrency_row.addWidget(self.concurrency_spin)
+        concurrency_row.addStretch()
+        layout.addLayout(concurrency_row)
+
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("color: #888888;")
+        layout.addWidget(self.count_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.ok_button = buttons.button(QDialogButtonBox.Ok)
+
+        self._update_count()
+
+    def variants(self):
+        """Selected (label, prompt) pairs, in display order."""
+        variants = []
+        if self.chk_current.isChecked():
+            variants.append(("Prompt", self.current_prompt))
+        for row in range(self.preset_list.count()):
+            item = self.preset_list.item(row)
+            if item.checkState() == QtCore.Qt.Checked:
+                name = item.text()
+                variants.append((name, self.preset_manager.get_prompt(name)))
+        lines = [
+            line.strip()
+            for line in self.variants_input.toPlainText().splitlines()
+            if line.strip()
+        ]
+        for index, line in enumerate(lines, 1):
+            variants.append((f"Variant {index}", line))
+        return variants
+
+    def resolutions(self):
+        return [chk.text() for chk in self.res_checks if chk.isChecked()]
+
+    def max_concurrency(self):
+        return self.concurrency_spin.value()
+
+    def _update_count(self, *args):
+        count = len(self.variants()) * len(self.resolutions())
+        self.count_label.setText(f"{count} job(s)")
+        if hasattr(self, "ok_button"):
+            self.ok_button.setEnabled(count > 0)
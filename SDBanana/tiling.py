@@ -0,0 +1,324 @@
+import os
+import zlib
+import struct
+from collections import namedtuple
+
+from .config import (  # noqa: F401 (seam check modes are re-exported)
+    SEAM_CHECK_OFF,
+    SEAM_CHECK_FLAG,
+    SEAM_CHECK_RETRY,
+    SEAM_CHECK_MODES,
+    DEFAULT_SEAM_CHECK,
+)
+from .deps import optional_import
+from .store import open_unique
+
+# Regenerations of a failing result in retry mode (each one is a paid call)
+MAX_SEAM_RETRIES = 1
+# Rows / columns on each side of a wrap that give the local baseline
+SEAM_BAND = 8
+# A wrap whose step is this many times the local baseline counts as a seam
+SEAM_THRESHOLD = 2.5
+# Baselines below this (in 0..1 units) are treated as flat, so noise on a
+# near-uniform texture does not blow up the ratios
+NOISE_FLOOR = 1.0 / 255
+
+
+class TilingScore(
+    namedtuple("TilingScore", ["u_edge", "v_edge", "u_gradient", "v_gradient"])
+):
+    """
+    Wrap continuity of a texture, as ratios to the texture's own variation
+    next to each border (about 1.0 for a seamless texture).
+
+    u_* compare the right column with the left one (horizontal tiling), v_*
+    the bottom row with the top one. *_edge measure the step in value across
+    the wrap, *_gradient the break in slope (second difference), which also
+    catches soft seams where the colours match but the lighting does not.
+    """
+
+    __slots__ = ()
+
+    @property
+    def worst(self):
+        return max(self)
+
+    @property
+    def seamless(self):
+        return self.worst <= SEAM_THRESHOLD
+
+    @property
+    def score(self):
+        """1.0 for a perfect wrap, 0.5 at SEAM_THRESHOLD, towards 0 for hard seams."""
+        excess = max(0.0, self.worst - 1.0) / (SEAM_THRESHOLD - 1.0)
+        return 1.0 / (1.0 + excess)
+
+    def to_dict(self):
+        values = {name: round(value, 3) for name, value in self._asdict().items()}
+        values.update(score=round(self.score, 3), seamless=self.seamless)
+        return values
+
+
+def load_pixels(path):
+    """
+    Decode an image to a uint8 / uint16 array of shape (H, W, C) with the
+    alpha channel dropped. Returns None without numpy / Pillow or on error.
+    """
+    np = optional_import("numpy")
+    image_module = optional_import("PIL.Image")
+    if np is None or image_module is None:
+        return None
+    try:
+        with image_module.open(path) as image:
+            if image.mode not in ("L", "RGB", "I;16", "I;16B"):
+                image = image.convert("RGBA" if "A" in image.mode else "RGB")
+            pixels = np.asarray(image)
+    except Exception:
+        return None
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    return pixels[:, :, :3]
+
+
+def _wrap_ratios(np, strip, band):
+    """
+    (edge, gradient) ratio across the wrap of a strip made of the last
+    band + 1 rows followed by the first band + 1 rows; the wrap lies between
+    strip rows band and band + 1.
+    """
+    first = np.abs(np.diff(strip, axis=0)).mean(axis=(1, 2))
+    wrap_step = first[band]
+    baseline = np.median(np.delete(first, band))
+    edge = wrap_step / max(baseline, NOISE_FLOOR)
+
+    # Second differences centred on the two rows touching the wrap
+    second = np.abs(np.diff(strip, n=2, axis=0)).mean(axis=(1, 2))
+    wrap_bend = max(second[band - 1], second[band])
+    baseline = np.median(np.delete(second, (band - 1, band)))
+    gradient = wrap_bend / max(baseline, NOISE_FLOOR)
+    return float(edge), float(gradient)
+
+
+def score_pixels(pixels, band=SEAM_BAND):
+    """
+    TilingScore of an (H, W, C) integer or float array. Only 2 * (band + 1)
+    rows and columns are read, so scoring an already decoded image is cheap;
+    decoding it (load_pixels) is the cost that grows with the area.
+    Returns None for images too small to have a baseline.
+    """
+    np = optional_import("numpy")
+    if np is None:
+        return None
+    height, width = pixels.shape[:2]
+    if min(height, width) < 2 * (band + 2):
+        return None
+    if np.issubdtype(pixels.dtype, np.integer):
+        scale = 1.0 / np.iinfo(pixels.dtype).max
+    else:
+        scale = 1.0
+
+    def strip(rows_last, rows_first):
+        return np.concatenate([rows_last, rows_first]).astype(np.float32) * scale
+
+    # Bottom rows then top rows; columns are swapped into rows the same way
+    v = strip(pixels[-(band + 1) :], pixels[: band + 1])
+    u = strip(
+        pixels[:, -(band + 1) :].swapaxes(0, 1),
+        pixels[:, : band + 1].swapaxes(0, 1),
+    )
+    u_edge, u_gradient = _wrap_ratios(np, u, band)
+    v_edge, v_gradient = _wrap_ratios(np, v, band)
+    return TilingScore(u_edge, v_edge, u_gradient, v_gradient)
+
+
+def score_file(path):
+    """
+    TilingScore of an image file, or None if it cannot be checked. Decodes
+    the whole image; reuse load_pixels output when the pixels are needed again.
+    """
+    pixels = load_pixels(path)
+    return score_pixels(pixels) if pixels is not None else None
+
+
+# --- Local seam repair ---
+
+REPAIR_BLEND = "blend"
+REPAIR_OFFSET = "offset"
+# Fraction of the size over which a gradient-domain correction fades out
+BLEND_DEPTH = 1.0 / 16
+# Fraction of the size next to each border taken from the half-offset copy
+OFFSET_BAND = 1.0 / 8
+# Repaired copies are written next to the original with this suffix
+REPAIRED_SUFFIX = "_seamfix"
+
+
+def repaired_path_for(path):
+    """Preferred path of the repaired copy of an image (see save_pixels)."""
+    return f"{os.path.splitext(path)[0]}{REPAIRED_SUFFIX}.png"
+
+
+def _box_filter_wrapped(np, values, radius):
+    """Moving average along axis 0 that wraps around (the border is a loop)."""
+    padded = np.concatenate([values[-radius:], values, values[: radius + 1]])
+    sums = np.cumsum(padded, axis=0)
+    return (sums[2 * radius + 1 :] - sums[: -2 * radius - 1]) / (2 * radius + 1)
+
+
+def _to_dtype(np, image, dtype):
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return np.clip(np.rint(image), info.min, info.max).astype(dtype)
+    return image.astype(dtype)
+
+
+def _blend_wrap(np, pixels, depth):
+    """
+    Gradient-domain fix of the wrap between the last and first row of an
+    (H, W, C) array (a view for columns), in place. The mismatch between the
+    step across the wrap and the slope on either side is smoothed along the
+    border and spread over `depth` rows on both sides as a linear membrane,
+    so interior gradients are kept; only those 2 * depth rows are touched.
+    """
+    top = pixels[:depth].astype(np.float32)
+    bottom = pixels[-depth:].astype(np.float32)
+    step = top[0] - bottom[-1]
+    expected = ((top[1] - top[0]) + (bottom[-1] - bottom[-2])) / 2
+    mismatch = _box_filter_wrapped(np, step - expected, SEAM_BAND) / 2
+    ramp = (1.0 - np.arange(depth, dtype=np.float32) / depth)[:, None, None]
+    top -= ramp * mismatch
+    bottom += ramp[::-1] * mismatch
+    pixels[:depth] = _to_dtype(np, top, pixels.dtype)
+    pixels[-depth:] = _to_dtype(np, bottom, pixels.dtype)
+
+
+def blend_seams(pixels):
+    """Gradient-domain border correction of both wraps; returns a new array."""
+    np = optional_import("numpy")
+    height, width = pixels.shape[:2]
+    image = pixels.copy()
+    _blend_wrap(np, image, max(2, int(height * BLEND_DEPTH)))
+    _blend_wrap(np, image.swapaxes(0, 1), max(2, int(width * BLEND_DEPTH)))
+    return image
+
+
+def offset_blend(pixels):
+    """
+    Classic offset-and-blend: near the borders the texture is cross-faded
+    into a copy rolled by half its size, whose edges are interior pixels of
+    the original and therefore wrap. Only the border bands are computed.
+    """
+    np = optional_import("numpy")
+    height, width = pixels.shape[:2]
+
+    def weight(size):
+        # 1 at the border, smoothstep down to 0 at OFFSET_BAND of the size
+        band = max(2, int(size * OFFSET_BAND))
+        distance = np.minimum(np.arange(size), np.arange(size)[::-1])
+        t = np.clip(1.0 - distance / band, 0.0, 1.0).astype(np.float32)
+        return t * t * (3 - 2 * t)
+
+    wy, wx = weight(height), weight(width)
+    band_rows = np.nonzero(wy)[0]
+    inner_rows = np.nonzero(wy == 0)[0]
+    band_cols = np.nonzero(wx)[0]
+
+    image = pixels.copy()
+    # Full-width top / bottom bands, then the left / right bands between them
+    for rows, cols in ((band_rows, np.arange(width)), (inner_rows, band_cols)):
+        # take() per axis is much faster than 2-D fancy indexing
+        shifted = np.take(pixels, (rows + height // 2) % height, axis=0)
+        shifted = np.take(shifted, (cols + width // 2) % width, axis=1)
+        original = np.take(np.take(pixels, rows, axis=0), cols, axis=1)
+        original = original.astype(np.float32)
+        alpha = np.maximum(wy[rows][:, None], wx[cols][None, :])[..., None]
+        image[np.ix_(rows, cols)] = _to_dtype(
+            np, original + alpha * (shifted - original), pixels.dtype
+        )
+    return image
+
+
+def repair_pixels(pixels):
+    """
+    Repair the wrap seams of an (H, W, C) array: the gradient-domain blend
+    first (no ghosting, fixes tonal steps), offset-and-blend when that is
+    not enough (lines and structural seams).
+
+    Returns:
+        tuple: (repaired array of the input dtype, method, TilingScore), or
+            None when neither repair produces a seamless texture
+    """
+    if optional_import("numpy") is None:
+        return None
+    for method, repair in ((REPAIR_BLEND, blend_seams), (REPAIR_OFFSET, offset_blend)):
+        repaired = repair(pixels)
+        score = score_pixels(repaired)
+        if score is not None and score.seamless:
+            return repaired, method, score
+    return None
+
+
+# PNG colour type per channel count (grey, RGB)
+_PNG_COLOR_TYPES = {1: 0, 3: 2}
+
+
+def _png_chunk(f, tag, data):
+    f.write(struct.pack(">I", len(data)))
+    f.write(tag)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(tag))))
+
+
+def save_pixels(pixels, path):
+    """
+    Write an (H, W, C) uint8 / uint16 array (1 or 3 channels) as a PNG to a
+    new file (path, or path with a counter when it is taken).
+
+    The PNG is stored uncompressed (no row filters, zlib level 0): deflating
+    a 4K result takes seconds, storing it about a tenth of one. These are
+    working copies imported right away, so size matters less than latency.
+
+    Returns:
+        str: Path written
+    """
+    np = optional_import("numpy")
+    height, width, channels = pixels.shape
+    depth = pixels.dtype.itemsize * 8
+    # Filter type 0 byte in front of every row; PNG samples are big-endian
+    rows = np.zeros((height, 1 + width * channels * depth // 8), dtype=np.uint8)
+    rows[:, 1:] = (
+        pixels.astype(pixels.dtype.newbyteorder(">"), copy=False)
+        .view(np.uint8)
+        .reshape(height, -1)
+    )
+    header = struct.pack(
+        ">IIBBBBB", width, height, depth, _PNG_COLOR_TYPES[channels], 0, 0, 0
+    )
+    f, path = open_unique(path)
+    with f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        _png_chunk(f, b"IHDR", header)
+        _png_chunk(f, b"IDAT", zlib.compress(rows, 0))
+        _png_chunk(f, b"IEND", b"")
+    return path
+
+
+def repair_file(path):
+    """
+    Write a seam-repaired copy of an image next to it (the original is kept).
+
+    Returns:
+        tuple: (repaired path, method, TilingScore), or None if the file
+            cannot be read or repaired
+    """
+    pixels = load_pixels(path)
+    if pixels is None:
+        return None
+    repaired = repair_pixels(pixels)
+    if repaired is None:
+        return None
+    pixels, method, score = repaired
+    try:
+        repaired_path = save_pixels(pixels, repaired_path_for(path))
+    except Exception:
+        return None
+    return repaired_path, method, score
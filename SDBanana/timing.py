@@ -0,0 +1,195 @@
+import os
+import json
+import math
+import time
+import threading
+import contextlib
+
+
+class JobTrace:
+    """
+    Per-job latency trace with monotonic (perf_counter) timestamps.
+
+    Stages are recorded as (name, start offset, seconds) relative to the trace
+    start. The trace is passed down through exporter, generator and importer so
+    a slow job shows where its time went.
+    """
+
+    def __init__(self, job_id=None, provider=None):
+        self.job_id = job_id
+        self.provider = provider
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def begin(self, name):
+        """Open a stage that does not fit a with-block; close it with end()."""
+        return (name, time.perf_counter())
+
+    def end(self, span):
+        name, start = span
+        self.add(name, start, time.perf_counter())
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage name."""
+        span = self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(span)
+
+    def add(self, name, start, end):
+        """Record a stage measured elsewhere from perf_counter() values."""
+        self.stages.append((name, start - self.started, end - start))
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "provider": self.provider,
+            "created": self.created,
+            "total": time.perf_counter() - self.started,
+            "stages": [
+                {"stage": name, "start": round(offset, 6), "seconds": round(sec, 6)}
+                for name, offset, sec in self.stages
+            ],
+        }
+
+
+class _NullTrace:
+    """Stand-in used when no trace is passed; records nothing."""
+
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def begin(self, name):
+        return None
+
+    def end(self, span):
+        pass
+
+    def add(self, name, start, end):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+# Plugin startup timings, kept out of the per-provider job latency table
+STARTUP_TRACE_FILE = "startup.jsonl"
+
+
+class TraceLog:
+    """
+    JSONL file of finished job traces in the output directory, holding the
+    most recent MAX_TRACES of them. Traces are appended; once COMPACT_SLACK
+    more have accumulated the file is rewritten with the newest MAX_TRACES
+    (temp file + rename, like JobJournal.compact()).
+    """
+
+    MAX_TRACES = 1000
+    COMPACT_SLACK = 200
+
+    def __init__(self, output_dir, filename="traces.jsonl"):
+        self.trace_file = os.path.join(output_dir, filename)
+        self._lock = threading.Lock()
+        # Lines in the file, counted on the first append
+        self._lines = None
+        # (size, mtime) of the file the cached summary was computed from
+        self._summary_key = None
+        self._summary = []
+
+    def _count_lines(self):
+        try:
+            with open(self.trace_file, "rb") as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+    def append(self, trace):
+        try:
+            with self._lock:
+                if self._lines is None:
+                    self._lines = self._count_lines()
+                with open(self.trace_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+                self._lines += 1
+                if self._lines > self.MAX_TRACES + self.COMPACT_SLACK:
+                    self._compact()
+        except Exception as e:
+            print(f"Error writing trace log: {e}")
+
+    def _compact(self):
+        """Keep the newest MAX_TRACES lines. Called with the lock held."""
+        with open(self.trace_file, "r", encoding="utf-8") as f:
+            lines = f.readlines()[-self.MAX_TRACES :]
+        temp_file = self.trace_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(temp_file, self.trace_file)
+        self._lines = len(lines)
+
+    def load(self, limit=None):
+        """The most recent limit (default MAX_TRACES) traces, as dicts."""
+        limit = limit or self.MAX_TRACES
+        if not os.path.exists(self.trace_file):
+            return []
+        traces = []
+        try:
+            with open(self.trace_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        traces.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except Exception as e:
+            print(f"Error loading trace log: {e}")
+        return traces[-limit:]
+
+    def summary(self):
+        """
+        Latency per (provider, stage) over the most recent MAX_TRACES traces.
+        The result is cached until the file changes.
+
+        Returns:
+            list: (provider, stage, count, p50, p95) sorted by provider and stage
+        """
+        try:
+            stat = os.stat(self.trace_file)
+            key = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return []
+        if key == self._summary_key:
+            return list(self._summary)
+
+        samples = {}
+        for trace in self.load():
+            provider = trace.get("provider") or "-"
+            for entry in trace.get("stages", []):
+                samples.setdefault((provider, entry["stage"]), []).append(
+                    entry["seconds"]
+                )
+            samples.setdefault((provider, "total"), []).append(trace.get("total", 0))
+
+        rows = []
+        for (provider, stage), values in sorted(samples.items()):
+            values.sort()
+            rows.append(
+                (
+                    provider,
+                    stage,
+                    len(values),
+                    percentile(values, 0.50),
+                    percentile(values, 0.95),
+                )
+            )
+        self._summary_key, self._summary = key, rows
+        return list(rows)
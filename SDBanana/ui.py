@@ -1,4 +1,4 @@
-from PySide6 import QtWidgets, QtCore
+from PySide6 import QtWidgets, QtCore, QtGui
 import sd
 from PySide6.QtWidgets import (
     QWidget,
@@ -14,19 +14,61 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QInputDialog,
     QFileDialog,
+    QListWidget,
+    QListWidgetItem,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QDialog,
+    QSpinBox,
+    QCompleter,
 )
 from PySide6.QtCore import QThread, Signal
 from .providers import ProviderManager
 from .presets import PresetManager
 from .generator import ImageGenerator
-from .importer import (
-    ImageImporter,
-    detect_image_format,
+from .importer import ImageImporter, ImageInfo, IMPORT_MODE_COPY, IMPORT_MODE_LINK
+from .store import OutputStore
+from .timing import JobTrace, TraceLog, NULL_TRACE, STARTUP_TRACE_FILE
+from .config import JobConfig
+from .health import (
+    ProviderHealthMonitor,
+    STATUS_UNKNOWN,
+    STATUS_HEALTHY,
+    STATUS_DEGRADED,
+    STATUS_DOWN,
+)
+from .sweep import SweepDialog, SweepRunner, expand_sweep
+from .gallery import ResultsGallery, ThumbnailCache, make_thumbnail
+from .journal import (
+    JobJournal,
+    STAGE_SUBMITTED,
+    STAGE_GENERATING,
+    STAGE_GENERATED,
+    STAGE_IMPORTED,
+    STAGE_PREVIEWED,
+    STAGE_FAILED,
+    STAGE_DROPPED,
 )
 from .exporter import NodeExporter
+from .tiling import (
+    load_pixels,
+    score_pixels,
+    repair_pixels,
+    repaired_path_for,
+    save_pixels,
+    SEAM_CHECK_OFF,
+    SEAM_CHECK_FLAG,
+    SEAM_CHECK_RETRY,
+    DEFAULT_SEAM_CHECK,
+    MAX_SEAM_RETRIES,
+)
+from .upscale import upscale_file, PREVIEW_RESOLUTION
 from .settings import SettingsManager, DEFAULT_SYSTEM_INSTRUCTION
 import os
 import json
+import time
+from functools import cached_property
 
 
 class GenerationWorker(QThread):
@@ -46,6 +88,15 @@ class GenerationWorker(QThread):
         debug_mode,
         input_image_path,
         insert_position=None,
+        exporter=None,
+        journal=None,
+        job_id=None,
+        thumbnail_cache=None,
+        trace=None,
+        config=None,
+        seam_check=SEAM_CHECK_OFF,
+        seam_repair=False,
+        upscale_to=None,
     ):
         super().__init__()
         self.generator = generator
@@ -56,22 +107,223 @@ class GenerationWorker(QThread):
         self.debug_mode = debug_mode
         self.input_image_path = input_image_path
         self.insert_position = insert_position
+        self.exporter = exporter
+        self.journal = journal
+        self.job_id = job_id
+        self.thumbnail_cache = thumbnail_cache
+        self.trace = trace
+        self.config = config
+        self.seam_check = seam_check
+        self.seam_repair = seam_repair
+        # Target resolution of a preview generated at self.resolution
+        self.upscale_to = upscale_to
+        self.submitted = time.perf_counter()
+        self.image_info = None
+        self.thumbnail_path = None
+        # TilingScore of the kept result, and regenerations spent on seams
+        self.tiling = None
+        self.seam_retries = 0
+        # {"method", "original_path", "tiling_before"} when the kept result
+        # was repaired locally, else None
+        self.repair = None
+        # {"source_path", "generated", "upscaled_to"} for a preview, else None
+        self.preview = None
+
+    def _record(self, stage, **fields):
+        if self.journal and self.job_id:
+            self.journal.update(self.job_id, stage, **fields)
+
+    def _generate(self):
+        """One generate_image call; returns (success, result, image_info)."""
+        success, result = self.generator.generate_image(
+            self.prompt,
+            self.provider_name,
+            resolution=self.resolution,
+            search_web=self.search_web,
+            debug_mode=self.debug_mode,
+            input_image_path=self.input_image_path,
+            trace=self.trace,
+            config=self.config,
+            job_id=self.job_id,
+        )
+        # Probe made from the in-memory bytes, reused by the importer
+        image_info = self.generator.pop_image_info(result) if success else None
+        return success, result, image_info
+
+    def _score_and_repair(self, result, image_info):
+        """
+        Score one result and, if its seams show and repair is enabled, swap
+        in a locally repaired copy (the original file is kept next to it).
+        The result is decoded once; its pixels serve the score, the repair
+        and the upscale.
+
+        Returns:
+            tuple: (result, image_info, TilingScore or None, repair or None,
+                decoded pixels of result or None)
+        """
+        trace = self.trace or NULL_TRACE
+        with trace.stage("seam_check"):
+            pixels = load_pixels(result)
+            tiling = score_pixels(pixels) if pixels is not None else None
+        if tiling is None or tiling.seamless or not self.seam_repair:
+            return result, image_info, tiling, None, pixels
+        with trace.stage("seam_repair"):
+            repaired = repair_pixels(pixels)
+            if repaired is None:
+                return result, image_info, tiling, None, pixels
+            repaired_pixels, method, repaired_tiling = repaired
+            try:
+                repaired_path = save_pixels(repaired_pixels, repaired_path_for(result))
+            except Exception:
+                return result, image_info, tiling, None, pixels
+            # Repairs work per channel, so a gray source stays gray
+            repaired_info = ImageInfo.from_pixels(
+                repaired_path,
+                repaired_pixels,
+                is_grayscale=image_info.is_grayscale if image_info else None,
+            )
+        repair = {
+            "method": method,
+            "original_path": result,
+            "tiling_before": tiling.to_dict(),
+        }
+        return repaired_path, repaired_info, repaired_tiling, repair, repaired_pixels
+
+    def _check_seams(self, result, image_info):
+        """
+        Score the result's wrap seams and repair them locally if enabled. In
+        retry mode a result that still fails is generated again (up to
+        MAX_SEAM_RETRIES times) and the best-tiling one is kept; the files of
+        the others are deleted.
+
+        Returns:
+            tuple: (result, image_info, decoded pixels of result or None)
+        """
+        result, image_info, self.tiling, self.repair, pixels = self._score_and_repair(
+            result, image_info
+        )
+        retries = MAX_SEAM_RETRIES if self.seam_check == SEAM_CHECK_RETRY else 0
+        while self.tiling is not None and not self.tiling.seamless and retries:
+            retries -= 1
+            self.seam_retries += 1
+            success, retry_result, retry_info = self._generate()
+            if not success:
+                break
+            retry = self._score_and_repair(retry_result, retry_info)
+            if retry[2] is not None and retry[2].score > self.tiling.score:
+                discard = (result, self.repair)
+                result, image_info, self.tiling, self.repair, pixels = retry
+            else:
+                discard = (retry[0], retry[3])
+            for path in (discard[0], discard[1] and discard[1]["original_path"]):
+                # Names are unique, but never delete the result being kept
+                if path and path != result:
+                    self.generator.discard_result(path)
+        return result, image_info, pixels
+
+    def _upscale(self, result, image_info, pixels=None):
+        """
+        Local tileable upscale of a preview result to upscale_to, from its
+        decoded pixels when the seam check already has them. The source is
+        imported as is when it cannot be upscaled.
+
+        Returns:
+            tuple: (result, image_info) to import
+        """
+        with (self.trace or NULL_TRACE).stage("upscale"):
+            upscaled = upscale_file(result, self.upscale_to, pixels=pixels)
+            self.preview = {
+                "source_path": result,
+                "generated": self.resolution,
+                "upscaled_to": self.upscale_to if upscaled else None,
+            }
+            if upscaled is None:
+                return result, image_info
+            return upscaled, ImageInfo.from_file(upscaled)
 
     def run(self):
+        if self.trace:
+            self.trace.add("queue", self.submitted, time.perf_counter())
         try:
-            success, result = self.generator.generate_image(
-                self.prompt,
-                self.provider_name,
-                resolution=self.resolution,
-                search_web=self.search_web,
-                debug_mode=self.debug_mode,
-                input_image_path=self.input_image_path,
-            )
+            if self.exporter and self.input_image_path:
+                # PNG -> WebP conversion of the exported selection, off the UI thread
+                self.input_image_path = self.exporter.finalize_export(
+                    self.input_image_path, trace=self.trace
+                )
+            self._record(STAGE_GENERATING, input_image_path=self.input_image_path)
+            success, result, self.image_info = self._generate()
+            if success:
+                # Decoded once by the seam check, then shared with the upscale
+                pixels = None
+                if self.seam_check != SEAM_CHECK_OFF or self.seam_repair:
+                    result, self.image_info, pixels = self._check_seams(
+                        result, self.image_info
+                    )
+                if self.upscale_to:
+                    result, self.image_info = self._upscale(
+                        result, self.image_info, pixels
+                    )
+                # Recorded before the UI sees it, so a crash can still re-import
+                self._record(
+                    STAGE_GENERATED,
+                    output_path=result,
+                    tiling=self.tiling.to_dict() if self.tiling else None,
+                    seam_retries=self.seam_retries,
+                    repair=self.repair,
+                    preview=self.preview,
+                )
+                if self.thumbnail_cache:
+                    try:
+                        _, self.thumbnail_path = make_thumbnail(
+                            self.thumbnail_cache, result
+                        )
+                    except Exception:
+                        pass
+            else:
+                self._record(STAGE_FAILED, error=str(result))
             self.finished.emit(success, str(result))
         except Exception as e:
+            self._record(STAGE_FAILED, error=str(e))
             self.finished.emit(False, str(e))
 
 
+class SelectionExportTask(QtCore.QObject):
+    """
+    Drives NodeExporter.iter_export_selected_nodes on the main thread, one SD
+    API call per event-loop iteration, so the UI stays responsive while the
+    selection is computed and saved.
+    """
+
+    finished = Signal(bool, object)
+
+    def __init__(self, exporter, selected_nodes, parent=None, trace=None):
+        super().__init__(parent)
+        self.trace = trace
+        self.steps = exporter.iter_export_selected_nodes(selected_nodes, trace=trace)
+
+    def start(self):
+        self.started = time.perf_counter()
+        QtCore.QTimer.singleShot(0, self._step)
+
+    def _finish(self, success, result):
+        if self.trace:
+            # Whole export including the event-loop gaps between steps
+            self.trace.add("export", self.started, time.perf_counter())
+        self.finished.emit(success, result)
+
+    def _step(self):
+        try:
+            next(self.steps)
+        except StopIteration as stop:
+            success, result = stop.value
+            self._finish(success, result)
+            return
+        except Exception as e:
+            self._finish(False, str(e))
+            return
+        QtCore.QTimer.singleShot(0, self._step)
+
+
 class TestConnectionWorker(QThread):
     """
     Worker thread for testing API connection.
@@ -92,6 +344,75 @@ class TestConnectionWorker(QThread):
             self.finished.emit(False, str(e))
 
 
+class ModelFetchWorker(QThread):
+    """
+    Worker thread that refreshes cached provider model lists.
+    """
+
+    finished = Signal(dict)
+
+    def __init__(self, model_catalog, names=None, force=False):
+        super().__init__()
+        self.model_catalog = model_catalog
+        self.names = names
+        self.force = force
+
+    def run(self):
+        try:
+            errors = self.model_catalog.refresh(self.names, self.force)
+        except Exception as e:
+            errors = {"": str(e)}
+        self.finished.emit(errors)
+
+
+class PresetListModel(QtCore.QAbstractListModel):
+    """
+    Preset names for the preset picker, row 0 being the placeholder. Rows are
+    only materialised when the view asks for them, so filtering thousands of
+    presets is a list swap plus one model reset.
+    """
+
+    PLACEHOLDER = "--- Select Preset ---"
+
+    def __init__(self, preset_manager, parent=None):
+        super().__init__(parent)
+        self.preset_manager = preset_manager
+        self.names = []
+
+    def set_names(self, names):
+        self.beginResetModel()
+        self.names = names
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.names) + 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self.PLACEHOLDER if row == 0 else self.names[row - 1]
+        if role == QtCore.Qt.ToolTipRole and row > 0:
+            preset = self.preset_manager.get_preset(self.names[row - 1])
+            if preset:
+                tags = ", ".join(preset.get("tags", ()))
+                return preset["prompt"] + (f"\n[{tags}]" if tags else "")
+        return None
+
+
+# Provider combo text colour per health status
+HEALTH_COLORS = {
+    STATUS_HEALTHY: "#6cc070",
+    STATUS_DEGRADED: "#e0a040",
+    STATUS_DOWN: "#e05050",
+}
+
+
+# Delay before store cleanup, model discovery and health probes start
+DEFERRED_STARTUP_MS = 3000
+
+
 class SDBananaPanel(QWidget):
     """
     SDBanana Main Panel
@@ -100,21 +421,93 @@ class SDBananaPanel(QWidget):
 
     def __init__(self, parent=None):
         super(SDBananaPanel, self).__init__(parent)
-        self.logger = sd.getContext().getLogger()
+        # Only what the Generate tab needs is created here; the SD-facing
+        # managers below are cached properties created on first use
         self.settings_manager = SettingsManager()
-        self.current_settings = self.settings_manager.settings
 
         self.provider_manager = ProviderManager()
         self.preset_manager = PresetManager()
         self.image_generator = ImageGenerator(
             self.provider_manager, self.settings_manager
         )
-        self.importer = ImageImporter()
-        self.exporter = NodeExporter()
-
         self.active_workers = []
+        self.active_exports = []
+        self.active_sweeps = []
+        # Background model-list refreshes; kept apart from active_workers,
+        # which counts queued generations
+        self.model_fetch_workers = []
+        self.settings_tab_built = False
         self.init_ui()
 
+        # Disk and network housekeeping waits until Designer has finished starting
+        QtCore.QTimer.singleShot(DEFERRED_STARTUP_MS, self._deferred_startup)
+
+    @cached_property
+    def logger(self):
+        return sd.getContext().getLogger()
+
+    @cached_property
+    def journal(self):
+        return JobJournal(self.image_generator.output_dir)
+
+    @cached_property
+    def thumbnail_cache(self):
+        return ThumbnailCache(self.image_generator.output_dir)
+
+    @cached_property
+    def trace_log(self):
+        return TraceLog(self.image_generator.output_dir)
+
+    @cached_property
+    def startup_log(self):
+        return TraceLog(self.image_generator.output_dir, STARTUP_TRACE_FILE)
+
+    @cached_property
+    def gallery(self):
+        """Results gallery, placed in its tab the first time it is needed."""
+        gallery = ResultsGallery(self.image_generator.output_dir, self.thumbnail_cache)
+        self.gallery_tab.layout().addWidget(gallery)
+        return gallery
+
+    @cached_property
+    def output_store(self):
+        return OutputStore(self.image_generator.output_dir)
+
+    @cached_property
+    def importer(self):
+        return ImageImporter(store=self.output_store)
+
+    @cached_property
+    def exporter(self):
+        return NodeExporter()
+
+    @cached_property
+    def health_monitor(self):
+        return ProviderHealthMonitor(
+            self.provider_manager, self.current_settings.get("health_check_interval", 0)
+        )
+
+    def _deferred_startup(self):
+        # Replays (and compacts) the job journal
+        self.refresh_jobs_ui()
+
+        # Remove store files no saved package links any more
+        try:
+            self.importer.collect_store_garbage()
+        except Exception as e:
+            self.logger.warning(f"SDBanana: store cleanup failed: {e}")
+
+        # Revalidate stale model lists of every provider in the background
+        self.fetch_models()
+
+        # Probes run in the background; the Settings tab polls their results
+        self.health_monitor.start()
+
+    @property
+    def current_settings(self):
+        """Read-only settings snapshot; change values via settings_manager.set()."""
+        return self.settings_manager.settings
+
     def init_ui(self):
         """Initialize UI"""
         # Main Layout
@@ -148,9 +541,18 @@ class SDBananaPanel(QWidget):
         tab1 = self.create_generation_tab()
         self.tab_widget.addTab(tab1, "Generate")
 
-        # Tab 2 - Settings
-        tab2 = self.create_settings_tab()
-        self.tab_widget.addTab(tab2, "Settings")
+        # Tab 2 - Results, the gallery is created the first time it is needed
+        self.gallery_tab = QWidget()
+        gallery_tab_layout = QVBoxLayout(self.gallery_tab)
+        gallery_tab_layout.setContentsMargins(0, 0, 0, 0)
+        self.tab_widget.addTab(self.gallery_tab, "Results")
+
+        # Tab 3 - Settings, built the first time it is shown
+        self.settings_tab = QWidget()
+        settings_tab_layout = QVBoxLayout(self.settings_tab)
+        settings_tab_layout.setContentsMargins(0, 0, 0, 0)
+        self.tab_widget.addTab(self.settings_tab, "Settings")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
 
         main_layout.addWidget(self.tab_widget)
 
@@ -163,6 +565,43 @@ class SDBananaPanel(QWidget):
         self.setLayout(main_layout)
         self.setMinimumSize(400, 600)
 
+    def on_tab_changed(self, index):
+        widget = self.tab_widget.widget(index)
+        if widget is self.settings_tab:
+            self.ensure_settings_tab()
+        elif widget is self.gallery_tab:
+            # Creating the gallery places it in the tab
+            getattr(self, "gallery")
+
+    def ensure_settings_tab(self):
+        """Build the Settings tab on first use"""
+        if self.settings_tab_built:
+            return
+        self.settings_tab_built = True
+
+        started = time.perf_counter()
+        self.settings_tab.layout().addWidget(self.create_settings_tab())
+        self.logger.info(
+            f"SDBanana: Settings tab built in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+        # Health probes run in the background; poll their results while built
+        self.health_timer = QtCore.QTimer(self)
+        self.health_timer.setInterval(2000)
+        self.health_timer.timeout.connect(self.refresh_health_ui)
+        self.health_timer.start()
+        self.refresh_health_ui()
+
+    def selected_provider_name(self):
+        """Provider chosen in Settings, without building the Settings tab"""
+        if self.settings_tab_built:
+            return self.provider_combo.currentText()
+        names = self.provider_manager.get_all_names()
+        saved_provider = self.current_settings.get("selected_provider")
+        if saved_provider in names:
+            return saved_provider
+        return names[0] if names else ""
+
     def get_plugin_version(self):
         """Read version from pluginInfo.json in the parent directory"""
         try:
@@ -197,6 +636,11 @@ class SDBananaPanel(QWidget):
 
         self.preset_combo = QComboBox()
         self.preset_combo.setStyleSheet(self._get_combo_style())
+        self.preset_model = PresetListModel(self.preset_manager, self.preset_combo)
+        self.preset_combo.setModel(self.preset_model)
+        # Uniform rows let the popup lay out only what is visible
+        self.preset_combo.view().setUniformItemSizes(True)
+        self.preset_combo.setMaxVisibleItems(20)
         self.preset_combo.currentIndexChanged.connect(self.on_preset_changed)
         preset_row1_layout.addWidget(self.preset_combo, 1)
 
@@ -207,6 +651,30 @@ class SDBananaPanel(QWidget):
 
         layout.addWidget(preset_row1)
 
+        # Search row: filters the preset list as you type
+        preset_search_row = QWidget()
+        preset_search_layout = QHBoxLayout(preset_search_row)
+        preset_search_layout.setContentsMargins(0, 5, 0, 0)
+
+        self.preset_search = QLineEdit()
+        self.preset_search.setPlaceholderText("Search presets (name, prompt, tags)")
+        self.preset_search.setStyleSheet(self._get_input_style())
+        self.preset_search.textChanged.connect(self.on_preset_search_changed)
+        preset_search_layout.addWidget(self.preset_search, 1)
+
+        self.preset_category_combo = QComboBox()
+        self.preset_category_combo.setStyleSheet(self._get_combo_style())
+        self.preset_category_combo.currentIndexChanged.connect(self.refresh_presets_ui)
+        preset_search_layout.addWidget(self.preset_category_combo)
+
+        # Coalesce keystrokes into one search
+        self.preset_search_timer = QtCore.QTimer(self)
+        self.preset_search_timer.setSingleShot(True)
+        self.preset_search_timer.setInterval(150)
+        self.preset_search_timer.timeout.connect(self.refresh_presets_ui)
+
+        layout.addWidget(preset_search_row)
+
         # Second row: Buttons
         preset_row2 = QWidget()
         preset_row2_layout = QHBoxLayout(preset_row2)
@@ -253,6 +721,33 @@ class SDBananaPanel(QWidget):
 
         layout.addWidget(preset_row2)
 
+        # Third row: tags and bulk import / export
+        preset_row3 = QWidget()
+        preset_row3_layout = QHBoxLayout(preset_row3)
+        preset_row3_layout.setContentsMargins(0, 5, 0, 0)
+
+        self.btn_tag_preset = QPushButton("Tags")
+        self.btn_tag_preset.setFixedWidth(60)
+        self.btn_tag_preset.setStyleSheet(btn_style)
+        self.btn_tag_preset.clicked.connect(self.on_tag_preset)
+        preset_row3_layout.addWidget(self.btn_tag_preset)
+
+        self.btn_import_presets = QPushButton("Import")
+        self.btn_import_presets.setFixedWidth(70)
+        self.btn_import_presets.setStyleSheet(btn_style)
+        self.btn_import_presets.clicked.connect(self.on_import_presets)
+        preset_row3_layout.addWidget(self.btn_import_presets)
+
+        self.btn_export_presets = QPushButton("Export")
+        self.btn_export_presets.setFixedWidth(70)
+        self.btn_export_presets.setStyleSheet(btn_style)
+        self.btn_export_presets.clicked.connect(self.on_export_presets)
+        preset_row3_layout.addWidget(self.btn_export_presets)
+
+        preset_row3_layout.addStretch()
+
+        layout.addWidget(preset_row3)
+
         # Prompt Input
         prompt_label = QLabel("Prompt:")
         prompt_label.setStyleSheet("color: #cccccc; font-weight: bold; padding: 5px;")
@@ -306,6 +801,25 @@ class SDBananaPanel(QWidget):
         self.generate_button.clicked.connect(self.on_generate_clicked)
         gen_layout.addWidget(self.generate_button, 2)
 
+        self.sweep_button = QPushButton("Sweep...")
+        self.sweep_button.setMinimumHeight(40)
+        self.sweep_button.setStyleSheet(
+            """
+            QPushButton {
+                background-color: #444444;
+                color: #ffffff;
+                border: none;
+                border-radius: 4px;
+                padding: 10px;
+                font-size: 12px;
+            }
+            QPushButton:hover { background-color: #555555; }
+            QPushButton:pressed { background-color: #333333; }
+        """
+        )
+        self.sweep_button.clicked.connect(self.on_sweep_clicked)
+        gen_layout.addWidget(self.sweep_button)
+
         # Regenerate and Load Last Prompt buttons removed
 
         layout.addWidget(gen_group)
@@ -329,6 +843,17 @@ class SDBananaPanel(QWidget):
         arrow_label.setStyleSheet("color: #888888; font-size: 10px; padding-left: 2px;")
         res_layout.addWidget(arrow_label)
 
+        # Resolution ladder: generate at 1K, upscale locally, finalize later
+        self.chk_preview = QCheckBox("1K preview")
+        self.chk_preview.setStyleSheet("color: #cccccc;")
+        self.chk_preview.setToolTip(
+            "Generate at 1K and upscale locally to the output resolution;\n"
+            "finalize the chosen result at native resolution from Unfinished Jobs"
+        )
+        self.chk_preview.setChecked(self.current_settings.get("preview_ladder", False))
+        self.chk_preview.stateChanged.connect(self.on_preview_changed)
+        res_layout.addWidget(self.chk_preview)
+
         # Search Web Toggle removed
 
         res_layout.addSpacing(8)
@@ -411,6 +936,63 @@ class SDBananaPanel(QWidget):
         self.export_nodes_btn.setVisible(self.current_settings.get("debug_mode", False))
         layout.addWidget(self.export_nodes_btn)
 
+        # Unfinished jobs from the journal (shown only when there are any)
+        self.jobs_group = QWidget()
+        jobs_layout = QVBoxLayout(self.jobs_group)
+        jobs_layout.setContentsMargins(0, 10, 0, 0)
+
+        jobs_label = QLabel("Unfinished Jobs:")
+        jobs_label.setStyleSheet("color: #cccccc; font-weight: bold;")
+        jobs_layout.addWidget(jobs_label)
+
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMaximumHeight(100)
+        self.jobs_list.setStyleSheet(
+            """
+            QListWidget {
+                background-color: #1e1e1e;
+                color: #ffffff;
+                border: 1px solid #444444;
+                border-radius: 4px;
+                font-size: 11px;
+            }
+        """
+        )
+        jobs_layout.addWidget(self.jobs_list)
+
+        jobs_btn_row = QWidget()
+        jobs_btn_layout = QHBoxLayout(jobs_btn_row)
+        jobs_btn_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.btn_resume_job = QPushButton("Resume")
+        self.btn_resume_job.setStyleSheet(btn_style)
+        self.btn_resume_job.clicked.connect(self.on_resume_job)
+        jobs_btn_layout.addWidget(self.btn_resume_job)
+
+        self.btn_reimport_job = QPushButton("Re-import")
+        self.btn_reimport_job.setStyleSheet(btn_style)
+        self.btn_reimport_job.clicked.connect(self.on_reimport_job)
+        jobs_btn_layout.addWidget(self.btn_reimport_job)
+
+        self.btn_finalize_job = QPushButton("Finalize")
+        self.btn_finalize_job.setStyleSheet(btn_style)
+        self.btn_finalize_job.setToolTip(
+            "Generate the preview's prompt again from scratch at its native "
+            "resolution (a new image, not a refinement of the preview); the "
+            "result replaces the preview's node and resource"
+        )
+        self.btn_finalize_job.clicked.connect(self.on_finalize_job)
+        jobs_btn_layout.addWidget(self.btn_finalize_job)
+
+        self.btn_drop_job = QPushButton("Drop")
+        self.btn_drop_job.setStyleSheet(btn_style)
+        self.btn_drop_job.clicked.connect(self.on_drop_job)
+        jobs_btn_layout.addWidget(self.btn_drop_job)
+
+        jobs_layout.addWidget(jobs_btn_row)
+        self.jobs_group.setVisible(False)
+        layout.addWidget(self.jobs_group)
+
         # Spacer
         layout.addSpacing(8)
 
@@ -503,6 +1085,37 @@ class SDBananaPanel(QWidget):
         actions_layout.addWidget(self.btn_test)
         layout.addWidget(actions_row)
 
+        # Provider health (background probes)
+        health_row = QWidget()
+        health_layout = QHBoxLayout(health_row)
+        health_layout.setContentsMargins(0, 5, 0, 0)
+
+        self.health_label = QLabel("Health: not checked")
+        self.health_label.setStyleSheet("color: #888888;")
+        health_layout.addWidget(self.health_label, 1)
+
+        self.btn_fastest = QPushButton("Use Fastest")
+        self.btn_fastest.setStyleSheet(btn_style)
+        self.btn_fastest.setEnabled(False)
+        self.btn_fastest.clicked.connect(self.on_use_fastest_provider)
+        health_layout.addWidget(self.btn_fastest)
+
+        interval_label = QLabel("Check every (s):")
+        interval_label.setStyleSheet("color: #cccccc;")
+        health_layout.addWidget(interval_label)
+
+        self.health_interval_spin = QSpinBox()
+        self.health_interval_spin.setRange(0, 3600)
+        self.health_interval_spin.setToolTip("0 turns background health checks off")
+        self.health_interval_spin.setKeyboardTracking(False)
+        self.health_interval_spin.setValue(
+            self.current_settings.get("health_check_interval", 0)
+        )
+        self.health_interval_spin.valueChanged.connect(self.on_health_interval_changed)
+        health_layout.addWidget(self.health_interval_spin)
+
+        layout.addWidget(health_row)
+
         # --- Fields ---
         # API Key
         key_label = QLabel("API Key:")
@@ -532,10 +1145,33 @@ class SDBananaPanel(QWidget):
         )
         layout.addWidget(model_label)
 
+        model_row = QWidget()
+        model_layout = QHBoxLayout(model_row)
+        model_layout.setContentsMargins(0, 0, 0, 0)
+
         self.model_input = QLineEdit()
         self.model_input.setPlaceholderText("gemini-3-pro-image-preview")
         self.model_input.setStyleSheet(self._get_input_style())
-        layout.addWidget(self.model_input)
+        # Completions come from the provider's cached /models list
+        self.model_completer = QCompleter([], self.model_input)
+        self.model_completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.model_completer.setFilterMode(QtCore.Qt.MatchContains)
+        self.model_input.setCompleter(self.model_completer)
+        self.model_input.textChanged.connect(self.update_model_hint)
+        model_layout.addWidget(self.model_input, 1)
+
+        self.btn_refresh_models = QPushButton("Refresh")
+        self.btn_refresh_models.setStyleSheet(btn_style)
+        self.btn_refresh_models.setToolTip("Fetch the provider's model list again")
+        self.btn_refresh_models.clicked.connect(self.on_refresh_models)
+        model_layout.addWidget(self.btn_refresh_models)
+
+        layout.addWidget(model_row)
+
+        self.model_hint = QLabel("")
+        self.model_hint.setWordWrap(True)
+        self.model_hint.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self.model_hint)
 
         # --- System Instruction Section ---
         sys_instr_label = QLabel("System Instruction:")
@@ -602,6 +1238,27 @@ class SDBananaPanel(QWidget):
         self.chk_debug.stateChanged.connect(self.on_debug_changed)
         layout.addWidget(self.chk_debug)
 
+        self.chk_profiling = QCheckBox(
+            "Enable Profiling (cProfile + memory stats per job in output folder)"
+        )
+        self.chk_profiling.setStyleSheet(
+            """
+            QCheckBox {
+                color: #cccccc;
+                padding-bottom: 5px;
+            }
+            QCheckBox::indicator {
+                width: 15px;
+                height: 15px;
+            }
+        """
+        )
+        self.chk_profiling.setChecked(
+            self.current_settings.get("profiling_enabled", False)
+        )
+        self.chk_profiling.stateChanged.connect(self.on_profiling_changed)
+        layout.addWidget(self.chk_profiling)
+
         self.chk_save_images = QCheckBox("Save Generated Images")
         self.chk_save_images.setStyleSheet(
             """
@@ -621,6 +1278,71 @@ class SDBananaPanel(QWidget):
         self.chk_save_images.stateChanged.connect(self.on_save_images_changed)
         layout.addWidget(self.chk_save_images)
 
+        self.chk_link_images = QCheckBox(
+            "Link Generated Images (no copy, hardlink next to package)"
+        )
+        self.chk_link_images.setStyleSheet(
+            """
+            QCheckBox {
+                color: #cccccc;
+                padding-top: 5px;
+            }
+            QCheckBox::indicator {
+                width: 15px;
+                height: 15px;
+            }
+        """
+        )
+        self.chk_link_images.setChecked(
+            self.current_settings.get("link_generated_images", False)
+        )
+        self.chk_link_images.stateChanged.connect(self.on_link_images_changed)
+        layout.addWidget(self.chk_link_images)
+
+        # Seamless-tiling check of every result before import
+        seam_row = QWidget()
+        seam_layout = QHBoxLayout(seam_row)
+        seam_layout.setContentsMargins(0, 5, 0, 0)
+
+        seam_label = QLabel("Seam check:")
+        seam_label.setStyleSheet("color: #cccccc;")
+        seam_layout.addWidget(seam_label)
+
+        self.seam_check_combo = QComboBox()
+        self.seam_check_combo.setStyleSheet(self._get_combo_style())
+        for text, mode in (
+            ("Off", SEAM_CHECK_OFF),
+            ("Flag non-tiling results", SEAM_CHECK_FLAG),
+            ("Regenerate non-tiling results once", SEAM_CHECK_RETRY),
+        ):
+            self.seam_check_combo.addItem(text, mode)
+        self.seam_check_combo.setToolTip(
+            "Checks that the texture wraps across U and V before it is imported"
+        )
+        self.seam_check_combo.setCurrentIndex(
+            max(
+                0,
+                self.seam_check_combo.findData(
+                    self.current_settings.get("seam_check", DEFAULT_SEAM_CHECK)
+                ),
+            )
+        )
+        self.seam_check_combo.currentIndexChanged.connect(self.on_seam_check_changed)
+        seam_layout.addWidget(self.seam_check_combo, 1)
+
+        layout.addWidget(seam_row)
+
+        # Local seam repair, tried before any paid regeneration
+        self.chk_seam_repair = QCheckBox("Repair seams locally")
+        self.chk_seam_repair.setStyleSheet(self.chk_link_images.styleSheet())
+        self.chk_seam_repair.setToolTip(
+            "Blends the borders of a non-tiling result so it wraps; with\n"
+            "Save Generated Images on, the unrepaired file is kept next to it"
+        )
+        self.chk_seam_repair.setChecked(self.current_settings.get("seam_repair", False))
+        self.chk_seam_repair.stateChanged.connect(self.on_seam_repair_changed)
+        layout.addWidget(self.chk_seam_repair)
+
         # Open Debug Log Folder Button
         self.btn_open_debug_log = QPushButton("Open Debug Log Folder")
         self.btn_open_debug_log.setStyleSheet(
@@ -641,6 +1363,56 @@ class SDBananaPanel(QWidget):
         self.btn_open_debug_log.clicked.connect(self.on_open_debug_log_clicked)
         layout.addWidget(self.btn_open_debug_log)
 
+        # --- Latency Summary ---
+        latency_row = QWidget()
+        latency_layout = QHBoxLayout(latency_row)
+        latency_layout.setContentsMargins(0, 15, 0, 0)
+
+        latency_label = QLabel("Stage Latency (p50 / p95):")
+        latency_label.setStyleSheet("color: #cccccc; font-weight: bold;")
+        latency_layout.addWidget(latency_label)
+        latency_layout.addStretch()
+
+        self.btn_refresh_latency = QPushButton("Refresh")
+        self.btn_refresh_latency.setStyleSheet(btn_style)
+        self.btn_refresh_latency.clicked.connect(self.refresh_latency_ui)
+        latency_layout.addWidget(self.btn_refresh_latency)
+        layout.addWidget(latency_row)
+
+        self.latency_table = QTableWidget(0, 5)
+        self.latency_table.setHorizontalHeaderLabels(
+            ["Provider", "Stage", "Jobs", "p50 (s)", "p95 (s)"]
+        )
+        self.latency_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeToContents
+        )
+        self.latency_table.verticalHeader().setVisible(False)
+        self.latency_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.latency_table.setMinimumHeight(150)
+        self.latency_table.setStyleSheet(
+            """
+            QTableWidget {
+                background-color: #1e1e1e;
+                color: #cccccc;
+                border: 1px solid #444444;
+                font-size: 11px;
+            }
+            QHeaderView::section {
+                background-color: #2b2b2b;
+                color: #cccccc;
+                border: none;
+                padding: 3px;
+            }
+        """
+        )
+        layout.addWidget(self.latency_table)
+
+        # Plugin startup time, recorded apart from the job traces
+        self.startup_label = QLabel("")
+        self.startup_label.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self.startup_label)
+        self.refresh_latency_ui()
+
         # Spacer
         layout.addStretch()
 
@@ -717,10 +1489,10 @@ class SDBananaPanel(QWidget):
             self.key_input.setText(provider.get("apiKey", ""))
             self.url_input.setText(provider.get("baseUrl", ""))
             self.model_input.setText(provider.get("model", ""))
+        self.update_model_completions()
 
         # Save selected provider to settings
         if name:
-            self.current_settings["selected_provider"] = name
             self.settings_manager.set("selected_provider", name)
 
     def on_add_provider(self):
@@ -747,6 +1519,8 @@ class SDBananaPanel(QWidget):
             name, self.key_input.text(), self.url_input.text(), self.model_input.text()
         )
         if success:
+            self.health_monitor.probe_now()
+            self.fetch_models([name])
             QMessageBox.information(self, "Success", "Provider configuration saved!")
         else:
             QMessageBox.warning(self, "Error", msg)
@@ -810,9 +1584,133 @@ class SDBananaPanel(QWidget):
         else:
             QMessageBox.critical(self, "Connection Failed", msg)
 
+    # --- Model Discovery ---
+
+    def _editor_provider_config(self):
+        """Provider config as currently typed in the editor"""
+        return {
+            "name": self.provider_combo.currentText(),
+            "apiKey": self.key_input.text(),
+            "baseUrl": self.url_input.text(),
+            "model": self.model_input.text(),
+        }
+
+    def update_model_completions(self):
+        """Offer the cached models of the current provider"""
+        name = self.provider_combo.currentText()
+        models = self.image_generator.model_catalog.models(name) or []
+        self.model_completer.model().setStringList(models)
+        self.update_model_hint()
+
+    def update_model_hint(self, *args):
+        config = self._editor_provider_config()
+        catalog = self.image_generator.model_catalog
+        models = catalog.models(config["name"])
+        ok, message = catalog.validate(config, config["model"])
+        if not ok:
+            self.model_hint.setStyleSheet("color: #e0a040; font-size: 11px;")
+            self.model_hint.setText(message)
+        elif models:
+            self.model_hint.setStyleSheet("color: #888888; font-size: 11px;")
+            self.model_hint.setText(f"{len(models)} models available")
+        else:
+            self.model_hint.setText("")
+
+    def fetch_models(self, names=None, force=False):
+        """Refresh model lists in the background (all providers by default)"""
+        worker = getattr(self, "model_fetch_worker", None)
+        if worker is not None and worker.isRunning():
+            # Catch up on whatever went stale meanwhile once it finishes
+            self.model_fetch_pending = True
+            return
+        self.model_fetch_pending = False
+        self.model_fetch_worker = ModelFetchWorker(
+            self.image_generator.model_catalog, names, force
+        )
+        self.model_fetch_worker.finished.connect(self.on_models_fetched)
+        self.model_fetch_worker.start()
+        self.model_fetch_workers.append(self.model_fetch_worker)
+        if self.settings_tab_built:
+            self.btn_refresh_models.setEnabled(False)
+
+    def on_refresh_models(self):
+        name = self.provider_combo.currentText()
+        if name:
+            self.fetch_models([name], force=True)
+
+    def on_models_fetched(self, errors):
+        sender = self.sender()
+        if sender in self.model_fetch_workers:
+            self.model_fetch_workers.remove(sender)
+
+        for name, error in errors.items():
+            self.logger.warning(f"SDBanana: model list of {name} not fetched: {error}")
+
+        if self.model_fetch_pending:
+            self.fetch_models()
+        if not self.settings_tab_built:
+            return
+
+        self.btn_refresh_models.setEnabled(True)
+        self.update_model_completions()
+        name = self.provider_combo.currentText()
+        if name in errors and sender.force:
+            self.model_hint.setStyleSheet("color: #e05050; font-size: 11px;")
+            self.model_hint.setText(f"Could not fetch models: {errors[name]}")
+
+    # --- Provider Health ---
+
+    def _health_text(self, health):
+        if not health or health["status"] == STATUS_UNKNOWN:
+            return "not checked"
+        text = health["status"]
+        if health["p50"] is not None:
+            text += f", {health['p50'] * 1000:.0f} ms median"
+        text += f", {health['error_rate']:.0%} errors of {health['probes']} probes"
+        if health["last_error"]:
+            text += f" ({health['last_error']})"
+        return text
+
+    def refresh_health_ui(self):
+        """Show the latest probe results on the provider combo"""
+        snapshot = self.health_monitor.snapshot()
+        names = []
+        for i in range(self.provider_combo.count()):
+            name = self.provider_combo.itemText(i)
+            names.append(name)
+            health = snapshot.get(name)
+            self.provider_combo.setItemData(
+                i, self._health_text(health), QtCore.Qt.ToolTipRole
+            )
+            color = HEALTH_COLORS.get(health["status"]) if health else None
+            self.provider_combo.setItemData(
+                i, QtGui.QColor(color) if color else None, QtCore.Qt.ForegroundRole
+            )
+
+        current = self.provider_combo.currentText()
+        self.health_label.setText(f"Health: {self._health_text(snapshot.get(current))}")
+
+        fastest = self.health_monitor.fastest_healthy(names)
+        self.btn_fastest.setEnabled(bool(fastest) and fastest != current)
+        self.btn_fastest.setToolTip(
+            f"Switch to {fastest}" if fastest else "No healthy provider yet"
+        )
+
+    def on_use_fastest_provider(self):
+        fastest = self.health_monitor.fastest_healthy(
+            self.provider_manager.get_all_names()
+        )
+        index = self.provider_combo.findText(fastest) if fastest else -1
+        if index >= 0:
+            self.provider_combo.setCurrentIndex(index)
+            self.refresh_health_ui()
+
+    def on_health_interval_changed(self, value):
+        self.settings_manager.set("health_check_interval", value)
+        self.health_monitor.set_interval(value)
+
     def on_debug_changed(self, state):
         is_checked = state == QtCore.Qt.Checked
-        self.current_settings["debug_mode"] = is_checked
         self.settings_manager.set("debug_mode", is_checked)
 
         # Toggle visibility of debug buttons
@@ -823,13 +1721,64 @@ class SDBananaPanel(QWidget):
         if is_checked:
             self.logger.info("Debug Mode Enabled")
 
+    def on_profiling_changed(self, state):
+        is_checked = state == QtCore.Qt.Checked
+        self.settings_manager.set("profiling_enabled", is_checked)
+        if is_checked:
+            self.logger.info("Profiling Enabled")
+
+    def _new_trace(self, provider_name):
+        """JobTrace for a new job; a ProfilingTrace when profiling is on."""
+        if self.current_settings.get("profiling_enabled", False):
+            # Imported on demand so the profiling machinery costs nothing when off
+            from .profiling import ProfilingTrace
+
+            return ProfilingTrace(
+                self.image_generator.output_dir, provider=provider_name
+            )
+        return JobTrace(provider=provider_name)
+
     def on_save_images_changed(self, state):
         is_checked = state == QtCore.Qt.Checked
-        self.current_settings["save_generated_images"] = is_checked
         self.settings_manager.set("save_generated_images", is_checked)
         if is_checked:
             print("Save Generated Images Enabled")
 
+    def on_link_images_changed(self, state):
+        is_checked = state == QtCore.Qt.Checked
+        self.settings_manager.set("link_generated_images", is_checked)
+
+    def on_seam_check_changed(self, index):
+        self.settings_manager.set("seam_check", self.seam_check_combo.itemData(index))
+
+    def on_preview_changed(self, state):
+        self.settings_manager.set("preview_ladder", state == QtCore.Qt.Checked)
+
+    def on_seam_repair_changed(self, state):
+        self.settings_manager.set("seam_repair", state == QtCore.Qt.Checked)
+
+    def _get_import_mode(self):
+        if self.current_settings.get("link_generated_images", False):
+            return IMPORT_MODE_LINK
+        return IMPORT_MODE_COPY
+
+    def refresh_latency_ui(self):
+        """Fill the latency table from the recent job traces."""
+        rows = self.trace_log.summary()
+        self.latency_table.setRowCount(len(rows))
+        for row, (provider, stage, count, p50, p95) in enumerate(rows):
+            values = [provider, stage, str(count), f"{p50:.3f}", f"{p95:.3f}"]
+            for column, value in enumerate(values):
+                self.latency_table.setItem(row, column, QTableWidgetItem(value))
+
+        totals = [row for row in self.startup_log.summary() if row[1] == "total"]
+        if totals:
+            _, _, count, p50, p95 = totals[0]
+            self.startup_label.setText(
+                f"Plugin startup: p50 {p50 * 1000:.0f} ms / p95 {p95 * 1000:.0f} ms "
+                f"over {count} start(s)"
+            )
+
     def on_open_debug_log_clicked(self):
         """Open the debug log directory in file explorer"""
         # Get directory from generator instance since it has it defined
@@ -845,19 +1794,49 @@ class SDBananaPanel(QWidget):
 
     # --- Preset Event Handlers ---
 
-    def refresh_presets_ui(self):
+    def refresh_presets_ui(self, *args):
+        """Re-run the preset search and refill the picker and category filter"""
+        # Category filter
+        current_category = self.preset_category_combo.currentData()
+        self.preset_category_combo.blockSignals(True)
+        self.preset_category_combo.clear()
+        self.preset_category_combo.addItem("All categories", None)
+        for category in self.preset_manager.get_categories():
+            self.preset_category_combo.addItem(category, category)
+        index = self.preset_category_combo.findData(current_category)
+        self.preset_category_combo.setCurrentIndex(max(index, 0))
+        self.preset_category_combo.blockSignals(False)
+
+        # Preset list
         current_text = self.preset_combo.currentText()
         self.preset_combo.blockSignals(True)
-        self.preset_combo.clear()
-        names = ["--- Select Preset ---"] + self.preset_manager.get_all_names()
-        self.preset_combo.addItems(names)
+        self.preset_model.set_names(
+            self.preset_manager.search(
+                self.preset_search.text(), self.preset_category_combo.currentData()
+            )
+        )
 
         index = self.preset_combo.findText(current_text)
-        if index >= 0:
-            self.preset_combo.setCurrentIndex(index)
+        self.preset_combo.setCurrentIndex(max(index, 0))
 
         self.preset_combo.blockSignals(False)
 
+    def on_preset_search_changed(self, text):
+        self.preset_search_timer.start()
+
+    def _select_preset(self, name):
+        index = self.preset_combo.findText(name)
+        if index < 0:
+            # Not matched by the current search; clear the filter to show it
+            self.preset_search.blockSignals(True)
+            self.preset_search.clear()
+            self.preset_search.blockSignals(False)
+            self.preset_category_combo.setCurrentIndex(0)
+            self.refresh_presets_ui()
+            index = self.preset_combo.findText(name)
+        if index >= 0:
+            self.preset_combo.setCurrentIndex(index)
+
     def on_preset_changed(self):
         name = self.preset_combo.currentText()
         prompt = self.preset_manager.get_prompt(name)
@@ -872,9 +1851,7 @@ class SDBananaPanel(QWidget):
             )
             if success:
                 self.refresh_presets_ui()
-                index = self.preset_combo.findText(text)
-                if index >= 0:
-                    self.preset_combo.setCurrentIndex(index)
+                self._select_preset(text)
             else:
                 QMessageBox.warning(self, "Error", msg)
 
@@ -903,9 +1880,7 @@ class SDBananaPanel(QWidget):
             success, msg = self.preset_manager.rename_preset(old_name, new_name)
             if success:
                 self.refresh_presets_ui()
-                index = self.preset_combo.findText(new_name)
-                if index >= 0:
-                    self.preset_combo.setCurrentIndex(index)
+                self._select_preset(new_name)
             else:
                 QMessageBox.warning(self, "Error", msg)
 
@@ -928,12 +1903,79 @@ class SDBananaPanel(QWidget):
             else:
                 QMessageBox.warning(self, "Error", msg)
 
+    def on_tag_preset(self):
+        name = self.preset_combo.currentText()
+        preset = self.preset_manager.get_preset(name)
+        if not preset:
+            return
+
+        tags, ok = QInputDialog.getText(
+            self,
+            "Preset Tags",
+            "Tags (comma separated):",
+            text=", ".join(preset.get("tags", ())),
+        )
+        if not ok:
+            return
+        category, ok = QInputDialog.getText(
+            self, "Preset Category", "Category:", text=preset.get("category", "")
+        )
+        if not ok:
+            return
+
+        success, msg = self.preset_manager.set_preset_meta(
+            name, tags.split(","), category
+        )
+        if success:
+            self.refresh_presets_ui()
+            self._select_preset(name)
+        else:
+            QMessageBox.warning(self, "Error", msg)
+
+    def on_import_presets(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Presets", "", "Preset Library (*.json)"
+        )
+        if not file_path:
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Import Presets",
+            "Overwrite existing presets with the same name?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        success, msg = self.preset_manager.import_library(
+            file_path, overwrite=reply == QMessageBox.Yes
+        )
+        if success:
+            self.refresh_presets_ui()
+            QMessageBox.information(self, "Import Presets", msg)
+        else:
+            QMessageBox.warning(self, "Error", msg)
+
+    def on_export_presets(self):
+        """Export the presets currently listed (search and category applied)"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Presets", "presets_library.json", "Preset Library (*.json)"
+        )
+        if not file_path:
+            return
+
+        success, msg = self.preset_manager.export_library(
+            file_path, self.preset_model.names
+        )
+        if success:
+            QMessageBox.information(self, "Export Presets", msg)
+        else:
+            QMessageBox.warning(self, "Error", msg)
+
     # --- System Instruction Event Handlers ---
 
     def on_save_sys_instr(self):
         """Save the system instruction to settings"""
         text = self.sys_instr_input.toPlainText()
-        self.current_settings["system_instruction"] = text
         self.settings_manager.set("system_instruction", text)
         QMessageBox.information(self, "Success", "System instruction saved!")
 
@@ -959,91 +2001,83 @@ class SDBananaPanel(QWidget):
             QMessageBox.warning(self, "Warning", "Please enter a prompt.")
             return
 
-        provider_name = self.provider_combo.currentText()
+        provider_name = self.selected_provider_name()
         if not provider_name:
             QMessageBox.warning(self, "Warning", "Please select a provider.")
             return
 
-        self.status_label.setText("Checking selection...")
-        QtWidgets.QApplication.processEvents()
+        # Snapshot the request now; the export below finishes asynchronously
+        request = {
+            "prompt": prompt,
+            "provider_name": provider_name,
+            "resolution": self.res_combo.currentText(),
+            "preview": self.current_settings.get("preview_ladder", False),
+            "debug_mode": self.current_settings.get("debug_mode", False),
+            "seam_check": self.current_settings.get("seam_check", DEFAULT_SEAM_CHECK),
+            "seam_repair": self.current_settings.get("seam_repair", False),
+        }
 
-        # Reset planned insert position
-        self.insert_position_for_next_import = None
+        trace = self._new_trace(provider_name)
 
         # Check for selected nodes for Image-to-Image
         selected_nodes = self.exporter.get_selected_nodes()
-        input_image_path = None
-
-        if selected_nodes:
-            self.status_label.setText("Exporting selected node(s)...")
-            QtWidgets.QApplication.processEvents()
-
-            success, result = self.exporter.export_selected_nodes()
-            if success and result:
-                # result is a list of file paths
-                input_image_path = result[0]  # Use the first exported image
-
-                # Compute center position of selected nodes for insert
-                try:
-                    positions = []
-                    for n in selected_nodes:
-                        pos = n.getPosition()
-                        x = getattr(pos, "x", None)
-                        y = getattr(pos, "y", None)
-                        if x is None or y is None:
-                            try:
-                                x = pos[0]
-                                y = pos[1]
-                            except Exception:
-                                x = 0
-                                y = 0
-                        positions.append((x, y))
-                    xs = [p[0] for p in positions]
-                    ys = [p[1] for p in positions]
-                    center_x = (min(xs) + max(xs)) / 2.0
-                    center_y = (min(ys) + max(ys)) / 2.0
-                    # Apply offset for single selection to avoid overlap
-                    offset_x = 150 if len(selected_nodes) == 1 else 0
-                    offset_y = 0
-                    center_x += offset_x
-                    center_y += offset_y
-                    self.insert_position_for_next_import = (center_x, center_y)
-
-                except Exception:
-                    pass
-                    self.insert_position_for_next_import = None
-            else:
-                # Export failed, ask user if they want to continue with text-to-image
-                reply = QMessageBox.question(
-                    self,
-                    "Export Failed",
-                    f"Failed to export selected node for Image-to-Image:\n{result}\n\nContinue with Text-to-Image generation?",
-                    QMessageBox.Yes | QMessageBox.No,
-                    QMessageBox.No,
-                )
-                if reply == QMessageBox.No:
-                    self.status_label.setText("Ready")
-                    return
-                # If Yes, input_image_path remains None, proceeds as Text-to-Image
-                self.insert_position_for_next_import = None
 
+        if not selected_nodes:
+            self._start_generation(request, None, None, trace=trace)
+            return
+
+        # Compute center position of selected nodes for insert
+        insert_pos = self._get_selection_position(selected_nodes)
+
+        # Export in small main-thread slices; conversion and encoding happen
+        # later in the generation worker
+        self.status_label.setText("Exporting selected node(s)...")
+        task = SelectionExportTask(
+            self.exporter, selected_nodes, parent=self, trace=trace
+        )
+        task.finished.connect(
+            lambda s, r, t=task: self.on_selection_exported(
+                s, r, t, request, insert_pos
+            )
+        )
+        self.active_exports.append(task)
+        self.update_generate_button_text()
+        task.start()
+
+    def on_selection_exported(self, success, result, task, request, insert_pos):
+        """Start generation once the staged selection export has finished."""
+        if task in self.active_exports:
+            self.active_exports.remove(task)
+        task.deleteLater()
+
+        if success and result:
+            # result is a list of file paths; use the first exported image
+            self._start_generation(request, result[0], insert_pos, trace=task.trace)
+            return
+
+        # Export failed, ask user if they want to continue with text-to-image
+        reply = QMessageBox.question(
+            self,
+            "Export Failed",
+            f"Failed to export selected node for Image-to-Image:\n{result}\n\nContinue with Text-to-Image generation?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        if reply == QMessageBox.No:
+            self.update_generate_button_text()
+            return
+        # If Yes, proceed as Text-to-Image
+        self._start_generation(request, None, None, trace=task.trace)
+
+    def _start_generation(
+        self, request, input_image_path, insert_pos, job_id=None, trace=None
+    ):
         self.status_label.setText(
             f"Generating image (Queue: {len(self.active_workers) + 1})..."
         )
 
-        # Determine effective insert position
-        insert_pos = getattr(self, "insert_position_for_next_import", None)
-
-        # Create and start worker
-        worker = GenerationWorker(
-            self.image_generator,
-            prompt,
-            provider_name,
-            resolution=self.res_combo.currentText(),
-            search_web=False,
-            debug_mode=self.chk_debug.isChecked(),
-            input_image_path=input_image_path,
-            insert_position=insert_pos,
+        worker = self._create_worker(
+            request, input_image_path, insert_pos, job_id=job_id, trace=trace
         )
 
         # Use a default argument in lambda to capture the specific worker instance
@@ -1056,8 +2090,76 @@ class SDBananaPanel(QWidget):
 
         worker.start()
 
+    def _create_worker(
+        self, request, input_image_path, insert_pos, job_id=None, trace=None
+    ):
+        """Journal the job and build its (unstarted) GenerationWorker."""
+        if job_id is None:
+            job_id = self.journal.new_job(request, insert_pos, input_image_path)
+        if trace is None:
+            trace = self._new_trace(request["provider_name"])
+        trace.job_id = job_id
+
+        # Configuration is captured now; later edits never reach this job
+        config = JobConfig(
+            provider=self.provider_manager.get_provider(request["provider_name"]),
+            system_instruction=self.settings_manager.get("system_instruction", ""),
+        )
+
+        # Preview mode: generate at 1K and upscale locally to the target
+        resolution, upscale_to = request["resolution"], None
+        if request.get("preview") and resolution != PREVIEW_RESOLUTION:
+            resolution, upscale_to = PREVIEW_RESOLUTION, resolution
+
+        return GenerationWorker(
+            self.image_generator,
+            request["prompt"],
+            request["provider_name"],
+            resolution=resolution,
+            search_web=False,
+            debug_mode=request["debug_mode"],
+            input_image_path=input_image_path,
+            insert_position=insert_pos,
+            exporter=self.exporter,
+            journal=self.journal,
+            job_id=job_id,
+            thumbnail_cache=self.thumbnail_cache,
+            trace=trace,
+            config=config,
+            seam_check=request.get("seam_check", DEFAULT_SEAM_CHECK),
+            seam_repair=request.get("seam_repair", False),
+            upscale_to=upscale_to,
+        )
+
+    def _get_selection_position(self, selected_nodes):
+        """Center of the selected nodes (offset for a single node), or None."""
+        try:
+            positions = []
+            for n in selected_nodes:
+                pos = n.getPosition()
+                x = getattr(pos, "x", None)
+                y = getattr(pos, "y", None)
+                if x is None or y is None:
+                    try:
+                        x = pos[0]
+                        y = pos[1]
+                    except Exception:
+                        x = 0
+                        y = 0
+                positions.append((x, y))
+            xs = [p[0] for p in positions]
+            ys = [p[1] for p in positions]
+            center_x = (min(xs) + max(xs)) / 2.0
+            center_y = (min(ys) + max(ys)) / 2.0
+            # Apply offset for single selection to avoid overlap
+            offset_x = 150 if len(selected_nodes) == 1 else 0
+            offset_y = 0
+            return (center_x + offset_x, center_y + offset_y)
+        except Exception:
+            return None
+
     def update_generate_button_text(self):
-        count = len(self.active_workers)
+        count = len(self.active_workers) + len(self.active_exports)
         if count > 0:
             self.generate_button.setText(f"Generating {count} image(s)...")
             self.generate_button.setStyleSheet(
@@ -1105,48 +2207,486 @@ class SDBananaPanel(QWidget):
 
         self.update_generate_button_text()
 
-        # Retrieve input_image_path from the worker to clean it up if needed
-        input_image_path = worker.input_image_path
-
         if success:
-            # Import to SD
-            # Use resolution store in worker, or current combo?
             # Ideally worker uses its own resolution to match generation.
-            # But the worker stores 'resolution' which was passed to generate_image.
-            current_resolution = worker.resolution
-
-            import_success, import_msg = self.importer.import_image(
+            import_success, import_msg = self._import_job_result(
+                worker.job_id,
                 result,
-                insert_position=worker.insert_position,
-                resolution=current_resolution,
-                aspect_ratio="1:1",  # Currently hardcoded, can be extended later
+                worker.input_image_path,
+                worker.insert_position,
+                worker.upscale_to or worker.resolution,
+                image_info=worker.image_info,
+                trace=worker.trace,
+                preview=worker.preview is not None,
             )
 
-            # Cleanup Generated Image if "Save Generated Images" is False
-            if not self.chk_save_images.isChecked():
-                try:
-                    if os.path.exists(result):
-                        os.remove(result)
-                except Exception:
-                    pass
-
-            # Cleanup Input Image (Always cleanup temp export)
-            if input_image_path and os.path.exists(input_image_path):
-                try:
-                    os.remove(input_image_path)
-
-                except Exception:
-                    pass
-
-            # Show simple success message
-            if import_success:
-                QMessageBox.information(self, "Success", "Image generation completed!")
+            # Report without a modal dialog; the result lands in the gallery
+            label = worker.prompt.replace("\n", " ")
+            if len(label) > 24:
+                label = label[:24] + "..."
+            seam_note = self._seam_note(worker)
+            if seam_note:
+                label = f"⚠ {label}"
+                self.logger.warning(f"SDBanana: {result} has {seam_note}")
+            if worker.preview:
+                label = f"{label} (preview)"
+                if import_success and worker.preview["upscaled_to"]:
+                    self._remove_unsaved(worker.preview["source_path"])
+            self.gallery.add_result(result, label, worker.thumbnail_path)
+            if worker.repair:
+                self.logger.info(
+                    f"SDBanana: Seams repaired locally ({worker.repair['method']}) "
+                    f"from {worker.repair['original_path']}"
+                )
+                if import_success:
+                    self._remove_unsaved(worker.repair["original_path"])
+            if import_success and seam_note:
+                self.status_label.setText(f"Image imported with {seam_note}")
+            elif import_success and worker.preview:
+                self.status_label.setText(self._preview_note(worker.preview))
+            elif import_success and worker.repair:
+                self.status_label.setText(
+                    f"Image imported, seams repaired locally ({worker.repair['method']})"
+                )
+            elif import_success:
+                self.status_label.setText("Image generation completed!")
             else:
-                QMessageBox.warning(
-                    self, "Warning", f"Image generated but import failed:\n{import_msg}"
+                self.status_label.setText("Image generated but import failed")
+                self.logger.warning(
+                    f"SDBanana: Image generated but import failed: {import_msg}"
                 )
         else:
-            QMessageBox.critical(self, "Error", f"Generation failed:\n{result}")
+            self.status_label.setText("Generation failed")
+            self.logger.error(f"SDBanana: Generation failed: {result}")
+
+        self._record_trace(worker.trace)
+
+        self.refresh_jobs_ui()
+
+    def _remove_unsaved(self, path):
+        """Delete an intermediate file unless "Save Generated Images" is on."""
+        if self.current_settings.get("save_generated_images", False):
+            return
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass
+
+    def _preview_note(self, preview):
+        if preview["upscaled_to"]:
+            note = (
+                f"Preview imported ({preview['generated']} upscaled to "
+                f"{preview['upscaled_to']})"
+            )
+        else:
+            note = f"Preview imported at {preview['generated']}"
+        return f"{note}; Finalize in Unfinished Jobs regenerates it at full size"
+
+    def _seam_note(self, worker):
+        """Short warning for a result whose edges do not tile, or ""."""
+        tiling = worker.tiling
+        if tiling is None or tiling.seamless:
+            return ""
+        note = f"visible seams (tiling score {tiling.score:.2f})"
+        if worker.seam_retries:
+            note += f" after {worker.seam_retries} retry"
+        return note
+
+    def _record_trace(self, trace):
+        """Append a finished job trace and write its profile, if any."""
+        if not trace:
+            return
+        self.trace_log.append(trace)
+        if hasattr(trace, "finish"):
+            try:
+                profile_dir = trace.finish()
+                if profile_dir:
+                    self.logger.info(f"SDBanana: Profile saved to {profile_dir}")
+            except Exception as e:
+                self.logger.warning(f"SDBanana: Failed to write profile: {e}")
+
+    def _import_job_result(
+        self,
+        job_id,
+        result,
+        input_image_path,
+        insert_position,
+        resolution,
+        image_info=None,
+        trace=None,
+        preview=False,
+    ):
+        """
+        Import a generated image and record the outcome in the job journal.
+
+        On import failure the generated file is kept and the job stays in the
+        "generated" stage so it can be re-imported later. A preview goes to
+        the "previewed" stage and keeps its input image for finalization; what
+        it created is journaled, so the finalized result can replace it.
+        """
+        job = self.journal.get(job_id) if job_id else None
+        replace = job.get("preview_import") if job and not preview else None
+        import_span = trace.begin("import") if trace else None
+        import_success, import_msg = self.importer.import_image(
+            result,
+            insert_position=insert_position,
+            resolution=resolution,
+            aspect_ratio="1:1",  # Currently hardcoded, can be extended later
+            image_info=image_info,
+            import_mode=self._get_import_mode(),
+            trace=trace,
+            replace=replace,
+        )
+        if trace:
+            trace.end(import_span)
+
+        if not import_success:
+            if job_id:
+                self.journal.update(job_id, STAGE_GENERATED, import_error=import_msg)
+            return import_success, import_msg
+
+        if job_id:
+            self.journal.update(
+                job_id,
+                STAGE_PREVIEWED if preview else STAGE_IMPORTED,
+                preview_import=self.importer.last_import if preview else None,
+            )
+
+        # Cleanup Generated Image if "Save Generated Images" is False.
+        # In link mode the imported data lives on through the hardlink /
+        # referenced store file, so removing this name frees nothing it needs.
+        if not self.current_settings.get("save_generated_images", False):
+            try:
+                if os.path.exists(result):
+                    os.remove(result)
+            except Exception:
+                pass
+
+        # Cleanup Input Image (always, except for a preview still to be finalized)
+        if input_image_path and not preview and os.path.exists(input_image_path):
+            try:
+                os.remove(input_image_path)
+            except Exception:
+                pass
+
+        return import_success, import_msg
+
+    # --- Sweep Handlers ---
+
+    def on_sweep_clicked(self):
+        """Run presets / prompt variants x resolutions as one batch."""
+        provider_name = self.selected_provider_name()
+        if not provider_name:
+            QMessageBox.warning(self, "Warning", "Please select a provider.")
+            return
+
+        dialog = SweepDialog(
+            self.preset_manager, self.prompt_input.toPlainText(), parent=self
+        )
+        if dialog.exec() != QDialog.Accepted:
+            return
+
+        jobs = expand_sweep(dialog.variants(), dialog.resolutions())
+        if not jobs:
+            return
+
+        sweep = {
+            "jobs": jobs,
+            "provider_name": provider_name,
+            "debug_mode": self.current_settings.get("debug_mode", False),
+            "seam_check": self.current_settings.get("seam_check", DEFAULT_SEAM_CHECK),
+            "seam_repair": self.current_settings.get("seam_repair", False),
+            "max_concurrency": dialog.max_concurrency(),
+        }
+
+        selected_nodes = self.exporter.get_selected_nodes()
+        if not selected_nodes:
+            self._run_sweep(sweep, None, None)
+            return
+
+        # One export shared by every job of the sweep
+        insert_pos = self._get_selection_position(selected_nodes)
+        self.status_label.setText("Exporting selected node(s) for sweep...")
+        task = SelectionExportTask(self.exporter, selected_nodes, parent=self)
+        task.finished.connect(
+            lambda s, r, t=task: self.on_sweep_exported(s, r, t, sweep, insert_pos)
+        )
+        self.active_exports.append(task)
+        self.update_generate_button_text()
+        task.start()
+
+    def on_sweep_exported(self, success, result, task, sweep, insert_pos):
+        if task in self.active_exports:
+            self.active_exports.remove(task)
+        task.deleteLater()
+
+        if not (success and result):
+            self.update_generate_button_text()
+            QMessageBox.warning(
+                self,
+                "Export Failed",
+                f"Failed to export selected node, sweep cancelled:\n{result}",
+            )
+            return
+        self._run_sweep(sweep, result[0], insert_pos)
+
+    def _run_sweep(self, sweep, input_image_path, insert_pos):
+        def start_job(job):
+            request = {
+                "prompt": job["prompt"],
+                "provider_name": sweep["provider_name"],
+                "resolution": job["resolution"],
+                "debug_mode": sweep["debug_mode"],
+                "seam_check": sweep["seam_check"],
+                "seam_repair": sweep["seam_repair"],
+                "sweep_label": job["label"],
+            }
+            worker = self._create_worker(request, input_image_path, insert_pos)
+            worker.finished.connect(
+                lambda s, r, w=worker: self.on_sweep_job_finished(w)
+            )
+            self.active_workers.append(worker)
+            self.update_generate_button_text()
+            return worker
+
+        runner = SweepRunner(
+            sweep["jobs"], start_job, sweep["max_concurrency"], parent=self
+        )
+        runner.progress.connect(
+            lambda done, total: self.status_label.setText(
+                f"Sweep: {done}/{total} job(s) finished..."
+            )
+        )
+        runner.finished.connect(
+            lambda jobs, r=runner: self.on_sweep_finished(
+                jobs, r, input_image_path, insert_pos
+            )
+        )
+        self.active_sweeps.append(runner)
+        self.status_label.setText(f"Sweep: 0/{len(sweep['jobs'])} job(s) finished...")
+        runner.start()
+
+    def on_sweep_job_finished(self, worker):
+        if worker in self.active_workers:
+            self.active_workers.remove(worker)
+        self.update_generate_button_text()
+        self._record_trace(worker.trace)
+
+    def on_sweep_finished(self, jobs, runner, input_image_path, insert_pos):
+        """Import every result of the sweep as one labelled grid."""
+        if runner in self.active_sweeps:
+            self.active_sweeps.remove(runner)
+        runner.deleteLater()
+
+        file_paths = [job["result"] if job.get("success") else None for job in jobs]
+        image_infos = {
+            job["result"]: job["worker"].image_info
+            for job in jobs
+            if job.get("success") and job["worker"].image_info
+        }
+        columns = max(job["column"] for job in jobs) + 1
+
+        imported = 0
+        if any(file_paths):
+            ok, message, results = self.importer.import_images(
+                file_paths,
+                insert_position=insert_pos,
+                layout="grid",
+                image_infos=image_infos,
+                import_mode=self._get_import_mode(),
+                labels=[job["label"] for job in jobs],
+                columns=columns,
+            )
+            if not ok:
+                self.logger.warning(f"SDBanana: Sweep import failed: {message}")
+
+            for job, entry in zip(jobs, results):
+                if not entry["success"]:
+                    continue
+                imported += 1
+                worker = job["worker"]
+                self.journal.update(worker.job_id, STAGE_IMPORTED)
+                label = job["label"]
+                if self._seam_note(worker):
+                    label = f"⚠ {label}"
+                self.gallery.add_result(job["result"], label, worker.thumbnail_path)
+                if not self.current_settings.get("save_generated_images", False):
+                    try:
+                        os.remove(job["result"])
+                    except Exception:
+                        pass
+                if worker.repair:
+                    self._remove_unsaved(worker.repair["original_path"])
+
+        # The shared export (PNG, or the WebP it was converted to) is no longer needed
+        if input_image_path:
+            for path in {
+                input_image_path,
+                os.path.splitext(input_image_path)[0] + ".webp",
+            }:
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except Exception:
+                        pass
+
+        self.status_label.setText(
+            f"Sweep finished: {imported}/{len(jobs)} image(s) imported"
+        )
+        self.refresh_jobs_ui()
+
+    # --- Job Journal Handlers ---
+
+    def refresh_jobs_ui(self):
+        """List unfinished journal jobs that are not running in this session."""
+        running = {w.job_id for w in self.active_workers if hasattr(w, "job_id")}
+        self.jobs_list.clear()
+        for job in self.journal.unfinished():
+            if job["job_id"] in running:
+                continue
+            request = job.get("request") or {}
+            created = time.strftime(
+                "%m-%d %H:%M", time.localtime(job.get("created", 0))
+            )
+            prompt = request.get("prompt", "").replace("\n", " ")
+            if len(prompt) > 40:
+                prompt = prompt[:40] + "..."
+            item = QListWidgetItem(
+                f"{created} [{job.get('stage')}] "
+                f"{request.get('provider_name', '')}: {prompt}"
+            )
+            item.setData(QtCore.Qt.UserRole, job["job_id"])
+            self.jobs_list.addItem(item)
+        self.jobs_group.setVisible(self.jobs_list.count() > 0)
+
+    def _get_selected_job(self):
+        item = self.jobs_list.currentItem()
+        if item is None:
+            QMessageBox.warning(self, "Warning", "Please select a job.")
+            return None
+        return self.journal.get(item.data(QtCore.Qt.UserRole))
+
+    def on_resume_job(self):
+        """Submit the journaled request again under the same job id."""
+        job = self._get_selected_job()
+        if job:
+            self._resubmit_job(job, job.get("request"))
+
+    def on_finalize_job(self):
+        """
+        Generate a previewed job again, from scratch, at its native
+        resolution. The preview is not sent to the provider; the new result
+        replaces the preview's node and resource when it is imported.
+        """
+        job = self._get_selected_job()
+        if not job:
+            return
+        if job.get("stage") != STAGE_PREVIEWED:
+            QMessageBox.warning(
+                self,
+                "Warning",
+                "Only previews can be finalized. Use Resume or Re-import instead.",
+            )
+            return
+        request = dict(job.get("request") or {}, preview=False)
+        if self._resubmit_job(job, request):
+            self.status_label.setText(
+                f"Finalizing: generating again at {request.get('resolution', '1K')}"
+            )
+
+    def _resubmit_job(self, job, request):
+        """
+        Start a journaled job again, with `request` replacing the stored one.
+        Returns True if it was started.
+        """
+        if not request:
+            QMessageBox.warning(self, "Warning", "This job has no stored request.")
+            return False
+        if request.get("provider_name") not in self.provider_manager.get_all_names():
+            QMessageBox.warning(
+                self,
+                "Warning",
+                f"Provider '{request.get('provider_name')}' no longer exists.",
+            )
+            return False
+
+        input_image_path = job.get("input_image_path")
+        if input_image_path and not os.path.exists(input_image_path):
+            QMessageBox.warning(
+                self,
+                "Warning",
+                f"Input image for this job is missing:\n{input_image_path}",
+            )
+            return False
+
+        if request != job.get("request"):
+            self.journal.update(job["job_id"], STAGE_SUBMITTED, request=request)
+        insert_pos = job.get("insert_position")
+        self._start_generation(
+            request,
+            input_image_path,
+            tuple(insert_pos) if insert_pos else None,
+            job_id=job["job_id"],
+        )
+        self.refresh_jobs_ui()
+        return True
+
+    def on_reimport_job(self):
+        """Import a result that was generated but never imported."""
+        job = self._get_selected_job()
+        if not job:
+            return
+
+        output_path = job.get("output_path")
+        if not output_path or not os.path.exists(output_path):
+            QMessageBox.warning(
+                self,
+                "Warning",
+                "This job has no generated image to import. Use Resume instead.",
+            )
+            return
+        # Results are named after their job; an older journal entry may point
+        # at a shared timestamped name that another job has since overwritten
+        if job["job_id"] not in os.path.basename(output_path):
+            QMessageBox.warning(
+                self,
+                "Warning",
+                "The generated image of this job cannot be told apart from "
+                "other jobs' results. Use Resume instead.",
+            )
+            return
+
+        insert_pos = job.get("insert_position")
+        import_success, import_msg = self._import_job_result(
+            job["job_id"],
+            output_path,
+            job.get("input_image_path"),
+            tuple(insert_pos) if insert_pos else None,
+            (job.get("request") or {}).get("resolution", "1K"),
+            preview=bool(job.get("preview")),
+        )
+        if import_success:
+            self.status_label.setText("Job re-imported")
+        else:
+            QMessageBox.warning(self, "Warning", f"Import failed:\n{import_msg}")
+        self.refresh_jobs_ui()
+
+    def on_drop_job(self):
+        """Forget a job and remove its temporary input image."""
+        job = self._get_selected_job()
+        if not job:
+            return
+
+        input_image_path = job.get("input_image_path")
+        if input_image_path and os.path.exists(input_image_path):
+            try:
+                os.remove(input_image_path)
+            except Exception:
+                pass
+
+        self.journal.update(job["job_id"], STAGE_DROPPED)
+        self.refresh_jobs_ui()
 
     def on_test_import_clicked(self):
         """Test import handler - imports the last generated image with specified resolution"""
@@ -1158,9 +2698,9 @@ class SDBananaPanel(QWidget):
 
         import glob
 
-        images = glob.glob(os.path.join(output_dir, "sd_banana_*.png")) + glob.glob(
-            os.path.join(output_dir, "sd_banana_*.webp")
-        )
+        images = []
+        for ext in ("png", "webp", "jpg"):
+            images += glob.glob(os.path.join(output_dir, f"sd_banana_*.{ext}"))
 
         if not images:
             QMessageBox.warning(self, "Warning", "No generated images found.")
@@ -1192,41 +2732,52 @@ class SDBananaPanel(QWidget):
             QMessageBox.critical(self, "Error", f"Import failed:\n{msg}")
 
     def on_test_import_pick_clicked(self):
-        """选择任意本地图片并导入 Bitmap 节点，打印快速与完整灰度判定"""
+        """选择一张或多张本地图片并批量导入 Bitmap 节点（网格排布在选中节点旁）"""
         try:
-            file_path, _ = QFileDialog.getOpenFileName(
+            file_paths, _ = QFileDialog.getOpenFileNames(
                 self,
                 "选择图片",
                 os.path.expanduser("~"),
                 "Images (*.png *.jpg *.jpeg *.webp *.bmp)",
             )
-            if not file_path:
+            if not file_paths:
                 return
 
-            fmt = detect_image_format(file_path)
-
-            # quick = is_image_grayscale_quick(file_path)
-
-            if fmt == "png":
-                # full = is_png_rgb_equal_full(file_path)
-                pass
-
             resolution = (
                 self.res_combo.currentText() if hasattr(self, "res_combo") else "1K"
             )
-            success, msg = self.importer.import_image(
-                file_path,
-                create_bitmap_node=True,
+            success, message, results = self.importer.import_images(
+                file_paths,
+                create_bitmap_nodes=True,
+                insert_position=self._get_selection_position(
+                    self.exporter.get_selected_nodes()
+                ),
                 resolution=resolution,
                 aspect_ratio="1:1",
             )
 
-            if success:
+            for r in results:
+                self.logger.info(
+                    f"SDBanana import {r['seconds'] * 1000:.1f} ms: "
+                    f"{r['path']} - {r['message']}"
+                )
+
+            failed = [r for r in results if not r["success"]]
+            if success and not failed:
                 QMessageBox.information(
-                    self, "选择文件导入", "导入成功并创建 Bitmap 节点。"
+                    self,
+                    "选择文件导入",
+                    f"导入成功并创建 {len(results)} 个 Bitmap 节点。",
                 )
             else:
-                QMessageBox.warning(self, "选择文件导入", str(msg))
+                details = [
+                    f"{r['path']}: {r['message']}"
+                    for r in failed
+                    if r["message"] != message
+                ]
+                QMessageBox.warning(
+                    self, "选择文件导入", "\n".join([message] + details)
+                )
         except Exception:
             pass
 
@@ -0,0 +1,94 @@
+import os
+
+from .deps import optional_import
+from .tiling import load_pixels, save_pixels
+
+# Resolution requested from the provider in preview mode
+PREVIEW_RESOLUTION = "1K"
+# Long side in pixels of each resolution setting
+RESOLUTION_SIZES = {"1K": 1024, "2K": 2048, "4K": 4096}
+# Source pixels wrapped around each border before resampling; covers the
+# Lanczos kernel (3 lobes) so the filter sees the opposite edge, not a clamp
+WRAP_PAD = 4
+
+
+def _lanczos(image_module, np, channel, size, box):
+    """Lanczos resample of one 2-D float32 channel."""
+    image = image_module.fromarray(channel, mode="F")
+    return np.asarray(image.resize(size, image_module.LANCZOS, box=box))
+
+
+def upscale_pixels(pixels, size, tileable=True):
+    """
+    Lanczos upscale of an (H, W, C) uint8 / uint16 array to size (W, H).
+
+    With tileable=True the image is wrapped by WRAP_PAD pixels on every side
+    and only the original area is resampled, so the result wraps exactly as
+    the source does. 8-bit images are resampled by Pillow in one pass, 16-bit
+    ones per channel in float.
+
+    Returns:
+        ndarray: (H, W, C) array of the input dtype, or None without numpy /
+            Pillow
+    """
+    np = optional_import("numpy")
+    image_module = optional_import("PIL.Image")
+    if np is None or image_module is None:
+        return None
+    height, width = pixels.shape[:2]
+    pad = WRAP_PAD if tileable else 0
+    if pad:
+        pixels = np.pad(pixels, ((pad, pad), (pad, pad), (0, 0)), mode="wrap")
+    box = (pad, pad, pad + width, pad + height)
+
+    if pixels.dtype == np.uint8:
+        channels = pixels.shape[2]
+        source = pixels[:, :, 0] if channels == 1 else pixels
+        image = image_module.fromarray(np.ascontiguousarray(source))
+        result = np.asarray(image.resize(size, image_module.LANCZOS, box=box))
+        return result[:, :, None] if channels == 1 else result
+
+    info = np.iinfo(pixels.dtype)
+    result = np.empty((size[1], size[0], pixels.shape[2]), dtype=pixels.dtype)
+    for c in range(pixels.shape[2]):
+        channel = np.ascontiguousarray(pixels[:, :, c], dtype=np.float32)
+        resampled = _lanczos(image_module, np, channel, size, box)
+        result[:, :, c] = np.clip(np.rint(resampled), info.min, info.max)
+    return result
+
+
+def target_size(width, height, resolution):
+    """(W, H) with the long side at the resolution setting, aspect kept."""
+    long_side = RESOLUTION_SIZES.get(resolution, RESOLUTION_SIZES["1K"])
+    scale = long_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def upscale_file(path, resolution, tileable=True, pixels=None):
+    """
+    Write a copy of an image upscaled to a resolution setting next to it,
+    named <name>_up<resolution>.png (the source is kept). Pass the already
+    decoded pixels of path (load_pixels) to skip decoding it again.
+
+    Returns:
+        str: Path of the upscaled copy, or None if the image cannot be read,
+            is already at least that large, or cannot be written
+    """
+    if pixels is None:
+        pixels = load_pixels(path)
+    if pixels is None:
+        return None
+    height, width = pixels.shape[:2]
+    size = target_size(width, height, resolution)
+    if size[0] <= width and size[1] <= height:
+        return None
+    upscaled = upscale_pixels(pixels, size, tileable=tileable)
+    if upscaled is None:
+        return None
+    try:
+        upscaled_path = save_pixels(
+            upscaled, f"{os.path.splitext(path)[0]}_up{resolution}.png"
+        )
+    except Exception:
+        return None
+    return upscaled_path
@@ -0,0 +1,321 @@
+"""
+Payload-building and response-parsing micro-benchmarks per provider dialect.
+
+    payload/<dialect>/<input>      ImageGenerator.generate_image up to the
+                                   network call: input encoding, payload
+                                   construction and JSON serialisation
+                                   (urlopen is intercepted once the request
+                                   body is complete)
+    response/<dialect>-<variant>/<size>
+                                   json.loads of the response body plus
+                                   ImageGenerator._process_response: base64
+                                   decode or URL download (served from a local
+                                   HTTP server), probe and write
+
+Dialects: gemini (Gemini format via a proxy), google (official API),
+gptgod (markdown image link, bare URL and data[].url responses) and
+openrouter (data URL). Inputs: text only and 1K/2K/4K PNG; outputs: 1K/2K/4K
+PNG. Every case reports wall time, tracemalloc peak and retained bytes.
+
+Run from the repository root (needs numpy and Pillow for the test images):
+    python benchmarks/bench_generator.py [--sizes 1024 2048 4096] [--save]
+        [--compare benchmarks/results/generator-....json]
+"""
+
+import argparse
+import base64
+import contextlib
+import http.server
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.request
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import benchutil  # noqa: E402
+import fake_sd  # noqa: E402
+from bench_importer import make_content  # noqa: E402
+
+# dialect -> provider config that routes generate_image into that branch
+PROVIDERS = {
+    "gemini": {
+        "name": "Yunwu",
+        "baseUrl": "https://yunwu.ai/v1beta",
+        "model": "gemini-3-pro-image-preview",
+    },
+    "google": {
+        "name": "Google Gemini",
+        "baseUrl": "https://generativelanguage.googleapis.com/v1beta",
+        "model": "gemini-3-pro-image-preview",
+    },
+    "gptgod": {
+        "name": "GPTGod",
+        "baseUrl": "https://api.gptgod.online/v1/chat/completions",
+        "model": "gemini-3-pro-image-preview",
+    },
+    "openrouter": {
+        "name": "OpenRouter",
+        "baseUrl": "https://openrouter.ai/api/v1/chat/completions",
+        "model": "google/gemini-3-pro-image-preview",
+    },
+}
+RESOLUTIONS = {1024: "1K", 2048: "2K", 4096: "4K"}
+# Chatty text around the image link, as GPTGod-style chat responses have
+CHATTER = "Here is the seamless texture you asked for. " * 40
+
+SYSTEM_INSTRUCTION = "You are a material artist. Output a seamless tileable texture."
+PROMPT = "weathered red brick wall, moss in the joints"
+
+
+def make_png(size, seed=0):
+    image = Image.fromarray(make_content("rgb", size, 8, seed=seed))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+# --- Canned responses ---
+
+
+def response_body(dialect, variant, image_bytes, image_url):
+    b64 = base64.b64encode(image_bytes).decode("ascii")
+    if dialect in ("gemini", "google"):
+        body = {
+            "candidates": [
+                {
+                    "content": {
+                        "parts": [
+                            {"text": "Generated texture."},
+                            {"inlineData": {"mimeType": "image/png", "data": b64}},
+                        ],
+                        "role": "model",
+                    },
+                    "finishReason": "STOP",
+                }
+            ],
+            "usageMetadata": {"promptTokenCount": 120, "totalTokenCount": 1410},
+        }
+    elif dialect == "openrouter":
+        body = {
+            "choices": [
+                {
+                    "message": {
+                        "role": "assistant",
+                        "content": "",
+                        "images": [
+                            {
+                                "type": "image_url",
+                                "image_url": {"url": f"data:image/png;base64,{b64}"},
+                            }
+                        ],
+                    }
+                }
+            ]
+        }
+    elif variant == "data_field":
+        body = {"created": 0, "data": [{"url": image_url}]}
+    else:
+        link = f"![image]({image_url})" if variant == "markdown" else image_url
+        content = f"{CHATTER}\n\n{link}\n\n{CHATTER}"
+        body = {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+        }
+    return json.dumps(body).encode("utf-8")
+
+
+RESPONSE_VARIANTS = {
+    "gemini": ["inline"],
+    "google": ["inline"],
+    "gptgod": ["markdown", "bare_url", "data_field"],
+    "openrouter": ["data_url"],
+}
+
+
+# --- Local image server for URL responses ---
+
+
+class _ImageHandler(http.server.BaseHTTPRequestHandler):
+    images = {}
+
+    def do_GET(self):
+        data = self.images.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def image_server(images):
+    _ImageHandler.images = images
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ImageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --- Request interception ---
+
+
+class _RequestBuilt(Exception):
+    """Raised in place of sending the request."""
+
+
+@contextlib.contextmanager
+def capture_requests():
+    """Replace urlopen so generate_image stops once its request is built."""
+    captured = []
+    original = urllib.request.urlopen
+
+    def fake_urlopen(request, *args, **kwargs):
+        captured.append(request)
+        raise _RequestBuilt()
+
+    urllib.request.urlopen = fake_urlopen
+    try:
+        yield captured
+    finally:
+        urllib.request.urlopen = original
+
+
+def measure(func, repeat):
+    stats, result = benchutil.time_call(func, repeat=repeat)
+    stats.update(benchutil.memory_call(func))
+    return stats, result
+
+
+def print_case(case_id, stats, note=""):
+    print(
+        f"{case_id:<44}{benchutil.format_value(stats['best']):>11}"
+        f"{benchutil.format_value(stats['median']):>11}"
+        f"{benchutil.format_value(stats['peak_bytes']):>12}"
+        f"{benchutil.format_value(stats['retained_bytes']):>12}  {note}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generator payload / response benchmarks"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument(
+        "--dialects", nargs="+", choices=sorted(PROVIDERS), default=sorted(PROVIDERS)
+    )
+    benchutil.add_common_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sdbanana_genbench_")
+    try:
+        return run(args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args, workdir):
+    # ImageGenerator writes results to %LOCALAPPDATA%\SD_Banana
+    os.environ["LOCALAPPDATA"] = workdir
+    fake_sd.install()
+    from SDBanana.config import JobConfig, freeze
+    from SDBanana.generator import ImageGenerator
+
+    generator = ImageGenerator(provider_manager=None, settings_manager=None)
+    images = {size: make_png(size, seed=size) for size in args.sizes}
+    # label -> (input image path, its size in bytes)
+    inputs = {"text": (None, 0)}
+    for size, data in images.items():
+        path = os.path.join(workdir, f"input_{size}.png")
+        with open(path, "wb") as f:
+            f.write(data)
+        inputs[RESOLUTIONS.get(size, str(size))] = (path, len(data))
+
+    cases = {}
+    failures = []
+    print(f"{'case':<44}{'best':>11}{'median':>11}{'peak':>12}{'retained':>12}")
+
+    # Payload construction
+    for dialect in args.dialects:
+        provider = dict(PROVIDERS[dialect], apiKey="sk-benchmark")
+        config = JobConfig(freeze(provider), SYSTEM_INSTRUCTION)
+        for label, (input_path, input_bytes) in inputs.items():
+            resolution = label if label in RESOLUTIONS.values() else "1K"
+
+            def build():
+                with capture_requests() as captured:
+                    generator.generate_image(
+                        PROMPT,
+                        provider["name"],
+                        resolution=resolution,
+                        input_image_path=input_path,
+                        config=config,
+                    )
+                return captured[0].data if captured else None
+
+            stats, body = measure(build, args.repeat)
+            # The body must carry the whole base64-encoded input image
+            ok = body is not None and len(body) > input_bytes * 4 // 3
+            stats.update(ok=ok, request_bytes=len(body) if body else 0)
+            case_id = f"payload/{dialect}/{label}"
+            cases[case_id] = stats
+            if not ok:
+                failures.append(case_id)
+            print_case(
+                case_id, stats, f"{stats['request_bytes']} B" if ok else "FAILED"
+            )
+
+    # Response extraction
+    with image_server({f"/{size}.png": data for size, data in images.items()}) as url:
+        for dialect in args.dialects:
+            flags = {
+                "is_gptgod": dialect == "gptgod",
+                "is_openrouter": dialect == "openrouter",
+                "is_google_official": dialect == "google",
+            }
+            for variant in RESPONSE_VARIANTS[dialect]:
+                for size, data in images.items():
+                    body = response_body(dialect, variant, data, f"{url}/{size}.png")
+
+                    def parse():
+                        success, result = generator._process_response(
+                            json.loads(body.decode("utf-8")), **flags
+                        )
+                        if success:
+                            generator.pop_image_info(result)
+                            return os.path.getsize(result)
+                        return result
+
+                    stats, result = measure(parse, args.repeat)
+                    ok = result == len(data)
+                    stats.update(ok=ok, response_bytes=len(body))
+                    case_id = f"response/{dialect}-{variant}/{size}"
+                    cases[case_id] = stats
+                    if not ok:
+                        failures.append(case_id)
+                    print_case(case_id, stats, "" if ok else f"FAILED: {result}")
+
+    print(f"\n{len(cases)} cases, {len(failures)} failed")
+    benchutil.finish("generator", cases, args)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
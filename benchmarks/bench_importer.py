@@ -0,0 +1,374 @@
+"""
+Importer benchmark suite: image probing and colour-mode detection.
+
+Generates a synthetic corpus and times every detector on it, checking each
+verdict against the ground truth the corpus was built with:
+
+    is_png_rgb_equal_full    PNG: gray / gray stored as RGB / RGB / RGB whose
+                             only colour is in the last row; filter types
+                             None, Sub, Up, Average, Paeth and mixed; 8- and
+                             16-bit; Adam7 interlaced
+    is_jpeg_rgb_equal_quick  JPEG: gray, RGB baseline, RGB progressive
+    detect_image_format      every file (plus WebP / BMP / GIF)
+    import_color_mode        the colour-mode branch of import_image: probe
+                             (ImageInfo.from_file) + _apply_color_mode on a
+                             fake bitmap node (fake_sd.py)
+
+Run from the repository root (needs numpy and Pillow to build the corpus):
+    python benchmarks/bench_importer.py [--sizes 1024 2048 4096] [--save]
+        [--compare benchmarks/results/importer-....json] [--corpus DIR]
+
+The corpus is cached in --corpus (default: a temp dir removed afterwards);
+reusing a directory skips regeneration. Exits with status 1 if a verdict is
+wrong.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+
+import numpy as np
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import benchutil  # noqa: E402
+import fake_sd  # noqa: E402
+
+FILTER_NAMES = {0: "none", 1: "sub", 2: "up", 3: "average", 4: "paeth"}
+MIXED = "mixed"
+# content -> ground truth is_grayscale ("gray" is written as PNG color type
+# 0, the others as truecolor)
+CONTENTS = {
+    "gray": True,
+    "gray_as_rgb": True,
+    "rgb": False,
+    "rgb_late": False,
+}
+ADAM7 = (
+    (0, 0, 8, 8),
+    (4, 0, 8, 8),
+    (0, 4, 4, 8),
+    (2, 0, 4, 4),
+    (0, 2, 2, 4),
+    (1, 0, 2, 2),
+    (0, 1, 1, 2),
+)
+
+
+# --- Synthetic content ---
+
+
+def make_content(kind, size, bit_depth, seed=0):
+    """H x W x C array (C = 1 for "gray", else 3) of uint8 or uint16 samples."""
+    rng = np.random.default_rng(seed)
+    cell = 16
+    cells = -(-size // cell)
+
+    def plane():
+        coarse = rng.integers(0, 256, (cells, cells), dtype=np.uint16)
+        smooth = np.repeat(np.repeat(coarse, cell, 0), cell, 1)[:size, :size]
+        if bit_depth == 16:
+            # Noise in the low byte so both bytes of every sample matter
+            return smooth * 257 + rng.integers(0, 256, smooth.shape, dtype=np.uint16)
+        return (
+            smooth // 2 + rng.integers(0, 64, smooth.shape, dtype=np.uint16)
+        ).astype(np.uint8)
+
+    luma = plane()
+    if kind == "gray":
+        return luma[:, :, None]
+    if kind == "rgb":
+        return np.stack([luma, plane(), plane()], axis=2)
+    image = np.repeat(luma[:, :, None], 3, axis=2)
+    if kind == "rgb_late":
+        # Gray everywhere except the last pixel: defeats early exits
+        image[-1, -1, 0] ^= 1
+    return image
+
+
+# --- PNG encoder with explicit filter and interlace control ---
+
+
+def _sample_bytes(pixels):
+    """Rows of big-endian sample bytes, shape (H, W * C * bytes)."""
+    if pixels.dtype == np.uint16:
+        raw = pixels.astype(">u2").view(np.uint8)
+    else:
+        raw = pixels
+    return raw.reshape(pixels.shape[0], -1)
+
+
+def _predictor(ftype, raw, up, bpp):
+    """PNG filter predictor of every byte (encoder side, uses raw neighbours)."""
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    if ftype == 1:
+        return left
+    if ftype == 2:
+        return up
+    if ftype == 3:
+        return (left + up) // 2
+    up_left = np.zeros_like(up)
+    up_left[:, bpp:] = up[:, :-bpp]
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+
+def filter_rows(raw, bpp, filter_type):
+    """Filtered scanlines (filter byte + data) of one (sub-)image."""
+    raw = raw.astype(np.int16)
+    up = np.zeros_like(raw)
+    up[1:] = raw[:-1]
+    if filter_type == MIXED:
+        types = np.arange(raw.shape[0]) % 5
+    else:
+        types = np.full(raw.shape[0], filter_type)
+    out = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+    out[:, 0] = types
+    for ftype in np.unique(types):
+        rows = types == ftype
+        if ftype == 0:
+            out[rows, 1:] = raw[rows]
+        else:
+            predicted = _predictor(int(ftype), raw[rows], up[rows], bpp)
+            out[rows, 1:] = (raw[rows] - predicted) & 0xFF
+    return out
+
+
+def encode_png(pixels, filter_type=MIXED, interlace=False, level=6):
+    height, width, channels = pixels.shape
+    bit_depth = 16 if pixels.dtype == np.uint16 else 8
+    color_type = {1: 0, 3: 2}[channels]
+    bpp = channels * bit_depth // 8
+
+    if interlace:
+        passes = [pixels[y0::dy, x0::dx] for x0, y0, dx, dy in ADAM7]
+    else:
+        passes = [pixels]
+    compressor = zlib.compressobj(level)
+    idat = []
+    for sub in passes:
+        if sub.size:
+            rows = filter_rows(_sample_bytes(sub), bpp, filter_type)
+            idat.append(compressor.compress(rows.tobytes()))
+    idat.append(compressor.flush())
+
+    def chunk(tag, payload):
+        crc = zlib.crc32(tag + payload) & 0xFFFFFFFF
+        return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", crc)
+
+    header = struct.pack(
+        ">IIBBBBB", width, height, bit_depth, color_type, 0, 0, int(interlace)
+    )
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", b"".join(idat))
+        + chunk(b"IEND", b"")
+    )
+
+
+# --- Corpus ---
+
+
+def corpus_spec(sizes):
+    """[(file name, builder kwargs, ground truth)] of the whole corpus."""
+    spec = []
+    for size in sizes:
+        variants = [(8, f, False) for f in (*FILTER_NAMES, MIXED)]
+        variants += [(16, MIXED, False), (8, MIXED, True), (16, MIXED, True)]
+        for bit_depth, ftype, interlace in variants:
+            for content, is_gray in CONTENTS.items():
+                fname = FILTER_NAMES.get(ftype, MIXED)
+                name = (
+                    f"png_{size}_{content}_{bit_depth}bit_{fname}"
+                    f"{'_adam7' if interlace else ''}.png"
+                )
+                spec.append(
+                    (
+                        name,
+                        dict(
+                            kind="png",
+                            content=content,
+                            size=size,
+                            bit_depth=bit_depth,
+                            filter_type=ftype,
+                            interlace=interlace,
+                        ),
+                        {"format": "png", "is_grayscale": is_gray},
+                    )
+                )
+        for content, progressive in (("gray", False), ("rgb", False), ("rgb", True)):
+            name = f"jpeg_{size}_{content}{'_progressive' if progressive else ''}.jpg"
+            spec.append(
+                (
+                    name,
+                    dict(
+                        kind="jpeg", content=content, size=size, progressive=progressive
+                    ),
+                    {"format": "jpeg", "is_grayscale": content == "gray"},
+                )
+            )
+    small = min(sizes)
+    for fmt, ext in (("webp", "webp"), ("bmp", "bmp"), ("gif", "gif")):
+        spec.append(
+            (
+                f"{fmt}_{small}_rgb.{ext}",
+                dict(kind=fmt, content="rgb", size=small),
+                {"format": fmt, "is_grayscale": False},
+            )
+        )
+    return spec
+
+
+def build_file(path, kind, content, size, **options):
+    if kind == "png":
+        pixels = make_content(content, size, options["bit_depth"])
+        data = encode_png(pixels, options["filter_type"], options["interlace"])
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    pixels = make_content(content, size, 8)
+    image = Image.fromarray(pixels[:, :, 0] if pixels.shape[2] == 1 else pixels)
+    if kind == "jpeg":
+        image.save(path, "JPEG", quality=90, progressive=options.get("progressive"))
+    elif kind == "gif":
+        image.convert("P").save(path, "GIF")
+    else:
+        image.save(path, kind.upper())
+
+
+def ensure_corpus(directory, spec):
+    os.makedirs(directory, exist_ok=True)
+    built = 0
+    for name, options, _ in spec:
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            build_file(path, **options)
+            built += 1
+    return built
+
+
+# --- Detectors ---
+
+
+def make_detectors(importer_module):
+    """name -> (applies to file?, run(path), expected verdict from truth)."""
+    importer = importer_module.ImageImporter()
+    graph = fake_sd.new_graph(fake_sd.new_package())
+    node = graph.newNode("sbs::compositing::bitmap")
+    color_switch = node.getPropertyFromId(
+        "colorswitch", fake_sd.SDPropertyCategory.Input
+    )
+
+    def import_color_mode(path):
+        # The probe + colour-mode part of ImageImporter.import_image
+        node.setPropertyValue(color_switch, None)
+        info = importer_module.ImageInfo.from_file(path)
+        if info.is_grayscale is not None:
+            importer._apply_color_mode(node, info.is_grayscale)
+        value = node.getPropertyValue(color_switch)
+        return None if value is None else not value.get()
+
+    def jpeg_expected(truth, options):
+        # Header check: only single-component JPEGs are known to be gray
+        return options["content"] == "gray"
+
+    return {
+        "is_png_rgb_equal_full": (
+            lambda options: options["kind"] == "png",
+            importer_module.is_png_rgb_equal_full,
+            lambda truth, options: truth["is_grayscale"],
+        ),
+        "is_jpeg_rgb_equal_quick": (
+            lambda options: options["kind"] == "jpeg",
+            importer_module.is_jpeg_rgb_equal_quick,
+            jpeg_expected,
+        ),
+        "detect_image_format": (
+            lambda options: True,
+            importer_module.detect_image_format,
+            lambda truth, options: truth["format"],
+        ),
+        "import_color_mode": (
+            lambda options: options["kind"] in ("png", "jpeg"),
+            import_color_mode,
+            lambda truth, options: truth["is_grayscale"],
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importer detector benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--corpus", help="directory to build / reuse the corpus in")
+    parser.add_argument(
+        "--only", nargs="+", metavar="DETECTOR", help="run only these detectors"
+    )
+    benchutil.add_common_arguments(parser)
+    args = parser.parse_args()
+
+    fake_sd.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        from SDBanana import importer as importer_module
+
+    corpus = args.corpus or tempfile.mkdtemp(prefix="sdbanana_corpus_")
+    try:
+        spec = corpus_spec(args.sizes)
+        print(f"Corpus: {corpus} ({len(spec)} files)")
+        built = ensure_corpus(corpus, spec)
+        if built:
+            print(f"Built {built} files")
+
+        detectors = make_detectors(importer_module)
+        cases = {}
+        failures = []
+        print(f"{'case':<72}{'best':>11}{'median':>11}  verdict")
+        for detector, (applies, run, expected_of) in detectors.items():
+            if args.only and detector not in args.only:
+                continue
+            for name, options, truth in spec:
+                if not applies(options):
+                    continue
+                path = os.path.join(corpus, name)
+                stats, verdict = benchutil.time_call(
+                    lambda: run(path), repeat=args.repeat
+                )
+                expected = expected_of(truth, options)
+                ok = verdict == expected
+                case_id = f"{detector}/{name}"
+                cases[case_id] = dict(
+                    stats,
+                    verdict=verdict,
+                    expected=expected,
+                    ok=ok,
+                    file_bytes=os.path.getsize(path),
+                )
+                if not ok:
+                    failures.append(case_id)
+                print(
+                    f"{case_id:<72}{benchutil.format_value(stats['best']):>11}"
+                    f"{benchutil.format_value(stats['median']):>11}  "
+                    f"{verdict}{'' if ok else f'  WRONG (expected {expected})'}"
+                )
+    finally:
+        if not args.corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+    print(f"\n{len(cases)} cases, {len(failures)} wrong verdicts")
+    benchutil.finish("importer", cases, args)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmark SDBanana's export and import paths outside Designer, against the
+headless fake `sd` (fake_sd.py).
+
+Run from the repository root:
+    python benchmarks/bench_sd_paths.py [--sizes 1024 2048] [--nodes 2] [--repeat 3]
+
+Prints per-scenario wall times and, with --calls, the per-API-call table of
+the last run, so a regression can be attributed to plugin code or SD calls.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import fake_sd  # noqa: E402
+
+
+def setup_scene(workdir, size, nodes):
+    fake_sd.reset()
+    package = fake_sd.new_package(os.path.join(workdir, "bench.sbs"))
+    graph = fake_sd.new_graph(package)
+    selected = [
+        fake_sd.make_source_node(graph, size, size, seed=i) for i in range(nodes)
+    ]
+    fake_sd.select(selected)
+    return package, graph
+
+
+def bench_export(workdir, size, nodes, webp):
+    """Returns (seconds, exported files)."""
+    from SDBanana.exporter import NodeExporter
+
+    setup_scene(workdir, size, nodes)
+    fake_sd.SDTexture.webp_supported = webp
+    exporter = NodeExporter(output_dir=os.path.join(workdir, "export"))
+    try:
+        started = time.perf_counter()
+        success, result = exporter.export_selected_nodes()
+        elapsed = time.perf_counter() - started
+    finally:
+        fake_sd.SDTexture.webp_supported = True
+    if not success:
+        raise RuntimeError(result)
+    return elapsed, result
+
+
+def bench_import(workdir, files, batch):
+    """Returns (seconds, None)."""
+    from SDBanana.importer import ImageImporter
+
+    setup_scene(workdir, 16, 0)
+    importer = ImageImporter()
+    started = time.perf_counter()
+    if batch:
+        success, result, _ = importer.import_images(files, insert_position=(0, 0))
+    else:
+        for path in files:
+            success, result = importer.import_image(path)
+            if not success:
+                break
+    elapsed = time.perf_counter() - started
+    if not success:
+        raise RuntimeError(result)
+    return elapsed, None
+
+
+def run_scenario(name, repeat, func, *args):
+    """Run func repeat times with the plugin's DEBUG prints silenced."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            elapsed, result = func(*args)
+        times.append(elapsed)
+    calls = fake_sd.STATS.snapshot()
+    times.sort()
+    # STATS is reset by setup_scene, so it covers the last run only; nested
+    # fake calls are inclusive, count only the outermost ones in the total
+    sd_seconds = sum(
+        entry["seconds"]
+        for call, entry in calls.items()
+        if not call.startswith(("SDTexture.sFromPattern", "SDValue"))
+    )
+    print(
+        f"{name:<24}best {times[0] * 1000:9.1f} ms   median "
+        f"{times[len(times) // 2] * 1000:9.1f} ms   "
+        f"last run: {sum(e['count'] for e in calls.values()):4d} sd calls, "
+        f"{sd_seconds * 1000:8.1f} ms in sd"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export / import benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048])
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--calls", action="store_true", help="print API call tables")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sdbanana_bench_") as workdir:
+        # The plugin defaults its output directory to %LOCALAPPDATA%\SD_Banana
+        os.environ["LOCALAPPDATA"] = workdir
+        fake_sd.install()
+
+        for size in args.sizes:
+            print(f"--- {size}x{size}, {args.nodes} node(s) ---")
+            files = None
+            for webp in (True, False):
+                label = "export " + ("webp" if webp else "png fallback")
+                exported = run_scenario(
+                    label, args.repeat, bench_export, workdir, size, args.nodes, webp
+                )
+                files = files or exported
+                if args.calls:
+                    print(fake_sd.STATS.format_table())
+
+            for batch in (False, True):
+                label = "import_images" if batch else "import_image x N"
+                run_scenario(label, args.repeat, bench_import, workdir, files, batch)
+                if args.calls:
+                    print(fake_sd.STATS.format_table())
+
+
+if __name__ == "__main__":
+    main()
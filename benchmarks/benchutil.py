@@ -0,0 +1,183 @@
+"""
+Shared helpers for the benchmark scripts: timing, memory measurement and
+JSON result files that later runs can be compared against.
+
+Result files are written to benchmarks/results/<suite>-<timestamp>.json:
+    {"suite": ..., "meta": {...}, "cases": {case id: {"best": s, ...}}}
+"""
+
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+
+
+def time_call(func, repeat=5, warmup=1):
+    """
+    Wall time of func() over `repeat` runs after `warmup` untimed runs.
+
+    Returns:
+        tuple: (stats dict with best / median / mean seconds, last return value)
+    """
+    result = None
+    for _ in range(warmup):
+        result = func()
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "runs": repeat,
+    }, result
+
+
+def memory_call(func):
+    """
+    Python heap usage of one func() call, traced with tracemalloc (run
+    separately from time_call because tracing slows the code down).
+
+    Returns:
+        dict: peak_bytes (high-water mark above the starting heap) and
+            retained_bytes (still allocated when func returns, including
+            its return value)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": peak - baseline, "retained_bytes": current - baseline}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _module_version(name):
+    module = sys.modules.get(name)
+    return getattr(module, "__version__", None) if module else None
+
+
+def metadata():
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": _module_version("numpy"),
+        "pillow": _module_version("PIL"),
+    }
+
+
+def save_results(suite, cases, path=None):
+    """Write a result file; returns its path."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{suite}-{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"suite": suite, "meta": metadata(), "cases": cases},
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    return path
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, cases, metric="best"):
+    """
+    Print `metric` of every case present in both runs, with the ratio
+    new / old (below 1 is faster), and the geometric mean of the ratios.
+    """
+    old_cases = baseline.get("cases", {})
+    ratios = []
+    print(f"\nCompared with {baseline.get('meta', {}).get('git')} ({metric}):")
+    print(f"{'case':<72}{'old':>12}{'new':>12}{'ratio':>8}")
+    for case_id in sorted(cases):
+        old = old_cases.get(case_id, {}).get(metric)
+        new = cases[case_id].get(metric)
+        if not old or new is None:
+            continue
+        ratio = new / old
+        ratios.append(ratio)
+        print(
+            f"{case_id:<72}{format_value(old):>12}{format_value(new):>12}{ratio:>8.2f}"
+        )
+    if ratios:
+        geomean = math.exp(sum(math.log(r) for r in ratios) / len(ratios))
+        print(f"{'geometric mean':<96}{geomean:>8.2f}")
+
+
+def format_value(value):
+    """Seconds as ms / us; byte counts (ints) as KiB / MiB."""
+    if isinstance(value, int):
+        if abs(value) >= 1 << 20:
+            return f"{value / (1 << 20):.1f} MiB"
+        return f"{value / 1024:.1f} KiB"
+    if abs(value) < 1e-3:
+        return f"{value * 1e6:.1f} us"
+    return f"{value * 1000:.2f} ms"
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="store results (default: benchmarks/results/<suite>-<time>.json)",
+    )
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare against a stored result file"
+    )
+
+
+def finish(suite, cases, args):
+    """Handle --save / --compare after a suite has run."""
+    if args.save is not None:
+        path = save_results(suite, cases, args.save or None)
+        print(f"\nResults saved to {path}")
+    if args.compare:
+        compare(load_results(args.compare), cases)
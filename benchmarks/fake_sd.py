@@ -0,0 +1,778 @@
+"""
+Headless stand-in for the Substance Designer `sd` API.
+
+Implements the subset SDBanana uses (context, logger, package manager,
+graph / node / property, values, SDResourceFolder, SDResourceBitmap,
+SDGraphObjectComment and SDTexture.save backed by in-memory images) so
+exporter, importer, generator and provider code can run in a plain Python
+for benchmarks. Every public API call is counted and timed in STATS.
+
+Usage:
+    import fake_sd
+    fake_sd.install()            # registers sd, sd.api.* in sys.modules
+    import SDBanana.importer     # now imports against the fake
+
+    package = fake_sd.new_package("/tmp/bench/bench.sbs")
+    graph = fake_sd.new_graph(package)
+    node = fake_sd.make_source_node(graph, 2048, 2048, gray=True)
+    fake_sd.select([node])
+    ...
+    print(fake_sd.STATS.format_table())
+
+Not emulated: the Qt dock widget (newDockWidget raises), graph evaluation
+beyond rendering each source node's texture, and package saving.
+"""
+
+import functools
+import os
+import random
+import shutil
+import struct
+import sys
+import threading
+import time
+import types
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# --- Call statistics ---
+
+
+class CallStats:
+    """Call count and inclusive wall time per API method ("Class.method")."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            entry = self.calls.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+
+    def snapshot(self):
+        """{name: {"count": int, "seconds": float}}"""
+        with self._lock:
+            return {
+                name: {"count": count, "seconds": seconds}
+                for name, (count, seconds) in self.calls.items()
+            }
+
+    def format_table(self):
+        rows = sorted(self.snapshot().items(), key=lambda kv: -kv[1]["seconds"])
+        lines = [f"{'call':<52}{'count':>8}{'total ms':>12}{'avg ms':>10}"]
+        for name, entry in rows:
+            total = entry["seconds"] * 1000
+            lines.append(
+                f"{name:<52}{entry['count']:>8}{total:>12.2f}"
+                f"{total / entry['count']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+
+STATS = CallStats()
+
+
+def _counted(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STATS.record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _instrument(cls):
+    """Count and time every public method (including sNew* class methods)."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if isinstance(attr, (classmethod, staticmethod)):
+            setattr(cls, name, type(attr)(_counted(label, attr.__func__)))
+        elif callable(attr):
+            setattr(cls, name, _counted(label, attr))
+    return cls
+
+
+class SDAPIException(Exception):
+    pass
+
+
+# --- Base types and enums ---
+
+
+class float2:
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"float2({self.x}, {self.y})"
+
+
+class int2:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return f"int2({self.x}, {self.y})"
+
+
+class SDPropertyCategory:
+    Annotation = 0
+    Input = 1
+    Output = 2
+
+
+class SDPropertyInheritanceMethod:
+    RelativeToInput = 0
+    RelativeToParent = 1
+    Absolute = 2
+
+
+class EmbedMethod:
+    Embedded = 0
+    Linked = 1
+    CopiedAndLinked = 2
+
+
+# --- Images ---
+
+
+def _pattern_bytes(width, height, channels, gray, seed):
+    """Deterministic, smooth-ish texture bytes (compresses like real textures)."""
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        cell = 32
+        grid_w, grid_h = -(-width // cell), -(-height // cell)
+        planes = 1 if gray else min(channels, 3)
+        coarse = rng.integers(0, 256, (grid_h, grid_w, planes), dtype=np.uint8)
+        image = np.repeat(np.repeat(coarse, cell, 0), cell, 1)[:height, :width]
+        noise = rng.integers(0, 16, image.shape, dtype=np.uint8)
+        image = image // 2 + noise
+        if gray:
+            image = np.repeat(image, min(channels, 3), axis=2)
+        if channels == 4:
+            alpha = np.full((height, width, 1), 255, dtype=np.uint8)
+            image = np.concatenate([image, alpha], axis=2)
+        return np.ascontiguousarray(image).tobytes()
+
+    rng = random.Random(seed)
+    row_pixels = bytearray()
+    for _ in range(width + 64):
+        value = rng.randrange(256)
+        pixel = [value] * 3 if gray else [rng.randrange(256) for _ in range(3)]
+        row_pixels += bytes(pixel[: min(channels, 3)] + [255] * (channels == 4))
+    rows = bytearray()
+    for y in range(height):
+        offset = (y % 64) * channels
+        rows += row_pixels[offset : offset + width * channels]
+    return bytes(rows)
+
+
+def encode_png(width, height, channels, data):
+    """Minimal PNG writer (filter 0, 8-bit) for when Pillow is missing."""
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    stride = width * channels
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)
+        raw += data[y * stride : (y + 1) * stride]
+
+    def chunk(tag, payload):
+        return (
+            struct.pack(">I", len(payload))
+            + tag
+            + payload
+            + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+@_instrument
+class SDTexture:
+    """In-memory 8-bit image; save() encodes it like Designer's texture export."""
+
+    # Set to False to exercise the exporter's PNG fallback path
+    webp_supported = True
+
+    def __init__(self, width, height, channels=4, data=None):
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.data = data
+
+    @classmethod
+    def sFromPattern(cls, width, height, channels=4, gray=False, seed=0):
+        return cls(
+            width, height, channels, _pattern_bytes(width, height, channels, gray, seed)
+        )
+
+    def getSize(self):
+        return int2(self.width, self.height)
+
+    def save(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".webp":
+            if not self.webp_supported or Image is None:
+                raise SDAPIException("WebP export not supported")
+        elif extension not in (".png", ".bmp", ".jpg", ".jpeg", ".tga", ".tif"):
+            raise SDAPIException(f"Unsupported format: {extension}")
+
+        if Image is not None:
+            mode = {1: "L", 3: "RGB", 4: "RGBA"}[self.channels]
+            image = Image.frombytes(mode, (self.width, self.height), self.data)
+            if extension in (".jpg", ".jpeg") and mode == "RGBA":
+                image = image.convert("RGB")
+            image.save(path)
+        elif extension == ".png":
+            with open(path, "wb") as f:
+                f.write(encode_png(self.width, self.height, self.channels, self.data))
+        else:
+            raise SDAPIException(f"{extension} export needs Pillow in the fake sd")
+
+
+# --- Values ---
+
+
+class SDValue:
+    def __init__(self, value=None):
+        self._value = value
+
+    @classmethod
+    def sNew(cls, value=None):
+        return cls(value)
+
+    def get(self):
+        return self._value
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._value!r})"
+
+
+@_instrument
+class SDValueString(SDValue):
+    pass
+
+
+@_instrument
+class SDValueBool(SDValue):
+    pass
+
+
+@_instrument
+class SDValueInt2(SDValue):
+    pass
+
+
+@_instrument
+class SDValueTexture(SDValue):
+    pass
+
+
+# --- Graph, nodes, properties ---
+
+
+class SDProperty:
+    def __init__(self, prop_id, category):
+        self._id = prop_id
+        self._category = category
+
+    def getId(self):
+        return self._id
+
+    def getCategory(self):
+        return self._category
+
+
+# Input / output properties of the node definitions the plugin touches
+_DEFINITIONS = {
+    "sbs::compositing::bitmap": (
+        ["bitmapresourcepath", "colorswitch", "$outputsize"],
+        ["unique_filter_output"],
+    ),
+}
+_DEFAULT_DEFINITION = (["$outputsize"], ["unique_filter_output"])
+
+
+class SDConnection:
+    def __init__(self, output_node, output_prop, input_node, input_prop):
+        self._ends = (output_node, output_prop, input_node, input_prop)
+
+    def getOutputPropertyNode(self):
+        return self._ends[0]
+
+    def getOutputProperty(self):
+        return self._ends[1]
+
+    def getInputPropertyNode(self):
+        return self._ends[2]
+
+    def getInputProperty(self):
+        return self._ends[3]
+
+
+@_instrument
+class SDNode:
+    _counter = 0
+
+    def __init__(self, graph, definition):
+        SDNode._counter += 1
+        self.graph = graph
+        self.definition = definition
+        self._identifier = str(1000000 + SDNode._counter)
+        self._position = float2()
+        inputs, outputs = _DEFINITIONS.get(definition, _DEFAULT_DEFINITION)
+        self._properties = {
+            SDPropertyCategory.Input: {
+                p: SDProperty(p, SDPropertyCategory.Input) for p in inputs
+            },
+            SDPropertyCategory.Output: {
+                p: SDProperty(p, SDPropertyCategory.Output) for p in outputs
+            },
+        }
+        self._values = {}
+        self._inheritance = {}
+        # Output textures rendered by SDGraph.compute(): prop id -> (w, h, ch, gray, seed)
+        self._sources = {}
+
+    def getIdentifier(self):
+        return self._identifier
+
+    def getDefinitionId(self):
+        return self.definition
+
+    def getPosition(self):
+        return self._position
+
+    def setPosition(self, position):
+        self._position = position
+
+    def getProperties(self, category):
+        return list(self._properties.get(category, {}).values())
+
+    def getPropertyFromId(self, prop_id, category):
+        return self._properties.get(category, {}).get(prop_id)
+
+    def getPropertyValue(self, prop):
+        return self._values.get(prop.getId())
+
+    def setPropertyValue(self, prop, value):
+        if prop is None:
+            raise SDAPIException("Invalid property")
+        self._values[prop.getId()] = value
+
+    def getPropertyValueFromId(self, prop_id, category):
+        return self._values.get(prop_id)
+
+    def setInputPropertyValueFromId(self, prop_id, value):
+        if prop_id not in self._properties[SDPropertyCategory.Input]:
+            raise SDAPIException(f"No input property {prop_id}")
+        self._values[prop_id] = value
+
+    def setInputPropertyInheritanceMethodFromId(self, prop_id, method):
+        self._inheritance[prop_id] = method
+
+    def getInputPropertyInheritanceMethodFromId(self, prop_id):
+        return self._inheritance.get(prop_id)
+
+    def newPropertyConnection(self, prop, input_node, input_prop):
+        connection = SDConnection(self, prop, input_node, input_prop)
+        self.graph.connections.append(connection)
+        return connection
+
+    def getPropertyConnections(self, prop):
+        """Connections leaving an output property / entering an input property."""
+        end = 0 if prop.getCategory() == SDPropertyCategory.Output else 2
+        return [
+            c
+            for c in self.graph.connections
+            if c._ends[end] is self and c._ends[end + 1].getId() == prop.getId()
+        ]
+
+
+@_instrument
+class SDGraph:
+    def __init__(self, package, identifier):
+        self.package = package
+        self._identifier = identifier
+        self.nodes = []
+        self.comments = []
+        self.connections = []
+
+    def getIdentifier(self):
+        return self._identifier
+
+    def getNodes(self):
+        return list(self.nodes)
+
+    def newNode(self, definition):
+        node = SDNode(self, definition)
+        self.nodes.append(node)
+        return node
+
+    def getNodeFromId(self, identifier):
+        for node in self.nodes:
+            if node.getIdentifier() == identifier:
+                return node
+        return None
+
+    def deleteNode(self, node):
+        if node not in self.nodes:
+            raise SDAPIException("Node is not in this graph")
+        self.nodes.remove(node)
+        self.connections = [
+            c for c in self.connections if node not in (c._ends[0], c._ends[2])
+        ]
+        self.comments = [c for c in self.comments if c.node is not node]
+
+    def compute(self):
+        """Render the output texture of every source node (see make_source_node)."""
+        for node in self.nodes:
+            for prop_id, spec in node._sources.items():
+                if prop_id not in node._values:
+                    node._values[prop_id] = SDValueTexture(
+                        SDTexture.sFromPattern(*spec)
+                    )
+
+
+@_instrument
+class SDGraphObjectComment:
+    def __init__(self, node):
+        self.node = node
+        self._description = ""
+
+    @classmethod
+    def sNew(cls, node):
+        comment = cls(node)
+        node.graph.comments.append(comment)
+        return comment
+
+    def getDescription(self):
+        return self._description
+
+    def setDescription(self, description):
+        self._description = description
+
+
+# --- Package and resources ---
+
+
+class SDResource:
+    _counter = 0
+
+    def __init__(self, package, identifier):
+        SDResource._counter += 1
+        self.package = package
+        self._identifier = identifier
+        self._url = f"pkg:///{identifier}_{SDResource._counter}"
+        self.children = []
+        self.parent = None
+
+    def getClassName(self):
+        return type(self).__name__
+
+    def getIdentifier(self):
+        return self._identifier
+
+    def setIdentifier(self, identifier):
+        self._identifier = identifier
+
+    def getUrl(self):
+        return self._url
+
+    def getFilePath(self):
+        return None
+
+    def delete(self):
+        for resource in [self] + self.getChildrenResources(True):
+            self.package._by_url.pop(resource.getUrl(), None)
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def getChildrenResources(self, recursive):
+        result = []
+        for child in self.children:
+            result.append(child)
+            if recursive:
+                result.extend(child.getChildrenResources(True))
+        return result
+
+
+def _add_resource(parent, resource):
+    parent.children.append(resource)
+    resource.parent = parent
+    resource.package._by_url[resource.getUrl()] = resource
+
+
+@_instrument
+class SDResourceFolder(SDResource):
+    @classmethod
+    def sNew(cls, parent):
+        folder = cls(_package_of(parent), "folder")
+        _add_resource(parent, folder)
+        return folder
+
+
+@_instrument
+class SDResourceBitmap(SDResource):
+    def __init__(self, package, identifier, file_path, embed_method):
+        super().__init__(package, identifier)
+        self._file_path = file_path
+        self.embed_method = embed_method
+
+    @classmethod
+    def sNewFromFile(cls, parent, file_path, embed_method):
+        if not os.path.isfile(file_path):
+            raise SDAPIException(f"File not found: {file_path}")
+        package = _package_of(parent)
+        identifier = os.path.splitext(os.path.basename(file_path))[0]
+        if embed_method == EmbedMethod.CopiedAndLinked:
+            # Designer copies the file into <package>.resources next to the package
+            target_dir = package.resource_dir()
+            os.makedirs(target_dir, exist_ok=True)
+            target = os.path.join(target_dir, os.path.basename(file_path))
+            shutil.copyfile(file_path, target)
+            file_path = target
+        elif embed_method == EmbedMethod.Embedded:
+            with open(file_path, "rb") as f:
+                package.embedded[identifier] = f.read()
+        resource = cls(package, identifier, file_path, embed_method)
+        _add_resource(parent, resource)
+        return resource
+
+    def getFilePath(self):
+        return self._file_path
+
+
+def _package_of(parent):
+    return parent if isinstance(parent, SDPackage) else parent.package
+
+
+@_instrument
+class SDPackage:
+    def __init__(self, file_path=None):
+        self._file_path = file_path
+        self.children = []
+        self.graphs = []
+        self.embedded = {}
+        self._by_url = {}
+
+    def getFilePath(self):
+        return self._file_path
+
+    def getChildrenResources(self, recursive):
+        return SDResource.getChildrenResources(self, recursive)
+
+    def findResourceFromUrl(self, url):
+        return self._by_url.get(url)
+
+    def resource_dir(self):
+        if self._file_path:
+            return os.path.splitext(self._file_path)[0] + ".resources"
+        return os.path.join(os.getcwd(), "unsaved_package.resources")
+
+
+@_instrument
+class SDPackageMgr:
+    def __init__(self):
+        self.packages = []
+
+    def getUserPackages(self):
+        return list(self.packages)
+
+    def newUserPackage(self, file_path=None):
+        package = SDPackage(file_path)
+        self.packages.append(package)
+        return package
+
+    def unloadUserPackage(self, package):
+        self.packages.remove(package)
+
+
+# --- Application, UI manager, context ---
+
+
+@_instrument
+class QtForPythonUIMgrWrapper:
+    def __init__(self):
+        self.current_graph = None
+        self.selection = []
+
+    def getCurrentGraph(self):
+        return self.current_graph
+
+    def getCurrentGraphSelectedNodes(self):
+        return list(self.selection)
+
+    def newDockWidget(self, identifier, title):
+        raise NotImplementedError("The fake sd has no Qt main window")
+
+
+@_instrument
+class SDApplication:
+    def __init__(self):
+        self.package_mgr = SDPackageMgr()
+        self.ui_mgr = QtForPythonUIMgrWrapper()
+
+    def getPackageMgr(self):
+        return self.package_mgr
+
+    def getQtForPythonUIMgr(self):
+        return self.ui_mgr
+
+
+class Logger:
+    """Collects log records; prints them when verbose is set."""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.records = []
+
+    def _log(self, level, message):
+        self.records.append((level, message))
+        if self.verbose:
+            print(f"[{level}] {message}")
+
+    def debug(self, message):
+        self._log("debug", message)
+
+    def info(self, message):
+        self._log("info", message)
+
+    def warning(self, message):
+        self._log("warning", message)
+
+    def error(self, message):
+        self._log("error", message)
+
+
+@_instrument
+class Context:
+    def __init__(self):
+        self.application = SDApplication()
+        self.logger = Logger()
+
+    def getSDApplication(self):
+        return self.application
+
+    def getLogger(self):
+        return self.logger
+
+
+_context = None
+
+
+def getContext():
+    global _context
+    if _context is None:
+        _context = Context()
+    return _context
+
+
+# --- Installation and scene helpers ---
+
+# module name -> names it exports, mirroring the real sd package layout
+_MODULES = {
+    "sd": ["getContext"],
+    "sd.api": [],
+    "sd.api.sdapplication": ["SDApplication"],
+    "sd.api.qtforpythonuimgrwrapper": ["QtForPythonUIMgrWrapper"],
+    "sd.api.sdpackage": ["SDPackage"],
+    "sd.api.sdpackagemgr": ["SDPackageMgr"],
+    "sd.api.sdgraph": ["SDGraph"],
+    "sd.api.sdnode": ["SDNode"],
+    "sd.api.sdconnection": ["SDConnection"],
+    "sd.api.sdproperty": [
+        "SDProperty",
+        "SDPropertyCategory",
+        "SDPropertyInheritanceMethod",
+    ],
+    "sd.api.sdresource": ["SDResource", "EmbedMethod"],
+    "sd.api.sdresourcefolder": ["SDResourceFolder"],
+    "sd.api.sdresourcebitmap": ["SDResourceBitmap"],
+    "sd.api.sdgraphobjectcomment": ["SDGraphObjectComment"],
+    "sd.api.sdvalue": ["SDValue"],
+    "sd.api.sdvaluestring": ["SDValueString"],
+    "sd.api.sdvaluebool": ["SDValueBool"],
+    "sd.api.sdvalueint2": ["SDValueInt2"],
+    "sd.api.sdvaluetexture": ["SDValueTexture"],
+    "sd.api.sdtexture": ["SDTexture"],
+    "sd.api.sdbasetypes": ["float2", "int2"],
+    "sd.api.apiexception": ["SDAPIException"],
+}
+
+
+def install():
+    """Register the fake as `sd` (and its sd.api.* modules) in sys.modules."""
+    this = sys.modules[__name__]
+    for name, exports in _MODULES.items():
+        module = sys.modules.get(name) or types.ModuleType(name)
+        module.__fake__ = True
+        for export in exports:
+            setattr(module, export, getattr(this, export))
+        sys.modules[name] = module
+    sys.modules["sd"].api = sys.modules["sd.api"]
+    for name in _MODULES:
+        if name.count(".") == 2:
+            setattr(sys.modules["sd.api"], name.rsplit(".", 1)[1], sys.modules[name])
+    return getContext()
+
+
+def reset():
+    """Fresh application (no packages, graphs or selection) and zeroed STATS."""
+    global _context
+    _context = None
+    STATS.reset()
+    return getContext()
+
+
+def new_package(file_path=None):
+    return getContext().getSDApplication().getPackageMgr().newUserPackage(file_path)
+
+
+def new_graph(package, identifier="graph", current=True):
+    graph = SDGraph(package, identifier)
+    package.graphs.append(graph)
+    if current:
+        getContext().getSDApplication().getQtForPythonUIMgr().current_graph = graph
+    return graph
+
+
+def make_source_node(graph, width, height, channels=4, gray=False, seed=0):
+    """Node whose output texture is rendered by graph.compute()."""
+    node = graph.newNode("sbs::compositing::uniform")
+    node._sources["unique_filter_output"] = (width, height, channels, gray, seed)
+    return node
+
+
+def select(nodes):
+    getContext().getSDApplication().getQtForPythonUIMgr().selection = list(nodes)
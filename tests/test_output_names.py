@@ -0,0 +1,74 @@
+"""
+Saved results must never share a file: a seam retry or a concurrent sweep
+job finishing in the same second used to overwrite the first result, and
+discarding the loser then deleted the file that was meant to be kept.
+
+Runs against the headless `sd` from benchmarks/fake_sd.py:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import fake_sd  # noqa: E402
+
+fake_sd.install()
+
+from SDBanana.store import open_unique  # noqa: E402
+
+TIMESTAMP = "20260101120000"
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    from SDBanana.generator import ImageGenerator
+
+    return ImageGenerator(provider_manager=None, settings_manager=None)
+
+
+def test_same_second_saves_get_distinct_files(generator):
+    kept = generator._save_image_bytes(b"first result", TIMESTAMP)
+    retry = generator._save_image_bytes(b"second result", TIMESTAMP)
+    assert kept != retry
+
+    # The retry scored worse and is discarded; the kept result survives intact
+    generator.discard_result(retry)
+    assert not os.path.exists(retry)
+    assert generator.pop_image_info(retry) is None
+    assert os.path.exists(kept)
+    with open(kept, "rb") as f:
+        assert f.read() == b"first result"
+    assert generator.pop_image_info(kept).path == kept
+
+
+def test_open_unique_counts_up(tmp_path):
+    path = str(tmp_path / "result_seamfix.png")
+    created = []
+    for _ in range(3):
+        f, created_path = open_unique(path)
+        f.close()
+        created.append(created_path)
+    assert created == [
+        path,
+        str(tmp_path / "result_seamfix_1.png"),
+        str(tmp_path / "result_seamfix_2.png"),
+    ]
+
+
+def test_concurrent_jobs_get_their_own_files(generator):
+    paths = [
+        generator._save_image_bytes(f"job {job_id}".encode(), TIMESTAMP, job_id=job_id)
+        for job_id in ("a1b2c3", "d4e5f6")
+    ]
+    assert len(set(paths)) == 2
+    for job_id, path in zip(("a1b2c3", "d4e5f6"), paths):
+        assert job_id in os.path.basename(path)
+        with open(path, "rb") as f:
+            assert f.read() == f"job {job_id}".encode()
@@ -0,0 +1,80 @@
+"""
+Local seam repair has to stay cheap next to a generation: repairing a 4K
+result and writing the copy used to take about 2.5 s, most of it spent
+deflating the PNG.
+
+Runs against the headless `sd` from benchmarks/fake_sd.py:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import fake_sd  # noqa: E402
+
+fake_sd.install()
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL.Image")
+
+from SDBanana.importer import ImageInfo  # noqa: E402
+from SDBanana.tiling import (  # noqa: E402
+    load_pixels,
+    repair_pixels,
+    repaired_path_for,
+    save_pixels,
+    score_pixels,
+)
+
+SIZE = 4096
+# Repair plus write of a 4K result, in seconds (about 0.3 s on a laptop)
+REPAIR_BUDGET = 1.0
+
+
+def seamed_texture(size, channels=3):
+    """Smooth pattern on a diagonal ramp: tonal steps across both wraps."""
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    base = 0.4 + 0.1 * np.sin(8 * np.pi * x) * np.cos(6 * np.pi * y) + 0.25 * x
+    base += 0.15 * y
+    noise = np.random.default_rng(0).normal(0, 0.02, (size, size, channels))
+    return (np.clip(base[..., None] + noise, 0, 1) * 255).astype(np.uint8)
+
+
+def test_repair_is_fast_and_wraps(tmp_path):
+    pixels = seamed_texture(SIZE)
+    assert not score_pixels(pixels).seamless
+
+    started = time.perf_counter()
+    repaired, method, tiling = repair_pixels(pixels)
+    path = save_pixels(repaired, repaired_path_for(str(tmp_path / "result.png")))
+    info = ImageInfo.from_pixels(path, repaired, is_grayscale=False)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < REPAIR_BUDGET, f"repair took {elapsed:.2f} s"
+    assert tiling.seamless
+    written = load_pixels(path)
+    assert np.array_equal(written, repaired)
+    assert score_pixels(written).seamless
+    assert (info.format, info.width, info.height) == ("png", SIZE, SIZE)
+    assert (info.bit_depth, info.channels) == (8, 3)
+
+
+@pytest.mark.parametrize("dtype", ["uint8", "uint16"])
+def test_saved_pixels_round_trip(tmp_path, dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, info.max, (48, 64, 1), dtype=dtype, endpoint=True)
+    path = save_pixels(pixels, str(tmp_path / "gray.png"))
+    assert np.array_equal(load_pixels(path), pixels)
+    probed = ImageInfo.from_file(path)
+    derived = ImageInfo.from_pixels(path, pixels)
+    for field in ("format", "width", "height", "bit_depth", "channels", "size"):
+        assert getattr(derived, field) == getattr(probed, field)
+    assert derived.is_grayscale is True